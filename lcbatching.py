@@ -0,0 +1,141 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional, TypeVar, Union
+
+from langchain_core.runnables import RunnableConfig
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def iter_chunks(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split any iterable into lists of at most size items without materializing it.
+
+    Args:
+        items (Iterable[T]): Input items, may be a generator
+        size (int): Maximum chunk length
+
+    Yields:
+        List[T]: Consecutive chunks
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_max_concurrency(
+    config: Optional[Union[RunnableConfig, List[RunnableConfig]]],
+    default: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Read max_concurrency from a RunnableConfig (or the first of a list of configs).
+
+    Args:
+        config: Config passed to batch/abatch
+        default (Optional[int]): Value used when the config does not set it
+
+    Returns:
+        Optional[int]: Maximum number of concurrent workers, None for serial
+    """
+    if isinstance(config, list):
+        config = config[0] if config else None
+    if config and config.get("max_concurrency") is not None:
+        return config["max_concurrency"]
+    return default
+
+
+def _guarded(fn: Callable[[T], R], return_exceptions: bool) -> Callable[[T], Union[R, Exception]]:
+    if not return_exceptions:
+        return fn
+
+    def call(item: T) -> Union[R, Exception]:
+        try:
+            return fn(item)
+        except Exception as e:
+            return e
+
+    return call
+
+
+def run_batched(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_concurrency: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    return_exceptions: bool = False,
+) -> Iterator[R]:
+    """
+    Apply fn to every item, yielding results in input order.
+
+    Only one chunk of inputs and results is alive at a time, so arbitrarily long
+    input streams are processed in bounded memory. With max_concurrency > 1 each
+    chunk is spread over a thread pool (useful when fn waits on I/O).
+
+    Args:
+        fn (Callable[[T], R]): Per-item function
+        items (Iterable[T]): Inputs, may be a generator
+        max_concurrency (Optional[int]): Thread pool size, None or 1 runs inline
+        chunk_size (int): Number of inputs handled per chunk
+        return_exceptions (bool): Yield exceptions instead of raising them
+
+    Yields:
+        R: fn(item) for each item
+    """
+    fn = _guarded(fn, return_exceptions)
+    if not max_concurrency or max_concurrency <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        for chunk in iter_chunks(items, chunk_size):
+            yield from pool.map(fn, chunk)
+
+
+async def arun_batched(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_concurrency: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    return_exceptions: bool = False,
+) -> AsyncIterator[R]:
+    """
+    Async counterpart of run_batched.
+
+    Chunks are processed whole, yielding control to the event loop between them.
+    With max_concurrency > 1, up to that many chunks run at once in the loop's
+    default executor.
+
+    Yields:
+        R: fn(item) for each item, in input order
+    """
+    fn = _guarded(fn, return_exceptions)
+
+    def process(chunk: List[T]) -> List[R]:
+        return [fn(item) for item in chunk]
+
+    if not max_concurrency or max_concurrency <= 1:
+        for chunk in iter_chunks(items, chunk_size):
+            for result in process(chunk):
+                yield result
+            await asyncio.sleep(0)
+        return
+
+    loop = asyncio.get_running_loop()
+    for window in iter_chunks(iter_chunks(items, chunk_size), max_concurrency):
+        results = await asyncio.gather(*(loop.run_in_executor(None, process, chunk) for chunk in window))
+        for chunk_results in results:
+            for result in chunk_results:
+                yield result
+
+
+async def acollect(results: AsyncIterator[Any]) -> List[Any]:
+    """Gather an async iterator into a list."""
+    return [result async for result in results]
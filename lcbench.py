@@ -0,0 +1,278 @@
+"""
+Offline benchmark of the demo chains against deterministic local fake models.
+
+ChatOpenAI and OpenAIEmbeddings are swapped for lcfakes.FakeChatModel and
+FakeEmbeddings (via lcfactory.use_fake_models), so no API key or network is
+needed. Every chain runs under invoke, batch, stream and async load; results
+(p50/p95/p99 latency, throughput, errors, peak memory) go to a JSON file that
+can be diffed across commits (--trace / --metrics additionally export every
+step as a Chrome trace and Prometheus-style counters):
+
+    python lcbench.py --output bench.json
+    python lcbench.py --output bench-new.json --compare bench.json
+
+Peak memory is measured with tracemalloc, which slows Python-heavy paths by a
+similar factor on every run; pass --no-memory for raw throughput.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import lcfactory
+from lctracing import METRICS, trace
+
+COUNTRIES = ["India", "USA", "Brazil", "Japan", "France", "Kenya", "Australia", "Germany"]
+SPORTS = ["Cricket", "Basketball", "Football (Soccer)", "Tennis", "Rugby"]
+MODES = ("invoke", "batch", "stream", "async")
+
+
+def _country(i: int) -> Dict[str, str]:
+    return {"country": COUNTRIES[i % len(COUNTRIES)]}
+
+
+def build_scenarios(cache_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Build every benchmarked runnable with the fake models installed.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: name -> {"runnable", "make_input"}
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    import lcchains
+    from lcdemo7runnable import GreetingRunnable
+    from lcdemo8_1runnable import SportsRunnable
+    from lcembedding import EmbeddingPipeline
+
+    embedding_pipeline = EmbeddingPipeline(lcfactory.get_embeddings(), cache_dir=cache_dir)
+    return {
+        "lcdemo1_model": {
+            "runnable": lcfactory.get_model(),
+            "make_input": lambda i: f"what is capital of {COUNTRIES[i % len(COUNTRIES)]}",
+        },
+        "lcdemo6_9_sports": {"runnable": lcchains.sports_chain(), "make_input": _country},
+        "lcdemo10_sports_str": {"runnable": lcchains.sports_str_chain(), "make_input": _country},
+        "lcdemo11_sports_json": {"runnable": lcchains.sports_json_chain(), "make_input": _country},
+        "lcdemo11_sports_structured": {"runnable": lcchains.sports_structured_chain(), "make_input": _country},
+        "lcdemo12_sports_stream": {"runnable": lcchains.sports_stream_chain(), "make_input": _country},
+        "lcdemo9debug_pipeline": {
+            "runnable": lcchains.sports_pipeline(),
+            "make_input": lambda i: {**_country(i), "sport": SPORTS[i % len(SPORTS)]},
+        },
+        "lcdemo7_greeting": {"runnable": GreetingRunnable(), "make_input": _country},
+        "lcdemo8_1_sports_runnable": {"runnable": SportsRunnable(), "make_input": _country},
+        "lcdemo8_2_lambda": {"runnable": RunnableLambda(lambda x: x + 1), "make_input": lambda i: i},
+        "lcdemo13_embeddings": {
+            # Unique text per request, so every call reaches the (fake) provider
+            "runnable": RunnableLambda(embedding_pipeline.embed_query),
+            "make_input": lambda i: f"What are the top sports played in {COUNTRIES[i % len(COUNTRIES)]}? #{i}-{time.time_ns()}",
+        },
+    }
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_invoke(runnable, inputs, concurrency, batch_size):
+    latencies, errors = [], 0
+    for item in inputs:
+        start = time.perf_counter()
+        try:
+            runnable.invoke(item)
+            latencies.append(time.perf_counter() - start)
+        except Exception:
+            errors += 1
+    return latencies, errors, {}
+
+
+def run_batch(runnable, inputs, concurrency, batch_size):
+    # Latency is recorded per batch call; throughput still counts individual items
+    latencies, errors = [], 0
+    for offset in range(0, len(inputs), batch_size):
+        chunk = inputs[offset:offset + batch_size]
+        start = time.perf_counter()
+        try:
+            results = runnable.batch(chunk, config={"max_concurrency": concurrency}, return_exceptions=True)
+            errors += sum(isinstance(result, Exception) for result in results)
+        except Exception:
+            errors += len(chunk)
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors, {}
+
+
+def run_stream(runnable, inputs, concurrency, batch_size):
+    latencies, first_chunk, errors = [], [], 0
+    for item in inputs:
+        start = time.perf_counter()
+        try:
+            first = None
+            for _ in runnable.stream(item):
+                if first is None:
+                    first = time.perf_counter() - start
+            latencies.append(time.perf_counter() - start)
+            if first is not None:
+                first_chunk.append(first)
+        except Exception:
+            errors += 1
+    return latencies, errors, {
+        "ttft_p50_ms": _ms(percentile(first_chunk, 0.5)),
+        "ttft_p95_ms": _ms(percentile(first_chunk, 0.95)),
+    }
+
+
+def run_async(runnable, inputs, concurrency, batch_size):
+    latencies, errors = [], 0
+
+    async def one(item, semaphore):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await runnable.ainvoke(item)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(one(item, semaphore) for item in inputs))
+
+    asyncio.run(main())
+    return latencies, errors, {}
+
+
+RUNNERS: Dict[str, Callable] = {"invoke": run_invoke, "batch": run_batch, "stream": run_stream, "async": run_async}
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def measure(name, scenario, mode, args) -> Dict[str, Any]:
+    inputs = [scenario["make_input"](i) for i in range(args.requests)]
+    if args.memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    latencies, errors, extra = RUNNERS[mode](scenario["runnable"], inputs, args.concurrency, args.batch_size)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if args.memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "chain": name,
+        "mode": mode,
+        "requests": len(inputs),
+        "errors": errors,
+        "p50_ms": _ms(percentile(latencies, 0.5)),
+        "p95_ms": _ms(percentile(latencies, 0.95)),
+        "p99_ms": _ms(percentile(latencies, 0.99)),
+        "throughput_rps": round((len(inputs) - errors) / elapsed, 3) if elapsed else None,
+        "peak_mem_mib": round(peak / 2**20, 3) if peak is not None else None,
+        **extra,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(row["chain"], row["mode"]): row for row in json.load(f)["results"]}
+    print(f"\nChange vs {baseline_path} (negative latency / positive throughput is better)")
+    for row in results:
+        old = baseline.get((row["chain"], row["mode"]))
+        if old is None:
+            continue
+        deltas = []
+        for field in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "peak_mem_mib"):
+            if row.get(field) is not None and old.get(field):
+                deltas.append(f"{field} {100 * (row[field] - old[field]) / old[field]:+.1f}%")
+        print(f"  {row['chain']:<28} {row['mode']:<7} " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40, help="requests per chain and mode")
+    parser.add_argument("--concurrency", type=int, default=8, help="max_concurrency for batch and async")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of fake calls raising a 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chains", nargs="*", help="only run these chains")
+    parser.add_argument("--modes", nargs="*", choices=MODES, default=list(MODES))
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip tracemalloc")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    parser.add_argument("--trace", help="also write a Chrome trace of every step here (adds callback overhead)")
+    parser.add_argument("--metrics", help="also write Prometheus-style step counters here (implies tracing)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    lcfactory.use_fake_models(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+
+    results = []
+    tracing = trace(args.trace) if args.trace or args.metrics else nullcontext()
+    with tempfile.TemporaryDirectory() as cache_dir, tracing:
+        scenarios = build_scenarios(cache_dir)
+        for name, scenario in scenarios.items():
+            if args.chains and name not in args.chains:
+                continue
+            for mode in args.modes:
+                row = measure(name, scenario, mode, args)
+                results.append(row)
+                print(
+                    f"{name:<28} {mode:<7} p50 {row['p50_ms']} ms  p95 {row['p95_ms']} ms  "
+                    f"p99 {row['p99_ms']} ms  {row['throughput_rps']} req/s  errors {row['errors']}"
+                )
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(METRICS.render())
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
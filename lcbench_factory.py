@@ -0,0 +1,72 @@
+"""
+Measure the per-interaction setup cost of the Streamlit demos before and after lcfactory.
+
+Before: every rerun calls load_dotenv(), builds a new ChatOpenAI client and
+rebuilds the prompt template and chain (what lcdemo10 used to do).
+After: the same objects come from the process-wide cache in lcfactory.
+
+No request is sent to OpenAI, so this runs offline with a placeholder key:
+    python lcbench_factory.py --reruns 200
+"""
+import argparse
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+
+import lcfactory
+
+MESSAGES = [
+    ("system", "You are an expert in sports and general knowledge."),
+    ("human", "What are the top 3 most popular sports played in {country}?"),
+]
+
+
+def rerun_uncached():
+    load_dotenv()
+    model = ChatOpenAI(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY"))
+    prompt_template = ChatPromptTemplate.from_messages(MESSAGES)
+    return prompt_template | model | StrOutputParser()
+
+
+def rerun_cached():
+    return lcfactory.get_chain("sports_str", MESSAGES, StrOutputParser, model="gpt-4o-mini")
+
+
+def measure(fn, reruns):
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<10} first={timings[0]:8.3f} ms  median={statistics.median(timings):8.3f} ms  p95={p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=200, help="number of simulated Streamlit reruns")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+    before = measure(rerun_uncached, args.reruns)
+    lcfactory.clear_cache()
+    after = measure(rerun_cached, args.reruns)
+
+    report("before", before)
+    report("after", after)
+    print(f"median speed-up: {statistics.median(before) / statistics.median(after):.0f}x per interaction")
+
+
+if __name__ == "__main__":
+    main()
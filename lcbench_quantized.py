@@ -0,0 +1,108 @@
+"""
+Benchmark QuantizedVectorIndex against exact float32 search (no API calls).
+
+Clustered random vectors stand in for embeddings (pure noise has no meaningful
+neighbours). For every layout the benchmark reports bytes per vector, the size
+of what a search scans, query latency and recall@k against exact
+NumpyVectorIndex results, with and without rescoring the candidates at full
+precision (memory-mapped from disk, as after QuantizedVectorIndex.load).
+Defaults match text-embedding-3-small; about 2 GiB of RAM are needed at
+100k vectors:
+
+    python lcbench_quantized.py --vectors 100000 --dim 1536 --k 10
+    python lcbench_quantized.py --oversample 2 4 8 16
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from lcquantized import DEFAULT_OVERSAMPLE, MODES, QuantizedVectorIndex
+from lcvectorindex import NumpyVectorIndex
+
+
+def python_list_bytes(vector) -> int:
+    """Bytes of one embedding held as a list of Python floats, as returned by embed_documents."""
+    values = [float(x) for x in vector]
+    return sys.getsizeof(values) + sum(sys.getsizeof(x) for x in values)
+
+
+def clustered(rng, centers, count, noise):
+    labels = rng.integers(len(centers), size=count)
+    return centers[labels] + noise * rng.standard_normal((count, centers.shape[1]), dtype=np.float32)
+
+
+def recall(results, truth, k) -> float:
+    hits = [len({id for id, _ in got} & {id for id, _ in want}) for got, want in zip(results, truth)]
+    return sum(hits) / (k * len(truth))
+
+
+def timed_search(index, queries, k, **options):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(index.search(query, k, **options))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=0.6, help="spread around each cluster centre")
+    parser.add_argument("--oversample", type=int, nargs="*", help="candidates per result to rescore (default per mode)")
+    parser.add_argument("--chunk", type=int, default=50_000, help="vectors generated and added per step")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((args.clusters, args.dim), dtype=np.float32)
+    exact = NumpyVectorIndex(args.dim, capacity=args.vectors)
+    quantized = {mode: QuantizedVectorIndex(args.dim, mode, capacity=args.vectors) for mode in MODES}
+
+    start = time.perf_counter()
+    for offset in range(0, args.vectors, args.chunk):
+        count = min(args.chunk, args.vectors - offset)
+        vectors = clustered(rng, centers, count, args.noise)
+        ids = [str(i) for i in range(offset, offset + count)]
+        exact.add(ids, vectors)
+        for index in quantized.values():
+            index.add(ids, vectors)
+    print(f"built {args.vectors:,} x {args.dim} vectors in {time.perf_counter() - start:.1f}s\n")
+
+    queries = clustered(rng, centers, args.queries, args.noise)
+    truth, exact_ms = timed_search(exact, queries, args.k)
+    list_bytes = python_list_bytes(queries[0])
+
+    rows = [("python floats", list_bytes, args.vectors * list_bytes, None, None, "-")]
+    rows.append(("float32 exact", exact.nbytes / args.vectors, exact.nbytes, exact_ms, 1.0, "-"))
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in MODES:
+            # Rescoring reads memory-mapped float32 rows, as after save() + load()
+            quantized.pop(mode).save(f"{directory}/{mode}")
+            index = QuantizedVectorIndex.load(f"{directory}/{mode}", mmap=True)
+            per_vector = index.nbytes / args.vectors
+            results, ms = timed_search(index, queries, args.k, rescore=False)
+            rows.append((f"{mode}", per_vector, index.nbytes, ms, recall(results, truth, args.k), "-"))
+            for oversample in args.oversample or [DEFAULT_OVERSAMPLE[mode]]:
+                results, ms = timed_search(index, queries, args.k, oversample=oversample, rescore=True)
+                rows.append((f"{mode} + rescore", per_vector, index.nbytes, ms, recall(results, truth, args.k), f"x{oversample}"))
+            del index
+
+    print(f"{'layout':<18} {'bytes/vector':>13} {'scanned MiB':>12} {'p50 ms':>8} {f'recall@{args.k}':>10} {'rescored':>9}")
+    for name, per_vector, total, ms, hit_rate, oversample in rows:
+        print(
+            f"{name:<18} {per_vector:>13,.0f} {total / 2**20:>12,.1f} "
+            f"{'-' if ms is None else f'{ms:.2f}':>8} {'-' if hit_rate is None else f'{hit_rate:.3f}':>10} {oversample:>9}"
+        )
+    print(f"\nfloat32 vectors kept on disk for rescoring: {args.vectors * args.dim * 4 / 2**20:,.0f} MiB per quantized index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Offline comparison of a single backend with the latency-aware ModelRouter.
+
+Both backends are lcfakes.FakeChatModel stubs with a latency tail (a small
+fraction of calls is very slow) and optional injected 429s, so routing,
+hedging and failover can be measured without any API key:
+
+    python lcbench_router.py --requests 400 --concurrency 8 --failure-rate 0.3
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.output_parsers import StrOutputParser
+
+from lcchains import SPORTS_MESSAGES
+from lcfactory import get_chat_prompt
+from lcfakes import FakeChatModel
+from lcrouter import ModelRouter
+
+COUNTRIES = ["India", "USA", "Brazil", "Japan", "France", "Kenya", "Australia", "Germany"]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else float("nan")
+
+
+def run(chain, requests, concurrency):
+    def one(i):
+        start = time.perf_counter()
+        try:
+            chain.invoke({"country": COUNTRIES[i % len(COUNTRIES)]})
+            return time.perf_counter() - start
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    latencies = [latency for latency in results if latency is not None]
+    return latencies, len(results) - len(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1, help="usual time to first token of the primary")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="fraction of calls hitting the slow tail")
+    parser.add_argument("--slow-latency", type=float, default=1.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="429 rate of the primary backend")
+    args = parser.parse_args()
+
+    def backends():
+        return {
+            "openai": FakeChatModel(model_name="fake-openai", latency=args.latency, tokens_per_second=2000,
+                                    slow_rate=args.slow_rate, slow_latency=args.slow_latency,
+                                    failure_rate=args.failure_rate, seed=1),
+            "gemini": FakeChatModel(model_name="fake-gemini", latency=args.latency * 1.5, tokens_per_second=2000,
+                                    slow_rate=args.slow_rate, slow_latency=args.slow_latency, seed=2),
+        }
+
+    prompt = get_chat_prompt(SPORTS_MESSAGES)
+    single = backends()["openai"]
+    router = ModelRouter(backends(), cooldown=5.0)
+    for name, model in (("single backend", single), ("router", router)):
+        latencies, errors = run(prompt | model | StrOutputParser(), args.requests, args.concurrency)
+        print(
+            f"{name:<15} p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  "
+            f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  errors {errors}"
+        )
+
+    stats = router.stats()
+    print(f"router: {stats['hedges']} hedged, {stats['failovers']} failed over")
+    for name, backend in stats["backends"].items():
+        print(f"  {name:<7} {backend['calls']} calls, error rate {backend['error_rate']:.0%}, healthy {backend['healthy']}")
+
+
+if __name__ == "__main__":
+    main()
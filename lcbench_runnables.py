@@ -0,0 +1,64 @@
+"""
+Compare bulk throughput of GreetingRunnable and SportsRunnable.
+
+Paths compared for N country queries:
+  per-item      [runnable.invoke(x) for x in inputs]
+  base batch    Runnable.batch, LangChain's default thread-pool path
+  batch         the runnable's own batch()
+  batch_iter    lazy generator input, bounded memory
+  abatch        the runnable's own abatch()
+
+Per-request INFO logging is disabled so the numbers compare the processing paths,
+not log output. Run with:
+    python lcbench_runnables.py --items 100000
+"""
+import argparse
+import asyncio
+import logging
+import time
+import tracemalloc
+
+from langchain_core.runnables import Runnable
+
+from lcdemo7runnable import GreetingRunnable
+from lcdemo8_1runnable import SportsRunnable
+
+COUNTRIES = ["USA", "India", "Brazil", "Japan"]
+
+
+def make_inputs(count):
+    return ({"country": COUNTRIES[i % len(COUNTRIES)]} for i in range(count))
+
+
+def measure(label, count, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    consumed = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert consumed == count, f"{label} produced {consumed} results, expected {count}"
+    print(f"  {label:<12} {count / elapsed:>12,.0f} items/s   peak memory {peak / 1024 / 1024:8.2f} MiB")
+
+
+def bench(runnable, count):
+    print(type(runnable).__name__)
+    measure("per-item", count, lambda: len([runnable.invoke(x) for x in make_inputs(count)]))
+    measure("base batch", count, lambda: len(Runnable.batch(runnable, list(make_inputs(count)))))
+    measure("batch", count, lambda: len(runnable.batch(list(make_inputs(count)))))
+    measure("batch_iter", count, lambda: sum(1 for _ in runnable.batch_iter(make_inputs(count))))
+    measure("abatch", count, lambda: len(asyncio.run(runnable.abatch(list(make_inputs(count))))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000, help="number of country queries")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    bench(GreetingRunnable(), args.items)
+    bench(SportsRunnable(), args.items)
+
+
+if __name__ == "__main__":
+    main()
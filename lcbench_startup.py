@@ -0,0 +1,196 @@
+"""
+Cold-start benchmark of the shared modules and the Streamlit apps.
+
+Every target runs in a fresh interpreter under `python -X importtime`, so
+nothing is shared between measurements. Reported per target (median of
+--repeat runs): wall time of the whole process, time spent loading the
+target itself, peak resident memory, number of modules loaded and the
+heaviest top-level imports. Apps are executed in Streamlit's bare mode
+(no server, empty inputs), which builds their clients but sends no
+request; a placeholder OPENAI_API_KEY is set when none is configured.
+
+    python lcbench_startup.py --output startup.json
+    python lcbench_startup.py --output startup-new.json --compare startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> statement executed in the fresh interpreter
+TARGETS = {
+    "lcfactory": "import lcfactory",
+    "lcchains": "import lcchains",
+    "lcdemo7runnable": "import lcdemo7runnable",
+    "lcdemo8_1runnable": "import lcdemo8_1runnable",
+    "app:lcdemo2": "runpy.run_path('lcdemo2stlit.py')",
+    "app:lcdemo4": "runpy.run_path('lcdemo4stprompttemplate.py')",
+    "app:lcdemo6": "runpy.run_path('lcdemo6stchatprmptemplate.py')",
+    "app:lcdemo10": "runpy.run_path('lcdemo10stchatptmplatestrparser.py')",
+    "app:lcdemo12": "runpy.run_path('lcdemo12stchatptmplatestreamresponse copy.py')",
+}
+
+# Written to stderr right before the target is loaded
+MARKER = "STARTUP-BEGIN"
+
+CHILD = """
+import json, logging, runpy, sys, time
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+logging.disable(logging.WARNING)
+sys.stderr.write({marker!r} + "\\n")
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+# ru_maxrss is in KiB on Linux and in bytes on macOS
+rss_mib = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+print("STARTUP " + json.dumps({{"load_s": seconds, "rss_mib": rss_mib, "modules": len(sys.modules)}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """
+    Return (module, cumulative microseconds) of the top-level imports in -X importtime output.
+
+    Only imports made by the target count; the interpreter's own startup and the
+    measuring preamble come before the marker line and are skipped.
+
+    Args:
+        stderr (str): Standard error of the child process
+
+    Returns:
+        List[Tuple[str, int]]: Imports not triggered by another import, slowest first
+    """
+    rows = []
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        depth = len(name) - len(name.lstrip())
+        rows.append((depth, name.strip(), int(cumulative)))
+    if not rows:
+        return []
+    top = min(depth for depth, _, _ in rows)
+    return sorted(((name, micros) for depth, name, micros in rows if depth == top), key=lambda row: -row[1])
+
+
+def run_once(statement: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-startup-benchmark")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(marker=MARKER, statement=statement)],
+        cwd=HERE, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("STARTUP ")]
+    if proc.returncode != 0 or not lines:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("\n".join(errors[-5:]) or f"exit code {proc.returncode}")
+    result = json.loads(lines[-1][len("STARTUP "):])
+    result["wall_s"] = wall
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def measure(name: str, statement: str, repeat: int) -> Dict[str, Any]:
+    """
+    Start a fresh interpreter repeat times for a target and summarize the runs.
+
+    Returns:
+        Dict[str, Any]: Medians of wall/load time and memory, plus the heaviest imports of the last run
+    """
+    runs = [run_once(statement) for _ in range(repeat)]
+    return {
+        "target": name,
+        "wall_ms": round(statistics.median(run["wall_s"] for run in runs) * 1000, 1),
+        "load_ms": round(statistics.median(run["load_s"] for run in runs) * 1000, 1),
+        "rss_mib": round(statistics.median(run["rss_mib"] for run in runs), 1),
+        "modules": runs[-1]["modules"],
+        "heaviest": [{"module": module, "ms": round(micros / 1000, 1)} for module, micros in runs[-1]["imports"][:5]],
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {row["target"]: row for row in json.load(f)["results"]}
+    print(f"\nChange vs {baseline_path} (negative is better)")
+    for row in results:
+        old = baseline.get(row["target"])
+        if old is None:
+            continue
+        deltas = []
+        for field in ("wall_ms", "load_ms", "rss_mib", "modules"):
+            if old.get(field):
+                deltas.append(f"{field} {100 * (row[field] - old[field]) / old[field]:+.1f}%")
+        print(f"  {row['target']:<20} " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", nargs="*", choices=list(TARGETS), help="only measure these targets")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument("--output", default="startup_results.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    results = []
+    for name, statement in TARGETS.items():
+        if args.targets and name not in args.targets:
+            continue
+        try:
+            row = measure(name, statement, args.repeat)
+        except RuntimeError as e:
+            print(f"{name:<20} failed: {e}")
+            continue
+        results.append(row)
+        heaviest = ", ".join(f"{item['module']} {item['ms']} ms" for item in row["heaviest"][:3])
+        print(
+            f"{name:<20} wall {row['wall_ms']:7.1f} ms  load {row['load_ms']:7.1f} ms  "
+            f"rss {row['rss_mib']:6.1f} MiB  {row['modules']:5d} modules  ({heaviest})"
+        )
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
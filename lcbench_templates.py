@@ -0,0 +1,78 @@
+"""
+Compare per-format cost of the LangChain prompt templates with lcfasttemplate.
+
+Uses the templates of lcdemo4 (single variable), lcdemo5 (partial variable)
+and lcdemo6 (chat messages). Before timing, every compiled template is checked
+to render exactly the same output as the original for a set of inputs.
+
+    python lcbench_templates.py --renders 100000
+"""
+import argparse
+import time
+
+from langchain_core.prompts import PromptTemplate
+
+from lcchains import SPORTS_MESSAGES
+from lcfactory import get_chat_prompt
+from lcfasttemplate import CompiledChatPromptTemplate, CompiledPromptTemplate
+
+COUNTRIES = ["India", "USA", "Brazil", "Japan", "France", "Kenya", "Australia", "Germany"]
+
+GK_PROMPT = PromptTemplate(
+    input_variables=["country"],
+    template="""
+    You are an expert in GK.
+    Answer the question: What are the three top sports palyed in {country}?
+    """
+)
+
+MEDALS_PROMPT = PromptTemplate(
+    input_variables=["country1", "country2", "year"],
+    template="""
+    You are an expert in GK.
+    Answer the question: How many medals in olympics won by the {country1}  or {country2} in the year {year} ?
+    """,
+    partial_variables={"country1": "India"},
+)
+
+
+def build_cases():
+    chat_prompt = get_chat_prompt(SPORTS_MESSAGES)
+    return [
+        ("lcdemo4 format", GK_PROMPT.format, CompiledPromptTemplate.from_prompt(GK_PROMPT).format,
+         lambda i: {"country": COUNTRIES[i % len(COUNTRIES)]}),
+        ("lcdemo5 partial", MEDALS_PROMPT.format, CompiledPromptTemplate.from_prompt(MEDALS_PROMPT).format,
+         lambda i: {"country2": COUNTRIES[i % len(COUNTRIES)], "year": 1996 + 4 * (i % 8)}),
+        ("lcdemo6 chat", chat_prompt.format_messages, CompiledChatPromptTemplate(chat_prompt).format_messages,
+         lambda i: {"country": COUNTRIES[i % len(COUNTRIES)]}),
+    ]
+
+
+def measure(fn, inputs):
+    start = time.perf_counter()
+    for kwargs in inputs:
+        fn(**kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for name, original, compiled, make_input in build_cases():
+        for i in range(64):
+            kwargs = make_input(i)
+            assert original(**kwargs) == compiled(**kwargs), f"{name}: output differs for {kwargs}"
+
+        inputs = [make_input(i) for i in range(args.renders)]
+        before = measure(original, inputs)
+        after = measure(compiled, inputs)
+        print(
+            f"{name:<16} original {before / args.renders * 1e6:8.2f} us/format   "
+            f"compiled {after / args.renders * 1e6:8.2f} us/format   x{before / after:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
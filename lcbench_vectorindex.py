@@ -0,0 +1,94 @@
+"""
+Benchmark NumpyVectorIndex at scale with random vectors (no API calls).
+
+Reports build time, memory footprint, single and batched query latency,
+save time and memory-mapped load time. Defaults to 1M vectors of 256 dims
+(about 1 GiB of float32); pass --dim 1536 to match text-embedding-3-small
+if the machine has ~6 GiB to spare:
+    python lcbench_vectorindex.py --vectors 1000000 --dim 256
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+
+from lcvectorindex import NumpyVectorIndex
+
+
+def rss_mib():
+    if resource is None:
+        return 0.0
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--chunk", type=int, default=100_000, help="vectors generated and added per step")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    index = NumpyVectorIndex(args.dim, capacity=args.vectors)
+
+    start = time.perf_counter()
+    for offset in range(0, args.vectors, args.chunk):
+        count = min(args.chunk, args.vectors - offset)
+        vectors = rng.standard_normal((count, args.dim), dtype=np.float32)
+        index.add([str(i) for i in range(offset, offset + count)], vectors)
+    build_s = time.perf_counter() - start
+    print(f"built {len(index):,} x {args.dim} in {build_s:.1f}s; matrix {index.nbytes / 2**20:,.0f} MiB; peak RSS {rss_mib():,.0f} MiB")
+
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, args.k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(
+        f"single query top-{args.k}: p50 {statistics.median(latencies):.1f} ms, "
+        f"p95 {percentile(latencies, 0.95):.1f} ms, p99 {percentile(latencies, 0.99):.1f} ms"
+    )
+
+    start = time.perf_counter()
+    index.search_batch(queries, args.k)
+    batch_ms = (time.perf_counter() - start) * 1000
+    print(f"batched {args.queries} queries: {batch_ms:.1f} ms total, {batch_ms / args.queries:.2f} ms/query")
+
+    start = time.perf_counter()
+    index.delete(str(i) for i in range(0, args.vectors, 10))
+    print(f"deleted 10% in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        index.save(directory)
+        print(f"saved in {time.perf_counter() - start:.1f}s")
+        del index
+
+        start = time.perf_counter()
+        loaded = NumpyVectorIndex.load(directory, mmap=True)
+        print(f"memory-mapped load of {len(loaded):,} vectors in {(time.perf_counter() - start) * 1000:.0f} ms")
+        start = time.perf_counter()
+        loaded.search(queries[0], args.k)
+        print(f"first query on mapped index (cold pages): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
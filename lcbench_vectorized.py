@@ -0,0 +1,70 @@
+"""
+Compare RunnableLambda with VectorizedLambda on the lcdemo8_2/lcdemo8_3 lambdas.
+
+Paths compared:
+  per-item invoke     [RunnableLambda(lambda x: x + 1).invoke(x) for x in inputs]
+  RunnableLambda      RunnableLambda(lambda x: x + 1).batch(inputs): one config,
+                      callback run and thread-pool task per input
+  vectorized list     VectorizedLambda(lambda xs: [x + 1 for x in xs]).batch(inputs)
+  vectorized numpy    VectorizedLambda(lambda xs: xs + 1, as_array=True).batch(inputs)
+  batch_array         the same on a NumPy array, no Python objects per item
+and the same for the two-step sequence (x + 1) | (x * 4), whose vectorized
+steps are fused into one.
+
+The per-item paths take minutes at 1M inputs, so they run on --baseline-items
+inputs and are compared per item:
+    python lcbench_vectorized.py --items 1000000 --baseline-items 100000
+"""
+import argparse
+import time
+
+import numpy as np
+from langchain_core.runnables import RunnableLambda
+
+from lcvectorized import VectorizedLambda
+
+
+def measure(label, count, fn, reference=None):
+    start = time.perf_counter()
+    produced = len(fn())
+    elapsed = time.perf_counter() - start
+    assert produced == count, f"{label} produced {produced} results, expected {count}"
+    per_item_us = elapsed / count * 1e6
+    speedup = f"{reference / per_item_us:>9,.0f}x" if reference else ""
+    print(f"  {label:<26} {count:>10,} items {count / elapsed:>14,.0f} items/s {per_item_us:>10.3f} us/item {speedup}")
+    return per_item_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1_000_000, help="inputs for the vectorized paths")
+    parser.add_argument("--baseline-items", type=int, default=100_000, help="inputs for the per-item paths")
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    args = parser.parse_args()
+
+    inputs = list(range(args.items))
+    baseline = inputs[: args.baseline_items]
+    array = np.arange(args.items)
+
+    print("x + 1 (lcdemo8_2 / lcdemo8_3)")
+    add_one = RunnableLambda(lambda x: x + 1)
+    measure("per-item invoke", len(baseline), lambda: [add_one.invoke(x) for x in baseline])
+    reference = measure("RunnableLambda", len(baseline), lambda: add_one.batch(baseline))
+    add_list = VectorizedLambda(lambda xs: [x + 1 for x in xs], chunk_size=args.chunk_size)
+    add_array = VectorizedLambda(lambda xs: xs + 1, as_array=True, chunk_size=args.chunk_size)
+    measure("vectorized list", args.items, lambda: add_list.batch(inputs), reference)
+    measure("vectorized numpy", args.items, lambda: add_array.batch(inputs), reference)
+    measure("batch_array", args.items, lambda: add_array.batch_array(array), reference)
+
+    print("(x + 1) | (x * 4) (lcdemo8_2 snippet 2)")
+    sequence = RunnableLambda(lambda x: x + 1) | RunnableLambda(lambda x: x * 4)
+    reference = measure("RunnableLambda", len(baseline), lambda: sequence.batch(baseline))
+    fused = add_array | VectorizedLambda(lambda xs: xs * 4, as_array=True)
+    measure("vectorized numpy", args.items, lambda: fused.batch(inputs), reference)
+    measure("batch_array", args.items, lambda: fused.batch_array(array), reference)
+    mixed = add_array | RunnableLambda(lambda x: x * 4)
+    measure("mixed (numpy | per-item)", len(baseline), lambda: mixed.batch(baseline), reference)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Run the Sports-Arena chains over a file of countries from the command line.
+
+Input is JSONL ({"country": "India", "sport": "Cricket", "id": "..."} per
+line) or CSV with the same columns; sport and id are optional. Rows without
+a sport go through the lcdemo10 chain (--chain sports_str, default) or the
+lcdemo9 chain (--chain sports); rows with a sport go through the three-stage
+lcdemo9 debug pipeline.
+
+Rows are read lazily and handed to a bounded pool of async workers, so memory
+stays flat for any input size. Calls are paced to the --rpm / --tpm budget.
+Every result is appended to the output JSONL as soon as it completes; on
+restart, rows already answered there (matched by id, or by row number) are
+skipped and failed rows are retried.
+
+    python lcbulk.py countries.jsonl --output answers.jsonl --concurrency 16 --rpm 500 --tpm 200000
+    LC_FAKE_MODELS=1 python lcbulk.py countries.csv --output answers.jsonl
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from lcchains import FINAL_INFO_MESSAGES, SPORT_INFO_MESSAGES, SPORTS_MESSAGES, sports_chain, sports_pipeline, sports_str_chain
+from lctokens import count_tokens
+
+CHAINS = {"sports": sports_chain, "sports_str": sports_str_chain}
+
+# Rough size of one answer; replaced by the measured size once a call returns
+DEFAULT_COMPLETION_TOKENS = 300
+
+
+def _template_tokens(messages) -> int:
+    return sum(count_tokens(template) for _, template in messages)
+
+
+class MinuteBudget:
+    """
+    Requests-per-minute and tokens-per-minute token buckets, refilled continuously.
+
+    acquire() waits until both buckets hold enough for the next call and then
+    takes it; callers queue up in arrival order. settle() corrects the token
+    bucket once the real size of a call is known, so underestimates slow the
+    following calls down instead of overrunning the provider limit.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """
+        Initialize the budget.
+
+        Args:
+            rpm (Optional[float]): Requests per minute, None for unlimited
+            tpm (Optional[float]): Tokens per minute, None for unlimited
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, requests: int = 1, tokens: int = 0) -> None:
+        """
+        Wait for budget and take it.
+
+        Args:
+            requests (int): Number of model calls
+            tokens (int): Estimated prompt plus completion tokens
+        """
+        async with self._lock:
+            if self.rpm:
+                requests = min(requests, self.rpm)
+            if self.tpm:
+                tokens = min(tokens, self.tpm)
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._requests < requests:
+                    wait = (requests - self._requests) * 60 / self.rpm
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            self._requests -= requests
+            self._tokens -= tokens
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """
+        Correct the token bucket after a call.
+
+        Args:
+            estimated (int): Tokens taken by acquire()
+            actual (int): Tokens the call really used
+        """
+        if self.tpm:
+            self._tokens -= actual - estimated
+
+
+def read_rows(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (key, row) pairs one at a time from a JSONL or CSV file.
+
+    Args:
+        path (str): Input path; "-" reads JSONL from stdin
+
+    Returns:
+        Iterator[Tuple[str, Dict[str, Any]]]: The row id (or row number) and the row
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for number, row in enumerate(csv.DictReader(f)):
+                yield str(row.get("id") or number), row
+        return
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        number = 0
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            yield str(row.get("id") or number), row
+            number += 1
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    Return the keys of rows already answered in an output file.
+
+    Args:
+        path (str): Output JSONL written by an earlier run
+
+    Returns:
+        Set[str]: Keys of the rows without an error
+    """
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by a crash; that row simply runs again
+                continue
+            if record.get("error") is None:
+                done.add(record["key"])
+    return done
+
+
+async def answer(row: Dict[str, Any], chain_name: str, budget: MinuteBudget) -> str:
+    """
+    Run one row through its chain within the budget.
+
+    Args:
+        row (Dict[str, Any]): Input row with country and optional sport
+        chain_name (str): Chain used for rows without a sport
+        budget (MinuteBudget): Shared rate budget
+
+    Returns:
+        str: The answer text
+    """
+    country = str(row["country"]).strip()
+    sport = str(row.get("sport") or "").strip()
+    if sport:
+        # Three calls: country and sport stages, then the final stage that includes both answers
+        calls = 3
+        prompt_tokens = (
+            _template_tokens(SPORTS_MESSAGES) + _template_tokens(SPORT_INFO_MESSAGES)
+            + _template_tokens(FINAL_INFO_MESSAGES) + 2 * DEFAULT_COMPLETION_TOKENS
+        )
+        runnable, inputs = sports_pipeline(), {"country": country, "sport": sport}
+    else:
+        calls = 1
+        prompt_tokens = _template_tokens(SPORTS_MESSAGES)
+        runnable, inputs = CHAINS[chain_name](), {"country": country}
+
+    estimated = prompt_tokens + calls * DEFAULT_COMPLETION_TOKENS
+    await budget.acquire(calls, estimated)
+    result = await runnable.ainvoke(inputs)
+    text = result if isinstance(result, str) else result.content
+    budget.settle(estimated, prompt_tokens + count_tokens(text) * calls)
+    return text
+
+
+async def run(args: argparse.Namespace) -> Dict[str, int]:
+    """
+    Process the input file with a bounded worker pool.
+
+    Returns:
+        Dict[str, int]: Counts of answered, failed and skipped rows
+    """
+    done = load_checkpoint(args.output)
+    budget = MinuteBudget(args.rpm, args.tpm)
+    # Small queue: the reader stays just ahead of the workers instead of loading the file
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * args.concurrency)
+    counts = {"answered": 0, "failed": 0, "skipped": 0}
+    start = time.monotonic()
+
+    async def reader() -> None:
+        for key, row in read_rows(args.input):
+            if key in done:
+                counts["skipped"] += 1
+                continue
+            await queue.put((key, row))
+        for _ in range(args.concurrency):
+            await queue.put(None)
+
+    with open(args.output, "a", encoding="utf-8") as out:
+        async def worker() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                key, row = item
+                record = {"key": key, "country": row.get("country"), "sport": row.get("sport") or None}
+                started = time.monotonic()
+                try:
+                    record["answer"] = await answer(row, args.chain, budget)
+                    record["error"] = None
+                    counts["answered"] += 1
+                except Exception as e:
+                    record["answer"] = None
+                    record["error"] = f"{type(e).__name__}: {e}"
+                    counts["failed"] += 1
+                record["latency_s"] = round(time.monotonic() - started, 3)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                finished = counts["answered"] + counts["failed"]
+                if finished % args.progress_every == 0:
+                    rate = finished / (time.monotonic() - start)
+                    print(f"{finished} rows ({counts['failed']} failed), {rate:.1f} rows/s", file=sys.stderr)
+
+        await asyncio.gather(reader(), *(worker() for _ in range(args.concurrency)))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL or CSV file of countries; - for JSONL on stdin")
+    parser.add_argument("--output", required=True, help="JSONL results, appended to and used as the checkpoint")
+    parser.add_argument("--chain", choices=sorted(CHAINS), default="sports_str", help="chain for rows without a sport")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of async workers")
+    parser.add_argument("--rpm", type=float, help="requests per minute budget")
+    parser.add_argument("--tpm", type=float, help="tokens per minute budget")
+    parser.add_argument("--progress-every", type=int, default=100)
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    counts = asyncio.run(run(args))
+    print(
+        f"Done in {time.monotonic() - start:.1f}s: {counts['answered']} answered, "
+        f"{counts['failed']} failed, {counts['skipped']} already in {args.output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
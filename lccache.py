@@ -0,0 +1,159 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps, loads
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.outputs import Generation
+
+from lcfactory import cached
+
+DEFAULT_CACHE_PATH = ".lc_response_cache.sqlite"
+
+# loads() is marked beta and would warn on every cache hit
+warnings.filterwarnings("ignore", message="The function `loads` is in beta", category=LangChainBetaWarning)
+
+
+class SQLiteResponseCache(BaseCache):
+    """
+    Disk-backed LLM response cache with TTL expiry and LRU size bound.
+
+    LangChain calls lookup/update with the fully rendered prompt (every message of
+    the ChatPromptTemplate) and the llm_string describing the model and its
+    parameters, so two calls share an entry only when both are identical.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: Optional[float] = 24 * 60 * 60,
+        max_entries: int = 10_000,
+    ):
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            path (str): SQLite database file
+            ttl_seconds (Optional[float]): Entry lifetime, None keeps entries forever
+            max_entries (int): Least recently used entries are evicted past this size
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        # Only the cache's own dumps() output is read back, so langchain_core classes suffice
+        return [loads(generation, allowed_objects="core") for generation in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        value = json.dumps([dumps(generation) for generation in return_val])
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and the current number of entries.
+
+        Returns:
+            Dict[str, Any]: hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    def summary(self) -> str:
+        """Return the counters as a one-line, human readable string."""
+        stats = self.stats()
+        return (
+            f"{stats['hits']} hits / {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} cached responses)"
+        )
+
+
+def enable_response_cache(
+    path: str = DEFAULT_CACHE_PATH,
+    ttl_seconds: Optional[float] = 24 * 60 * 60,
+    max_entries: int = 10_000,
+) -> SQLiteResponseCache:
+    """
+    Install the shared response cache as LangChain's global LLM cache.
+
+    Every chat model created without an explicit cache argument consults it, so
+    existing `prompt_template | model | parser` chains need no changes.
+    Safe to call on every Streamlit rerun; the cache is created once per process.
+
+    Returns:
+        SQLiteResponseCache: The installed cache
+    """
+    def build() -> SQLiteResponseCache:
+        cache = SQLiteResponseCache(path, ttl_seconds=ttl_seconds, max_entries=max_entries)
+        set_llm_cache(cache)
+        return cache
+
+    return cached(("response_cache", path), build)
@@ -0,0 +1,198 @@
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+from langchain_core.runnables import RunnableParallel
+from pydantic import BaseModel, Field
+
+from lcfactory import DEFAULT_MODEL, cached, get_chain, get_chat_prompt, get_model, get_structured_model
+from lctokens import token_budget
+
+# Prompts and chains of the Sports-Arena demos, defined once so the Streamlit apps,
+# the benchmarks and the batch tools all run exactly the same chains.
+
+# lcdemo6, lcdemo9 and lcdemo10
+SPORTS_MESSAGES = [
+    ("system", "You are an expert in sports and general knowledge."),
+    ("human", "What are the top 3 most popular sports played in {country}?"),
+]
+
+# lcdemo12
+SPORTS_STREAM_MESSAGES = [
+    ("system", "You are an expert in sports and general knowledge."),
+    ("human", "What are the top 2 most popular sports played in {country}?"),
+]
+
+# lcdemo11: the JSON structure we expect
+SPORTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sports": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "popularity_rank": {"type": "integer"},
+                    "description": {"type": "string"}
+                },
+                "required": ["name", "popularity_rank", "description"]
+            }
+        }
+    },
+    "required": ["sports"]
+}
+
+# lcdemo11 structured output mode: the same structure as typed objects. The schema is sent
+# to the provider as its native response format, so the prompt is just SPORTS_MESSAGES
+class Sport(BaseModel):
+    name: str = Field(description="Name of the sport")
+    popularity_rank: int = Field(description="1 for the most popular sport")
+    description: str = Field(description="One or two sentences about the sport in this country")
+
+
+class SportsAnswer(BaseModel):
+    """The most popular sports played in a country."""
+
+    sports: List[Sport] = Field(description="Sports ordered by popularity_rank")
+
+
+# lcdemo11: prompt template with escaped curly braces for the JSON structure
+SPORTS_JSON_MESSAGES = [
+    ("system", """You are an expert in sports and general knowledge.
+    Provide information about sports in JSON format with the specified structure."""),
+    ("human", """What are the top 3 most popular sports played in {country}?
+    Return the response in the following JSON format:
+    {{
+        "sports": [
+            {{
+                "name": "sport name",
+                "popularity_rank": 1,
+                "description": "brief description"
+            }}
+        ]
+    }}"""),
+]
+
+# lcdemo9stctprmptmpltlceldebug: specific sport information
+SPORT_INFO_MESSAGES = [
+    ("human", """Provide detailed information about {sport} in {country}, including:
+    1. Basic rules
+    2. Major competitions
+    """),
+]
+
+# lcdemo9stctprmptmpltlceldebug: final template combining both country and sport information
+FINAL_INFO_MESSAGES = [
+    ("human", """For {country}:
+    First, list the top 3 sports: {country_sports}
+
+    Then, for each sport mentioned, provide details:
+    {sport_details}
+    """),
+]
+
+# lcdemo14stchatmemory: chat with a running summary of older turns and the recent ones verbatim
+CHAT_MESSAGES = [
+    ("system", """You are an expert in sports and general knowledge, chatting with a user.
+    Summary of the earlier conversation: {summary}"""),
+    ("placeholder", "{history}"),
+    ("human", "{input}"),
+]
+
+# lcmemory: folds turns that leave the recent window into the running summary
+MEMORY_SUMMARY_MESSAGES = [
+    ("system", "You maintain a concise running summary of a conversation between a user and an assistant."),
+    ("human", """Current summary:
+    {summary}
+
+    New lines of conversation:
+    {lines}
+
+    Return the updated summary in at most {max_words} words. Keep names, countries,
+    preferences and facts the user may refer back to; drop small talk."""),
+]
+
+PIPELINE_STAGES = ("country_sports", "sport_details", "final_answer")
+
+# Most tokens of the intermediate stages that are passed on into the final prompt
+STAGE_TOKEN_BUDGETS = {"country_sports": 400, "sport_details": 800}
+
+
+def sports_chain(model: str = DEFAULT_MODEL):
+    """prompt_template | model, returning an AIMessage (lcdemo9)."""
+    return get_chain("sports", SPORTS_MESSAGES, model=model)
+
+
+def sports_str_chain(model: str = DEFAULT_MODEL):
+    """prompt_template | model | StrOutputParser() (lcdemo10)."""
+    return get_chain("sports_str", SPORTS_MESSAGES, StrOutputParser, model=model)
+
+
+def sports_json_chain(model: str = DEFAULT_MODEL):
+    """prompt_template | model | JsonOutputParser (lcdemo11)."""
+    return get_chain(
+        "sports_json", SPORTS_JSON_MESSAGES,
+        lambda: JsonOutputParser(pydantic_object=SPORTS_SCHEMA),
+        model=model,
+    )
+
+
+def sports_json_text_chain(model: str = DEFAULT_MODEL):
+    """The lcdemo11 prompt returning raw text, for incremental JSON parsing."""
+    return get_chain("sports_json_text", SPORTS_JSON_MESSAGES, StrOutputParser, model=model)
+
+
+def sports_structured_chain(model: str = DEFAULT_MODEL):
+    """prompt_template | model with native structured output, returning a SportsAnswer (lcdemo11)."""
+    return cached(
+        ("chain", "sports_structured", model),
+        lambda: get_chat_prompt(SPORTS_MESSAGES) | get_structured_model(SportsAnswer, model),
+    )
+
+
+def sports_stream_chain(model: str = DEFAULT_MODEL):
+    """Streaming prompt_template | model (lcdemo12)."""
+    return get_chain("sports_stream", SPORTS_STREAM_MESSAGES, model=model, streaming=True)
+
+
+def chat_chain(model: str = DEFAULT_MODEL):
+    """Streaming prompt_template | model | StrOutputParser() taking summary, history and input (lcdemo14)."""
+    return get_chain("chat", CHAT_MESSAGES, StrOutputParser, model=model, streaming=True)
+
+
+def memory_summary_chain(model: str = DEFAULT_MODEL):
+    """prompt_template | model | StrOutputParser() updating a conversation summary (lcmemory)."""
+    return get_chain("memory_summary", MEMORY_SUMMARY_MESSAGES, StrOutputParser, model=model)
+
+
+def sports_pipeline(model: str = DEFAULT_MODEL, stage_budgets: Optional[Dict[str, int]] = None):
+    """
+    Three-stage pipeline of lcdemo9stctprmptmpltlceldebug.
+
+    The country and sport stages are independent, so RunnableParallel runs them
+    concurrently; the final stage starts once both are done and can stream.
+    Each stage ends in StrOutputParser so only message text, not the repr of
+    whole AIMessage objects, reaches the final prompt, and that text is cut to
+    the stage's token budget (STAGE_TOKEN_BUDGETS unless stage_budgets is given).
+    """
+    budgets = STAGE_TOKEN_BUDGETS if stage_budgets is None else stage_budgets
+
+    def stage(messages, name, llm):
+        chain = get_chat_prompt(messages) | llm | StrOutputParser()
+        if budgets.get(name):
+            chain = chain | token_budget(budgets[name], model)
+        return chain.with_config(run_name=name)
+
+    def build():
+        llm = get_model(model)
+        country_chain = stage(SPORTS_MESSAGES, "country_sports", llm)
+        sport_chain = stage(SPORT_INFO_MESSAGES, "sport_details", llm)
+        final_chain = stage(FINAL_INFO_MESSAGES, "final_answer", llm)
+        return RunnableParallel(
+            country=itemgetter("country"),
+            country_sports=country_chain,
+            sport_details=sport_chain,
+        ) | final_chain
+
+    return cached(("pipeline", "sports", model, tuple(sorted(budgets.items()))), build)
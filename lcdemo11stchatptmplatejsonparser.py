@@ -1,62 +1,70 @@
-import os
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 import streamlit as st
-from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 from typing import List, Dict
+from lcchains import SPORTS_SCHEMA, sports_json_chain, sports_json_text_chain, sports_structured_chain
+from lccache import enable_response_cache
+from lcjsonstream import JsonItemStream
+from lcsingleflight import FLIGHTS, coalesce
 
-# Load environment variables from .env file
-load_dotenv()
+# Repeated questions are answered from the on-disk response cache
+response_cache = enable_response_cache()
 
-# Get the secret key using getenv function
-secret_key = os.getenv('OPENAI_API_KEY')
+st.title("Sports-Arena with JSON Output")
+given_country = st.text_input("Enter the country name:")
 
-model = ChatOpenAI(model = "gpt-4o-mini", api_key = secret_key)
+# The JSON schema and the prompt template (with escaped curly braces for the JSON
+# structure) are defined in lcchains.py as SPORTS_SCHEMA and SPORTS_JSON_MESSAGES;
+# the structured output mode uses the SportsAnswer model and the plain SPORTS_MESSAGES
 
-# Define the JSON structure we expect
-parser = JsonOutputParser(pydantic_object={
-    "type": "object",
-    "properties": {
-        "sports": {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string"},
-                    "popularity_rank": {"type": "integer"},
-                    "description": {"type": "string"}
-                },
-                "required": ["name", "popularity_rank", "description"]
-            }
-        }
-    },
-    "required": ["sports"]
-})
+STRUCTURED = "Structured output (schema sent to the API, typed result)"
+STREAMED = "Show each sport as soon as it arrives"
+PROMPTED = "JSON example in the prompt + JsonOutputParser"
+mode = st.radio("Output mode", [STRUCTURED, STREAMED, PROMPTED])
 
-st.title("Sports-Arena with JSON Output")
-given_country = st.text_input("Enter the country name:")
+def show_sport(sport):
+    # printing each sport with name, rank and description in presentable way in the UI
+    with st.expander(f"{sport['name']} (Rank: {sport['popularity_rank']})", expanded=True):
+        st.write(sport['description'])
+
+if given_country and mode == STRUCTURED:
+    # The provider is given SportsAnswer's JSON schema as its response format (strict mode),
+    # so the prompt carries no JSON example and the reply always matches the schema; it is
+    # validated straight into SportsAnswer/Sport objects instead of parsed from free text
+    chain = coalesce(sports_structured_chain("gpt-4o-mini"), "sports_structured")
+    try:
+        answer = chain.invoke({"country": given_country})
+        st.subheader(f"Popular Sports in {given_country}")
+        for sport in sorted(answer.sports, key=lambda sport: sport.popularity_rank):
+            show_sport(sport.model_dump())
+        st.caption(f"Response cache: {response_cache.summary()} · In-flight sharing: {FLIGHTS.summary()}")
+    except Exception as e:
+        # Left for refusals or a reply cut off by the token limit
+        st.error(f"Error getting structured response: {str(e)}")
+
+elif given_country and mode == STREAMED:
+    # Stream the raw JSON text; JsonItemStream emits each "sports" item as soon as its
+    # closing brace arrives and validates it against SPORTS_SCHEMA. Sessions streaming the
+    # same country at the same moment share one upstream stream (late joiners replay it)
+    chain = coalesce(sports_json_text_chain("gpt-4o-mini"), "sports_json_text")
+    st.subheader(f"Popular Sports in {given_country}")
+
+    items = JsonItemStream("sports", SPORTS_SCHEMA)
+    with st.spinner("Waiting for the first sport..."):
+        for chunk in chain.stream({"country": given_country}):
+            for sport in items.feed(chunk):
+                show_sport(sport)
 
-# Modified prompt template with escaped curly braces for the JSON structure
-prompt_template = ChatPromptTemplate.from_messages([
-    ("system", """You are an expert in sports and general knowledge. 
-    Provide information about sports in JSON format with the specified structure."""),
-    ("human", """What are the top 3 most popular sports played in {country}? 
-    Return the response in the following JSON format:
-    {{
-        "sports": [
-            {{
-                "name": "sport name",
-                "popularity_rank": 1,
-                "description": "brief description"
-            }}
-        ]
-    }}"""),
-])
+    # Salvage whatever is still valid if the JSON was truncated or malformed
+    for sport in items.finish():
+        show_sport(sport)
+    if items.rejected:
+        st.warning(f"Skipped {len(items.rejected)} malformed entries: {[r['errors'] for r in items.rejected]}")
+    if not items.items:
+        st.error(f"Error parsing response: {items.error or 'no valid sports found'}")
 
-if given_country:
-    # Chain the prompt template with the model and JSON parser
-    chain = prompt_template | model | parser
+elif given_country:
+    # Chain the prompt template with the model and JSON parser, built once per process,
+    # with identical concurrent requests coalesced into one call
+    chain = coalesce(sports_json_chain("gpt-4o-mini"), "sports_json")
     
     try:
         response = chain.invoke({"country": given_country})
@@ -66,6 +74,7 @@ if given_country:
 
         # print the response in JSON Format in the browser using Streamlit
         st.write(response)
+        st.caption(f"Response cache: {response_cache.summary()} · In-flight sharing: {FLIGHTS.summary()}")
         
         # printing eachsport with name, rank and description in presentable way in the UI
         # for sport in response["sports"]:
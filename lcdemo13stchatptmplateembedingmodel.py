@@ -1,25 +1,37 @@
-import os
-from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
+from lcembedding import EmbeddingPipeline
+from lcfactory import get_embeddings, load_env
+from lcvectorindex import NumpyVectorIndex
 
 # Load environment variables from .env file
-load_dotenv()
+load_env()
 
-# Get the secret key using getenv function
-secret_key = os.getenv('OPENAI_API_KEY')
-
-embedding_model = OpenAIEmbeddings(model="text-embedding-3-small", api_key=secret_key)
-vectors = embedding_model.embed_documents("What are the top 2 most popular sports played in India")
-# print(len(vectors))
-# print(len(vectors[0]))
-
-embedded_query = embedding_model.embed_query("What was the country name mentioned in the conversation?")
-print(embedded_query[:5])
- 
+# text-embedding-3-small with OPENAI_API_KEY (or the local fake when LC_FAKE_MODELS=1)
+embedding_model = get_embeddings("text-embedding-3-small")
 
+# The pipeline batches and deduplicates texts and keeps vectors in an on-disk cache,
+# so re-running this script does not embed unchanged text again
+pipeline = EmbeddingPipeline(embedding_model)
 
+# embed_documents expects a list of texts (a bare string would be embedded character by character)
+vectors = pipeline.embed_documents(["What are the top 2 most popular sports played in India"])
+# print(vectors.shape)
 
+embedded_query = pipeline.embed_query("What was the country name mentioned in the conversation?")
+print(embedded_query[:5])
 
-   
-    
-
+# Search the embedded documents with the in-process vector index (cosine similarity)
+index = NumpyVectorIndex(embedder=pipeline)
+index.add_texts([
+    "What are the top 2 most popular sports played in India",
+    "Cricket is the most followed sport in India",
+    "Basketball and American Football dominate in the USA",
+    "Football is a national passion in Brazil",
+])
+for text, score in index.similarity_search("Which sports do Indians love?", k=2):
+    print(f"{score:.3f}  {text}")
+
+# index.save(".lc_vector_index") writes the vectors so NumpyVectorIndex.load can memory-map them later
+# For millions of vectors, lcquantized.QuantizedVectorIndex(mode="int8" or "binary") has the same
+# interface and keeps 1 byte (int8) or 1 bit (binary) per dimension, rescoring the best candidates exactly
+
+print(f"Embedded {pipeline.embedded_texts} new texts, reused {pipeline.cached_texts} cached vectors")
@@ -0,0 +1,53 @@
+import uuid
+
+import streamlit as st
+from lcchains import chat_chain
+from lcmemory import ConversationRunnable, SummarizingMemory, get_history_store
+from lcstreaming import StreamRenderer
+
+# Chat with memory: the last few messages are sent verbatim, older ones are folded into a
+# running summary, and the whole history is kept per session in .lc_chat_memory.sqlite.
+# Prompt size per turn is capped, so a long conversation answers as fast as a short one.
+
+st.title("Sports-Arena Chat")
+
+# One history per browser session; ?session=<id> in the URL resumes an earlier one
+if "chat_session_id" not in st.session_state:
+    session_id = st.query_params.get("session") or uuid.uuid4().hex
+    # A resumed session shows the messages still kept verbatim; older ones live on in the summary
+    _, _, kept = get_history_store().load(session_id)
+    st.session_state["chat_session_id"] = session_id
+    st.session_state["chat_messages"] = [("user" if m.role == "human" else "assistant", m.content) for m in kept]
+session_id = st.session_state["chat_session_id"]
+
+# chat_chain() is CHAT_MESSAGES | streaming model | StrOutputParser() (see lcchains.py), built once per process
+chat = ConversationRunnable(chat_chain("gpt-4o-mini"))
+config = {"configurable": {"session_id": session_id}}
+
+for role, text in st.session_state["chat_messages"]:
+    with st.chat_message(role):
+        st.markdown(text)
+
+question = st.chat_input("Ask about sports in any country")
+if question:
+    with st.chat_message("user"):
+        st.markdown(question)
+    with st.chat_message("assistant"):
+        renderer = StreamRenderer(st.empty())
+        answer = renderer.render(chat.stream({"input": question}, config))
+    st.session_state["chat_messages"] += [("user", question), ("assistant", answer)]
+
+with st.sidebar:
+    memory = SummarizingMemory(session_id)
+    summary = memory.load()["summary"]
+    stats = memory.store.stats(session_id)
+    st.caption(f"Session {session_id[:8]}")
+    st.metric("Messages kept verbatim", stats["messages"])
+    st.metric("Messages folded into the summary", stats["folded"])
+    st.metric("History + summary tokens", stats["history_tokens"] + stats["summary_tokens"])
+    with st.expander("Running summary"):
+        st.write(summary)
+    if st.button("Forget this conversation"):
+        memory.clear()
+        st.session_state["chat_messages"] = []
+        st.rerun()
@@ -1,24 +1,24 @@
-import os
-from langchain_openai import ChatOpenAI
 import streamlit as st
-from dotenv import load_dotenv
+from lcfactory import get_model
+from lcgating import session_gate, streamlit_tick
 
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Get the secret key using getenv function
-secret_key = os.getenv('OPENAI_API_KEY')
-
-model = ChatOpenAI(model = "gpt-4o-mini", api_key = secret_key )
+# The .env file is loaded (OPENAI_API_KEY) and the client is built on first use,
+# once per process, so reruns skip both
+model = get_model("gpt-4o-mini")
 
 st.title("Gen AI - Sample app")
 prompt = st.text_input("Please ask your question")
 
-response = model.invoke(prompt)
+# The gate skips the call for an empty box (the first run) and for unchanged text (reruns
+# caused by other widgets), waits for rapid edits to settle, and drops the request when a
+# newer question is committed while it is still waiting
+gate = session_gate("question")
+response = gate.run(prompt, model.invoke, tick=streamlit_tick())
 
-# print the response on the browser using streamlit
-st.write(response)
+if response is not None:
+    # print the response on the browser using streamlit
+    st.write(response)
+    st.caption(gate.summary())
 
-# Comment line number 23, and execute the below, observe the response in the browser
+# Comment the st.write(response) line above, and execute the below, observe the response in the browser
 # st.write(response.content)
\ No newline at end of file
@@ -1,27 +1,22 @@
-import os
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 import streamlit as st
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
+from lcfactory import cached, get_model
+from lcfasttemplate import CompiledPromptTemplate
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Get the secret key using getenv function
-secret_key = os.getenv('OPENAI_API_KEY')
-
-model = ChatOpenAI(model = "gpt-4o-mini", api_key = secret_key )
+# The .env file is loaded and the client is built once per process, not on every rerun
+model = get_model("gpt-4o-mini")
 
 st.title("Sports-Arena")
 country = st.text_input("Enter the country name:")
 
-prompt_template = PromptTemplate(
+# Parsed once into a segment list; format() then only fills in {country} and joins
+prompt_template = cached(("prompt", "lcdemo4"), lambda: CompiledPromptTemplate.from_prompt(PromptTemplate(
     input_variables=["country"],
     template="""
     You are an expert in GK.
     Answer the question: What are the three top sports palyed in {country}?
     """
-)
+)))
 
 if country:
     response = model.invoke(prompt_template.format(country=country))
@@ -1,24 +1,18 @@
-import os
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 import streamlit as st
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
+from lcfactory import cached, get_model
+from lcfasttemplate import CompiledPromptTemplate
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Get the secret key using getenv function
-secret_key = os.getenv('OPENAI_API_KEY')
-
-model = ChatOpenAI(model = "gpt-4o-mini", api_key = secret_key )
+# The .env file is loaded and the client is built once per process, not on every rerun
+model = get_model("gpt-4o-mini")
 
 st.title("Sports-Arena")
 # country1 = st.text_input("Enter the First country name:")
 country2 = st.text_input("Enter the country name that you campare with India:")
 year = st.text_input("Enter the year:")
 
-# Prompt template
-prompt_template = PromptTemplate(
+# Prompt template, compiled once: the country1="India" partial is folded into the text
+prompt_template = cached(("prompt", "lcdemo5"), lambda: CompiledPromptTemplate.from_prompt(PromptTemplate(
     input_variables=["country1","country2",  "year"],
     template="""
     You are an expert in GK.
@@ -27,7 +21,7 @@ prompt_template = PromptTemplate(
     partial_variables={
         "country1" : "India"
     }
-)
+)))
 
 if country2 and year:
     response = model.invoke(prompt_template.format(country2=country2, year = year))
@@ -1,28 +1,35 @@
-import os
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 import streamlit as st
-from langchain.prompts import ChatPromptTemplate
+from lcfactory import get_compiled_chat_prompt, get_model
+from lcchains import SPORTS_MESSAGES
+from lccache import enable_response_cache
+from lcgating import session_gate, streamlit_tick
+from lcsingleflight import FLIGHTS, request_key
 
-# Load environment variables from .env file
-load_dotenv()
+# The .env file is loaded and the client is built once per process, not on every rerun
+model = get_model("gpt-4o-mini")
 
-# Get the secret key using getenv function
-secret_key = os.getenv('OPENAI_API_KEY')
-
-model = ChatOpenAI(model = "gpt-4o-mini", api_key = secret_key)
+# Repeated questions are answered from the on-disk response cache
+response_cache = enable_response_cache()
 
 st.title("Sports-Arena")
 given_country = st.text_input("Enter the country name:")
 
-prompt_template = ChatPromptTemplate.from_messages([
-    ("system", "You are an expert in sports and general knowledge."),
-    ("human", "What are the top 3 most popular sports played in {country}?"),
-])
+# System and human messages are defined once in lcchains.SPORTS_MESSAGES and compiled
+# once, so format_messages() only joins the text around {country}
+prompt_template = get_compiled_chat_prompt(SPORTS_MESSAGES)
+
 
-if given_country:
+def ask(country):
     # Format the prompt with the country
-    formatted_prompt = prompt_template.format_messages(country=given_country)
-    # Invoke the model with the formatted prompt
-    response = model.invoke(formatted_prompt)
+    formatted_prompt = prompt_template.format_messages(country=country)
+    # Invoke the model with the formatted prompt; sessions asking for the same country
+    # at the same moment wait for one shared call instead of each calling the API
+    return FLIGHTS.do(request_key("lcdemo6", country), lambda: model.invoke(formatted_prompt))
+
+
+# Empty or unchanged input makes no call; rapid edits are debounced and superseded ones dropped
+gate = session_gate("country")
+response = gate.run(given_country, ask, tick=streamlit_tick())
+if response is not None:
     st.write(response.content)
+    st.caption(f"Response cache: {response_cache.summary()} · In-flight sharing: {FLIGHTS.summary()} · {gate.summary()}")
@@ -1,23 +1,48 @@
 
-from langchain.schema.runnable import Runnable
-from langchain.schema.runnable.config import RunnableConfig
-import streamlit as st
+from typing import AsyncIterator, Iterable, Iterator
+from langchain_core.runnables import Runnable, RunnableConfig
+from lcbatching import DEFAULT_CHUNK_SIZE, acollect, arun_batched, get_max_concurrency, run_batched
 
 class GreetingRunnable(Runnable):
-    def __init__(self):
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
         self.config = RunnableConfig(max_tokens=50, temperature=0.7)
+        self.chunk_size = chunk_size
 
-    def invoke(self, input: dict, config: RunnableConfig = None) -> str:
-        country = input.get("country", "User") 
+    @staticmethod
+    def _greet(input: dict) -> str:
+        country = input.get("country", "User")
         return f"You wish to check the sports of this, {country}!"
 
-    def batch(self, inputs: list, config: RunnableConfig = None) -> list:
-        return [self.invoke(input) for input in inputs]
+    def invoke(self, input: dict, config: RunnableConfig = None) -> str:
+        return self._greet(input)
+
+    async def ainvoke(self, input: dict, config: RunnableConfig = None, **kwargs) -> str:
+        # Pure CPU work: answering inline is cheaper than hopping to a worker thread
+        return self._greet(input)
+
+    def batch_iter(self, inputs: Iterable[dict], config: RunnableConfig = None, *, return_exceptions: bool = False) -> Iterator[str]:
+        # Lazily yields greetings in input order, one chunk in memory at a time
+        return run_batched(self._greet, inputs, get_max_concurrency(config), self.chunk_size, return_exceptions)
+
+    def batch(self, inputs: list, config: RunnableConfig = None, *, return_exceptions: bool = False, **kwargs) -> list:
+        return list(self.batch_iter(inputs, config, return_exceptions=return_exceptions))
 
-    def stream(self, input: dict, config: RunnableConfig = None):
-        yield self.invoke(input)
+    def abatch_iter(self, inputs: Iterable[dict], config: RunnableConfig = None, *, return_exceptions: bool = False) -> AsyncIterator[str]:
+        return arun_batched(self._greet, inputs, get_max_concurrency(config), self.chunk_size, return_exceptions)
+
+    async def abatch(self, inputs: list, config: RunnableConfig = None, *, return_exceptions: bool = False, **kwargs) -> list:
+        return await acollect(self.abatch_iter(inputs, config, return_exceptions=return_exceptions))
+
+    def stream(self, input: dict, config: RunnableConfig = None, **kwargs):
+        yield self._greet(input)
+
+    async def astream(self, input: dict, config: RunnableConfig = None, **kwargs):
+        yield self._greet(input)
 
 def main():
+    # Imported here so the benchmarks can import GreetingRunnable without loading Streamlit
+    import streamlit as st
+
     st.title("Sports-Arena")
     country = st.text_input("Enter your country:")
     if country:
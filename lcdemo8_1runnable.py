@@ -1,52 +1,50 @@
-from langchain.schema.runnable import Runnable
-from typing import Dict, List, Generator, Any, Optional, Union
-import streamlit as st
+from langchain_core.runnables import Runnable
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Generator, Any, Optional, Union
 from datetime import datetime
 import logging
+import time
+from lcbatching import DEFAULT_CHUNK_SIZE, acollect, arun_batched, get_max_concurrency, run_batched
+from lcsportsdata import SportsDataStore, load_store
+from lctracing import tracing_requested
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _log_batch(count: int, seconds: float) -> None:
+    per_item = seconds / count * 1e6 if count else 0.0
+    logger.info(f"Processed batch of {count} requests in {seconds * 1000:.1f} ms ({per_item:.2f} us/request)")
+
+
 class SportsRunnable(Runnable):
     """
     A Runnable interface implementation for sports information processing.
     Handles queries about popular sports in different countries.
     """
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None, store: Optional[SportsDataStore] = None):
         """
         Initialize the SportsRunnable with configuration and sports data.
         
         Args:
             config (Optional[Dict[str, Any]]): Configuration parameters
+                (max_concurrency and chunk_size control batch processing)
+            store (Optional[SportsDataStore]): Sports data, defaults to the shared
+                store loaded once per process from sports_data.json
         """
         self.config = {
             "max_tokens": 50,
             "temperature": 0.7,
+            "max_concurrency": None,
+            "chunk_size": DEFAULT_CHUNK_SIZE,
             **(config or {})
         }
         
-        # Expanded sports data dictionary
-        self.sports_data = {
-            "USA": {
-                "sports": ["Basketball", "American Football", "Baseball"],
-                "national_sport": "Baseball",
-                "popular_leagues": ["NBA", "NFL", "MLB"]
-            },
-            "India": {
-                "sports": ["Cricket", "Hockey", "Football"],
-                "national_sport": "Hockey",
-                "popular_leagues": ["IPL", "ISL", "Hockey India League"]
-            },
-            "Brazil": {
-                "sports": ["Football", "Volleyball", "Formula 1"],
-                "national_sport": "Football",
-                "popular_leagues": ["Brasileirão", "Superliga", "Stock Car Brasil"]
-            }
-        }
+        # Shared, read-only sports data indexed by normalized country name
+        self.sports_data = store if store is not None else load_store()
         
-        logger.info("SportsRunnable initialized successfully")
+        logger.debug("SportsRunnable initialized successfully")
 
     def _validate_input(self, country: str) -> tuple[bool, str]:
         """
@@ -61,6 +59,9 @@ class SportsRunnable(Runnable):
         if not country:
             return False, "Please provide a country name."
         if country not in self.sports_data:
+            suggestions = self.sports_data.suggest(country)
+            if suggestions:
+                return False, f"No sports data available for {country}. Did you mean {' or '.join(suggestions)}?"
             return False, f"No sports data available for {country}. Please try another country."
         return True, ""
 
@@ -75,6 +76,25 @@ class SportsRunnable(Runnable):
         Returns:
             str: Formatted response with sports information
         """
+        start = time.perf_counter()
+        if tracing_requested(config):
+            # Only pay for callback bookkeeping when a tracer or handler is listening
+            response = self._call_with_config(self._respond, input, config, run_type="chain")
+        else:
+            response = self._respond(input)
+        logger.info(f"Processed request for country: {input.get('country', '')} in {(time.perf_counter() - start) * 1000:.3f} ms")
+        return response
+
+    def _respond(self, input: Dict[str, str]) -> str:
+        """
+        Build the response for one input without per-request logging.
+        
+        Args:
+            input (Dict[str, str]): Input dictionary containing country name
+            
+        Returns:
+            str: Formatted response, or the validation/error message
+        """
         try:
             country = input.get("country", "").strip()
             is_valid, message = self._validate_input(country)
@@ -82,25 +102,122 @@ class SportsRunnable(Runnable):
             if not is_valid:
                 return message
             
-            country_data = self.sports_data[country]
-            sports_list = ", ".join(country_data["sports"])
+            country_data = self.sports_data.get(country)
+            sports_list = ", ".join(country_data.sports)
             
-            response = (
-                f"Popular sports in {country}:\n"
+            return (
+                f"Popular sports in {country_data.name}:\n"
                 f"• Main sports: {sports_list}\n"
-                f"• National sport: {country_data['national_sport']}\n"
-                f"• Popular leagues: {', '.join(country_data['popular_leagues'])}"
+                f"• National sport: {country_data.national_sport}\n"
+                f"• Popular leagues: {', '.join(country_data.popular_leagues)}"
             )
             
-            logger.info(f"Successfully processed request for country: {country}")
-            return response
-            
         except Exception as e:
             logger.error(f"Error processing request: {str(e)}")
             return f"Error processing request: {str(e)}"
 
+    async def ainvoke(self, input: Dict[str, str], config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> str:
+        """
+        Process a single input request asynchronously.
+        
+        The lookup is pure CPU work, so it runs inline instead of in a worker thread.
+        """
+        return self.invoke(input, config)
+
+    def batch_iter(
+        self,
+        inputs: Iterable[Dict[str, str]],
+        config: Optional[Dict[str, Any]] = None,
+        *,
+        return_exceptions: bool = False
+    ) -> Iterator[Union[str, Exception]]:
+        """
+        Lazily process many inputs, yielding responses in input order.
+        
+        Only one chunk of inputs is held at a time, so generators of any length
+        (e.g. 100k country queries) are processed in bounded memory.
+        
+        Args:
+            inputs (Iterable[Dict[str, str]]): Input dictionaries, may be a generator
+            config (Optional[Dict[str, Any]]): Optional override of max_concurrency
+            return_exceptions (bool): Yield exceptions instead of raising them
+            
+        Yields:
+            str: Formatted response for each input
+        """
+        max_concurrency = get_max_concurrency(config, self.config["max_concurrency"])
+        return run_batched(self._respond, inputs, max_concurrency, self.config["chunk_size"], return_exceptions)
+
+    def batch(
+        self,
+        inputs: List[Dict[str, str]],
+        config: Optional[Dict[str, Any]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        Process a list of inputs in one pass, logging a single summary line.
+        
+        Args:
+            inputs (List[Dict[str, str]]): Input dictionaries
+            config (Optional[Dict[str, Any]]): Optional override of max_concurrency
+            return_exceptions (bool): Return exceptions in place of responses instead of raising them
+            
+        Returns:
+            List[str]: Formatted responses in input order
+        """
+        start = time.perf_counter()
+        responses = list(self.batch_iter(inputs, config, return_exceptions=return_exceptions))
+        _log_batch(len(responses), time.perf_counter() - start)
+        return responses
+
+    def abatch_iter(
+        self,
+        inputs: Iterable[Dict[str, str]],
+        config: Optional[Dict[str, Any]] = None,
+        *,
+        return_exceptions: bool = False
+    ) -> AsyncIterator[Union[str, Exception]]:
+        """
+        Async counterpart of batch_iter, yielding to the event loop between chunks.
+        """
+        max_concurrency = get_max_concurrency(config, self.config["max_concurrency"])
+        return arun_batched(self._respond, inputs, max_concurrency, self.config["chunk_size"], return_exceptions)
+
+    async def abatch(
+        self,
+        inputs: List[Dict[str, str]],
+        config: Optional[Dict[str, Any]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any
+    ) -> List[str]:
+        """
+        Async counterpart of batch.
+        """
+        start = time.perf_counter()
+        responses = await acollect(self.abatch_iter(inputs, config, return_exceptions=return_exceptions))
+        _log_batch(len(responses), time.perf_counter() - start)
+        return responses
+
+    def stream(self, input: Dict[str, str], config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Iterator[str]:
+        """
+        Stream the response; it is produced in one piece.
+        """
+        yield self.invoke(input, config)
+
+    async def astream(self, input: Dict[str, str], config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Async counterpart of stream.
+        """
+        yield self.invoke(input, config)
+
 def main():
     """Main Streamlit application"""
+    # Imported here so the benchmarks can import SportsRunnable without loading Streamlit
+    import streamlit as st
+
     try:
         st.set_page_config(
             page_title="Sports Arena",
@@ -116,10 +233,13 @@ def main():
             st.markdown("""
             This app provides information about popular sports in different countries.
             Currently supported countries:
-            - 🇺🇸 USA
-            - 🇮🇳 India
-            - 🇧🇷 Brazil
             """)
+            store = load_store()
+            st.markdown("\n".join(
+                f"- {store.get(name).flag} {name}" for name in store.names[:20]
+            ))
+            if len(store) > 20:
+                st.caption(f"...and {len(store) - 20} more")
         
         # Create two columns for input and results
         col1, col2 = st.columns([1, 2])
@@ -1,4 +1,5 @@
 from langchain_core.runnables import RunnableLambda, RunnableParallel
+from lcvectorized import VectorizedLambda
 
 
 
@@ -13,4 +14,16 @@ print(batchresult)
 # Batch: By default, batch runs invoke() in parallel using a thread pool executor
 
 # Async: Methods with “a” suffix are asynchronous. 
-# By default, they execute the sync counterpart using asyncio’s thread pool.
\ No newline at end of file
+# By default, they execute the sync counterpart using asyncio’s thread pool.
+
+# Vectorized batch - Snippet2
+# RunnableLambda.batch above calls the lambda once per input, each with its own config and
+# callback run. VectorizedLambda's function receives the whole batch (here as a NumPy array)
+# and is called once per chunk of up to 65536 inputs, so a million inputs are a few calls.
+# It composes with '|' like RunnableLambda; consecutive vectorized steps are fused into one.
+vectorized1 = VectorizedLambda(lambda xs: xs + 1, as_array=True)
+print(vectorized1.invoke(1))
+print(vectorized1.batch([2, 3]))
+sequence2 = vectorized1 | VectorizedLambda(lambda xs: xs * 4, as_array=True)
+print(sequence2.batch(list(range(1_000_000)))[:5])
+# python lcbench_vectorized.py compares both at 1M inputs
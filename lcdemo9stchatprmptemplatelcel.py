@@ -1,31 +1,26 @@
-import os
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 import streamlit as st
-from langchain.prompts import ChatPromptTemplate
+from lcchains import sports_chain
+from lccache import enable_response_cache
+from lcgating import session_gate, streamlit_tick
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Get the secret key using getenv function
-secret_key = os.getenv('OPENAI_API_KEY')
-
-model = ChatOpenAI(model = "gpt-4o-mini", api_key = secret_key)
+# Repeated questions are answered from the on-disk response cache
+response_cache = enable_response_cache()
 
 st.title("Sports-Arena")
 given_country = st.text_input("Enter the country name:")
 
-prompt_template = ChatPromptTemplate.from_messages([
-    ("system", "You are an expert in sports and general knowledge."),
-    ("human", "What are the top 3 most popular sports played in {country}?"),
-])
+# Empty or unchanged input makes no call; rapid edits are debounced and superseded ones dropped
+gate = session_gate("country")
 
 if given_country:
     # Chains are easily reusable components linked together.
     # Chains encode a sequence of calls to components like models, document retrievers, other Chains, etc., 
     # and provide a simple interface to this sequence.
+    # sports_chain() is prompt_template | model (see lcchains.py), built once per process.
     
-    chain = prompt_template | model
-    response = chain.invoke({"country": given_country})
+    chain = sports_chain("gpt-4o-mini")
+    response = gate.run(given_country, lambda country: chain.invoke({"country": country}), tick=streamlit_tick())
 
-    st.write(response.content)
+    if response is not None:
+        st.write(response.content)
+        st.caption(f"Response cache: {response_cache.summary()} · {gate.summary()}")
@@ -1,73 +1,101 @@
-from langchain_openai import ChatOpenAI
+import json
+import uuid
+
 import streamlit as st
-from langchain.prompts import ChatPromptTemplate
 import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Get the secret key using getenv function
-secret_key = os.getenv('OPENAI_API_KEY')
-
-model = ChatOpenAI(model = "gpt-4o-mini", api_key = secret_key)
-
-# First ChatPromptTemplate for country-specific sports
-country_sports_template = ChatPromptTemplate.from_messages([
-    ("system", "You are an expert in sports and general knowledge."),
-    ("human", "What are the top 3 most popular sports played in {country}?"),
-]
-)
-
-# Second ChatPromptTemplate for specific sport information
-sport_info_template = ChatPromptTemplate.from_template(
-    """Provide detailed information about {sport} in {country}, including:
-    1. Basic rules
-    2. Major competitions
-    """
-)
-
-# Final template combining both country and sport information
-final_info_template = ChatPromptTemplate.from_template(
-    """For {country}:
-    First, list the top 3 sports: {country_sports}
-    
-    Then, for each sport mentioned, provide details:
-    {sport_details}
-    """
-)
-
-# Create LCEL chains
-country_chain = country_sports_template | model 
-sport_chain = sport_info_template | model
-final_chain = final_info_template | model
+from lccache import enable_response_cache
+from lcchains import PIPELINE_STAGES, sports_pipeline
+from lcgating import get_prefetcher, normalize_input, streamlit_tick
+from lctokens import TokenUsageTracker
+from lctracing import Tracer
+
+# The three-stage pipeline is defined in lcchains.py:
+#   country_sports: top 3 sports in {country}
+#   sport_details:  rules and major competitions of {sport} in {country}
+#   final_answer:   combines both; starts once the first two (which run in parallel) finish
+# Only message text, cut to each stage's token budget, flows between stages, and the
+# whole graph is built once per process.
+pipeline = sports_pipeline("gpt-4o-mini")
+
+# Once a country is entered, the answers for every sport of the selectbox are computed in
+# the background (two at a time), so picking a sport usually shows its answer at once.
+# The country stage is identical for all of them and is answered from the response cache.
+response_cache = enable_response_cache()
+prefetcher = get_prefetcher("sports_pipeline", max_workers=2)
+
+
+def track_first_chunk(stream, tracer: Tracer):
+    """Yield the final stream unchanged, marking on the tracer when its first chunk arrives."""
+    for chunk in stream:
+        tracer.mark("first_chunk")
+        yield chunk
 
 # Streamlit UI
 def main():
     st.title("Sports Arena")
-    
+
     # Input for country
     country = st.text_input("Enter a country name:")
-    
+
     # Dropdown for sports
     sports_list = ["Select your sport", "Football (Soccer)", "Basketball", "Tennis", "Cricket", "Rugby", "Baseball", "Volleyball", "Ice Hockey", "Golf", "Athletics"]
-    
+
     selected_sport = st.selectbox("Select a sport:", sports_list, index=0)
-    
+
+    country = normalize_input(country)
+    if country:
+        # A new country cancels this session's prefetches still queued for the previous one
+        group = st.session_state.setdefault("prefetch_group", uuid.uuid4().hex)
+        prefetcher.prefetch(
+            group, "sports_pipeline",
+            [{"country": country, "sport": sport} for sport in sports_list[1:] if sport != selected_sport],
+            pipeline.invoke,
+        )
+
+    request = {"country": country, "sport": selected_sport}
+    answer = None
     if country and selected_sport != "Select your sport":
-        with st.spinner(f"Getting sports information..."):
-            # Get country-specific sports and sport details
-            country_sports = country_chain.invoke({"country": country})
-            sport_result = sport_chain.invoke({"sport": selected_sport, "country": country})
-            
-            # Combine results using final chain
-            final_result = final_chain.invoke({
-                "country": country,
-                "country_sports": country_sports,
-                "sport_details": sport_result
-            })
-            
-            st.write(final_result)
+        # A prefetch of this very request that is already running is waited for, not run a second time
+        with st.spinner("Getting sports information..."):
+            answer = prefetcher.wait("sports_pipeline", request, tick=streamlit_tick())
+    if answer is not None:
+        st.write(answer)
+        st.caption(f"Prefetched · {prefetcher.summary()}")
+
+    elif country and selected_sport != "Select your sport":
+        tracer = Tracer()
+        usage = TokenUsageTracker(PIPELINE_STAGES)
+        # Kept across reruns, so it adds up every question asked in this browser session
+        session_usage = st.session_state.setdefault("token_usage", TokenUsageTracker(PIPELINE_STAGES))
+        with st.spinner("Getting sports information..."):
+            # Country sports and sport details run in parallel, then the final answer streams in
+            answer = st.write_stream(track_first_chunk(pipeline.stream(
+                request,
+                config={"callbacks": [tracer, usage, session_usage]},
+            ), tracer))
+        # Choosing this sport again (or any rerun) is answered from the prefetch store
+        prefetcher.put("sports_pipeline", request, answer)
+        st.caption(prefetcher.summary())
+
+        with st.expander("Stage timings"):
+            st.table(tracer.rows(PIPELINE_STAGES))
+            if "first_chunk" in tracer.marks:
+                st.caption(f"First token after {tracer.marks['first_chunk']:.2f}s")
+
+        with st.expander("Trace of every step"):
+            st.dataframe(tracer.rows())
+            st.download_button(
+                "Download Chrome trace",
+                json.dumps(tracer.chrome_trace()),
+                file_name="sports_pipeline_trace.json",
+                mime="application/json",
+            )
+            st.caption("Open in chrome://tracing or ui.perfetto.dev")
+
+        with st.expander("Token usage"):
+            st.table(usage.rows())
+            st.caption(f"This question: {usage.summary()}")
+            st.caption(f"This session: {session_usage.summary()}")
 
 if __name__ == "__main__":
     # Check if OpenAI API key is set
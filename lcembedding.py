@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from lcbatching import iter_chunks
+from lcratelimit import RetryPolicy, RetryingEmbeddings
+
+DEFAULT_CACHE_DIR = ".lc_embedding_cache"
+
+
+def content_hash(text: str) -> str:
+    """Return the SHA-256 hex digest identifying a text in the vector cache."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class VectorCache:
+    """
+    Append-only on-disk store of float32 vectors keyed by content hash.
+
+    Layout of the cache directory:
+        meta.json    {"dim": <vector length>}
+        vectors.f32  row-major float32 matrix, one row per vector
+        keys.txt     one content hash per line, line i describes row i
+
+    vectors.f32 can be opened with np.memmap, so reading cached vectors never
+    loads the whole file into memory.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Open (or create) a cache directory.
+
+        Args:
+            directory (str): Directory holding the cache files
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._keys_path = os.path.join(directory, "keys.txt")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._map: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+            keys: List[str] = []
+            if os.path.exists(self._keys_path):
+                with open(self._keys_path, encoding="utf-8") as f:
+                    keys = f.read().split()
+            # Vectors are written before keys, so a crash can only leave extra vector bytes
+            size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+            stored_rows = size // (4 * self.dim)
+            if stored_rows != len(keys) or size != stored_rows * 4 * self.dim:
+                self._truncate(min(stored_rows, len(keys)), keys)
+            else:
+                self._rows = {key: row for row, key in enumerate(keys)}
+
+    def _truncate(self, rows: int, keys: List[str]) -> None:
+        with open(self._vectors_path, "a+b") as f:
+            f.truncate(rows * 4 * self.dim)
+        with open(self._keys_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{key}\n" for key in keys[:rows])
+        self._rows = {key: row for row, key in enumerate(keys[:rows])}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def add(self, keys: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """
+        Append vectors for content hashes that are not cached yet.
+
+        Args:
+            keys (Sequence[str]): Content hashes
+            vectors (Sequence[Sequence[float]]): One vector per hash
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Vector length {matrix.shape[1]} does not match cache dimension {self.dim}")
+
+            # A hash repeated within one call is stored once, or later rows would be shifted
+            positions = {key: i for i, key in enumerate(keys)}
+            fresh = [positions[key] for key in dict.fromkeys(keys) if key not in self._rows]
+            if not fresh:
+                return
+            with open(self._vectors_path, "ab") as f:
+                np.ascontiguousarray(matrix[fresh]).tofile(f)
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.writelines(f"{keys[i]}\n" for i in fresh)
+            for i in fresh:
+                self._rows[keys[i]] = len(self._rows)
+            self._map = None
+
+    def matrix(self) -> np.ndarray:
+        """Return every cached vector as a read-only (rows, dim) memory map."""
+        if not self._rows:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        mapped = self._map
+        if mapped is None or len(mapped) != len(self._rows):
+            mapped = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(len(self._rows), self.dim))
+            self._map = mapped
+        return mapped
+
+    def get(self, keys: Sequence[str]) -> np.ndarray:
+        """
+        Return the cached vectors for the given hashes, in order.
+
+        Args:
+            keys (Sequence[str]): Content hashes, all of which must be cached
+
+        Returns:
+            np.ndarray: (len(keys), dim) float32 array
+        """
+        rows = [self._rows[key] for key in keys]
+        return np.asarray(self.matrix()[rows])
+
+
+class EmbeddingPipeline:
+    """
+    Batched, cached front end for any LangChain Embeddings model.
+
+    Texts are deduplicated by content hash; only hashes missing from the on-disk
+    VectorCache are sent to the provider, split into batch_size requests that run
+    concurrently and retry with exponential backoff on rate limits and transient
+    errors (via lcratelimit, unless the model already retries). Re-running over
+    unchanged text never calls the provider again.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        batch_size: int = 512,
+        max_concurrency: int = 4,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            embeddings (Embeddings): Provider model, e.g. OpenAIEmbeddings
+            cache_dir (str): Root cache directory; one sub-directory per model
+            batch_size (int): Texts per provider request
+            max_concurrency (int): Provider requests in flight at once
+            max_retries (int): Retries per batch before giving up
+            base_delay (float): First backoff delay in seconds
+            max_delay (float): Backoff ceiling in seconds
+        """
+        if not isinstance(embeddings, RetryingEmbeddings):
+            embeddings = RetryingEmbeddings(embeddings, policy=RetryPolicy(max_retries, base_delay, max_delay))
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        model_name = getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.cache = VectorCache(os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", model_name)))
+        self.embedded_texts = 0
+        self.cached_texts = 0
+
+    def embed_documents(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Embed texts, reusing cached vectors.
+
+        Args:
+            texts (Iterable[str]): Texts to embed
+
+        Returns:
+            np.ndarray: (len(texts), dim) float32 array in input order
+        """
+        texts = list(texts)
+        keys = [content_hash(text) for text in texts]
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self.cache and key not in missing:
+                missing[key] = text
+        self.cached_texts += len(texts) - len(missing)
+
+        if missing:
+            batches = list(iter_chunks(missing.items(), self.batch_size))
+            with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as pool:
+                futures = {pool.submit(self.embeddings.embed_documents, [text for _, text in batch]): batch for batch in batches}
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    self.cache.add([key for key, _ in batch], future.result())
+                    self.embedded_texts += len(batch)
+
+        if not keys:
+            return np.empty((0, self.cache.dim or 0), dtype=np.float32)
+        return self.cache.get(keys)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """
+        Embed a single query, reusing a cached vector when available.
+
+        Args:
+            text (str): Query text
+
+        Returns:
+            np.ndarray: (dim,) float32 vector
+        """
+        # Some providers embed queries differently from documents, so they get their own keys
+        key = "q:" + content_hash(text)
+        if key in self.cache:
+            self.cached_texts += 1
+        else:
+            self.cache.add([key], [self.embeddings.embed_query(text)])
+            self.embedded_texts += 1
+        return self.cache.get([key])[0]
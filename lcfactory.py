@@ -0,0 +1,314 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+# Provider SDKs, dotenv and the prompt classes are imported inside the builders below:
+# importing lcfactory stays cheap, and each app only pays for the clients it builds
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
+
+# Streamlit re-executes the demo script on every interaction, but modules imported
+# by the script stay in sys.modules for the life of the server process.
+# Everything cached here is therefore built once and shared by all reruns and sessions.
+_cache: Dict[Hashable, Any] = {}
+# Guards _cache and _building only; each object is built under its own key's lock
+_lock = threading.Lock()
+_building: Dict[Hashable, threading.Lock] = {}
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+DEFAULT_MAX_RETRIES = 6
+
+# Set by use_fake_models() or the LC_FAKE_MODELS environment variable; when set,
+# get_model/get_embeddings return the deterministic local stand-ins from lcfakes
+_fake_settings: Optional[Dict[str, Any]] = None
+
+
+def cached(key: Hashable, builder: Callable[[], Any]) -> Any:
+    """
+    Return the object stored under key, building it on first use.
+
+    Args:
+        key (Hashable): Cache key identifying the object
+        builder (Callable[[], Any]): Zero-argument callable that builds the object
+
+    Returns:
+        Any: The shared object
+    """
+    try:
+        return _cache[key]
+    except KeyError:
+        pass
+    with _lock:
+        key_lock = _building.setdefault(key, threading.Lock())
+    # Build outside the global lock: other keys are served meanwhile, and builders
+    # may call cached() themselves (get_chain builds its prompt and model)
+    with key_lock:
+        try:
+            return _cache[key]
+        except KeyError:
+            pass
+        value = builder()
+        with _lock:
+            _cache[key] = value
+            _building.pop(key, None)
+        return value
+
+
+def clear_cache() -> None:
+    """Drop every cached client, template and chain."""
+    with _lock:
+        _cache.clear()
+
+
+def _freeze(params: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    return tuple(sorted(params.items()))
+
+
+def use_fake_models(
+    latency: float = 0.2,
+    tokens_per_second: float = 100.0,
+    failure_rate: float = 0.0,
+    seed: int = 0,
+) -> None:
+    """
+    Make every later get_model/get_embeddings call return a local fake.
+
+    Used by the offline benchmarks; clears the cache so no real client survives.
+
+    Args:
+        latency (float): Seconds until the first token (per call for embeddings)
+        tokens_per_second (float): Fake generation speed
+        failure_rate (float): Fraction of calls failing with an injected 429
+        seed (int): Seed of the failure injector
+    """
+    global _fake_settings
+    _fake_settings = {
+        "latency": latency,
+        "tokens_per_second": tokens_per_second,
+        "failure_rate": failure_rate,
+        "seed": seed,
+    }
+    clear_cache()
+
+
+def _fakes_enabled() -> bool:
+    if _fake_settings is None and os.getenv("LC_FAKE_MODELS"):
+        use_fake_models(
+            latency=float(os.getenv("LC_FAKE_LATENCY", "0.2")),
+            tokens_per_second=float(os.getenv("LC_FAKE_TOKENS_PER_SECOND", "100")),
+            failure_rate=float(os.getenv("LC_FAKE_FAILURE_RATE", "0")),
+        )
+    return _fake_settings is not None
+
+
+def load_env() -> None:
+    """Load the .env file once per process."""
+    def load():
+        from dotenv import load_dotenv
+
+        return load_dotenv() or True
+
+    cached(("dotenv",), load)
+
+
+def _limiter(name: str, fake: bool):
+    from lcratelimit import get_rate_limiter
+
+    # The fakes are never capped (LC_RATE_LIMIT_RPS is meant for real quotas);
+    # only their injected 429s slow them down
+    return get_rate_limiter(f"fake:{name}", None) if fake else get_rate_limiter(name)
+
+
+def _with_retries(client: Any, limiter_name: str, retries: int, fake: bool):
+    from lcratelimit import RetryingRunnable, RetryPolicy
+
+    return RetryingRunnable(client, _limiter(limiter_name, fake), RetryPolicy(max_retries=retries))
+
+
+def get_model(model: str = DEFAULT_MODEL, *, retries: int = DEFAULT_MAX_RETRIES, **params: Any):
+    """
+    Return the shared ChatOpenAI client for a model name and parameter set.
+
+    The client is paced by the process-wide rate limiter of the model and
+    retries rate limits and transient errors (see lcratelimit).
+
+    Args:
+        model (str): OpenAI model name
+        retries (int): Retries per call; 0 fails fast (used by the router to fail over)
+        **params: Extra ChatOpenAI keyword arguments (streaming, temperature, ...)
+
+    Returns:
+        RetryingRunnable: ChatOpenAI reused across reruns, so its HTTP connection pool stays warm
+    """
+    load_env()
+    fake = _fakes_enabled()
+
+    def build():
+        if fake:
+            from lcfakes import FakeChatModel
+            client = FakeChatModel(model_name=model, **_fake_settings)
+        else:
+            from langchain_openai import ChatOpenAI
+            # Retries are done by the wrapper, which also tells the limiter about 429s
+            client = ChatOpenAI(model=model, api_key=os.getenv("OPENAI_API_KEY"), max_retries=0, **params)
+        return _with_retries(client, f"openai:{model}", retries, fake)
+
+    return cached(("model", model, retries, _freeze(params)), build)
+
+
+def get_structured_model(
+    schema: Any,
+    model: str = DEFAULT_MODEL,
+    *,
+    method: str = "json_schema",
+    retries: int = DEFAULT_MAX_RETRIES,
+    **params: Any,
+):
+    """
+    Return the shared model returning schema objects through the provider's native structured output.
+
+    The schema is sent as the API's response format (strict JSON schema) or
+    as a tool definition, instead of as an example in the prompt, and the
+    reply is validated into the schema type. It shares the client, rate
+    limiter and retry policy of get_model(model, ...).
+
+    Args:
+        schema (Any): Pydantic model class the answer is parsed into
+        model (str): OpenAI model name
+        method (str): "json_schema" (strict structured outputs) or "function_calling"
+        retries (int): Retries per call, see get_model
+        **params: Extra ChatOpenAI keyword arguments
+
+    Returns:
+        RetryingRunnable: messages -> instance of schema
+    """
+    base = get_model(model, retries=retries, **params)
+
+    def build():
+        from lcratelimit import RetryingRunnable
+
+        structured = base.bound.with_structured_output(schema, method=method, strict=True)
+        return RetryingRunnable(structured, base.limiter, base.policy)
+
+    return cached(("structured_model", schema, model, method, retries, _freeze(params)), build)
+
+
+def get_gemini_model(model: str = "gemini-1.5-flash", *, retries: int = DEFAULT_MAX_RETRIES, **params: Any):
+    """
+    Return the shared ChatGoogleGenerativeAI client for a model name and parameter set.
+
+    Args:
+        model (str): Gemini model name
+        retries (int): Retries per call, see get_model
+        **params: Extra ChatGoogleGenerativeAI keyword arguments
+
+    Returns:
+        RetryingRunnable: ChatGoogleGenerativeAI (a FakeChatModel in fake mode) reused across reruns
+    """
+    load_env()
+    fake = _fakes_enabled()
+
+    def build():
+        if fake:
+            from lcfakes import FakeChatModel
+            client = FakeChatModel(model_name=model, **_fake_settings)
+        else:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            client = ChatGoogleGenerativeAI(model=model, google_api_key=os.getenv("GOOGLE_API_KEY"), max_retries=0, **params)
+        return _with_retries(client, f"gemini:{model}", retries, fake)
+
+    return cached(("gemini", model, retries, _freeze(params)), build)
+
+
+def get_embeddings(model: str = DEFAULT_EMBEDDING_MODEL, **params: Any):
+    """
+    Return the shared OpenAIEmbeddings client for a model name and parameter set.
+
+    Args:
+        model (str): OpenAI embedding model name
+        **params: Extra OpenAIEmbeddings keyword arguments
+
+    Returns:
+        RetryingEmbeddings: Rate-limited, retrying OpenAIEmbeddings reused across reruns
+    """
+    load_env()
+    fake = _fakes_enabled()
+
+    def build():
+        from lcratelimit import RetryingEmbeddings
+
+        if fake:
+            from lcfakes import FakeEmbeddings
+            settings = _fake_settings
+            # Named apart from the real model, so their random vectors get their own EmbeddingPipeline cache
+            client = FakeEmbeddings(latency=settings["latency"], failure_rate=settings["failure_rate"], seed=settings["seed"], model=f"fake:{model}")
+        else:
+            from langchain_openai import OpenAIEmbeddings
+            client = OpenAIEmbeddings(model=model, api_key=os.getenv("OPENAI_API_KEY"), max_retries=0, **params)
+        return RetryingEmbeddings(client, _limiter(f"openai:{model}", fake))
+
+    return cached(("embeddings", model, _freeze(params)), build)
+
+
+def get_chat_prompt(messages: Sequence[Tuple[str, str]]) -> "ChatPromptTemplate":
+    """
+    Return the shared ChatPromptTemplate for a list of (role, template) messages.
+
+    Args:
+        messages (Sequence[Tuple[str, str]]): Messages passed to ChatPromptTemplate.from_messages
+
+    Returns:
+        ChatPromptTemplate: Parsed template
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+
+    frozen = tuple(tuple(message) for message in messages)
+    return cached(("chat_prompt", frozen), lambda: ChatPromptTemplate.from_messages(list(frozen)))
+
+
+def get_compiled_chat_prompt(messages: Sequence[Tuple[str, str]]):
+    """
+    Return the shared CompiledChatPromptTemplate for a list of (role, template) messages.
+
+    Args:
+        messages (Sequence[Tuple[str, str]]): Messages passed to ChatPromptTemplate.from_messages
+
+    Returns:
+        CompiledChatPromptTemplate: Template parsed once, rendering by a single join per message
+    """
+    from lcfasttemplate import CompiledChatPromptTemplate
+
+    frozen = tuple(tuple(message) for message in messages)
+    return cached(("compiled_chat_prompt", frozen), lambda: CompiledChatPromptTemplate(get_chat_prompt(frozen)))
+
+
+def get_chain(
+    name: str,
+    messages: Sequence[Tuple[str, str]],
+    parser_factory: Optional[Callable[[], Any]] = None,
+    model: str = DEFAULT_MODEL,
+    **params: Any,
+):
+    """
+    Return the shared `prompt_template | model | parser` chain.
+
+    Args:
+        name (str): Chain name, distinguishes chains that differ only by parser
+        messages (Sequence[Tuple[str, str]]): Chat prompt messages
+        parser_factory (Optional[Callable[[], Any]]): Builds the output parser, if any
+        model (str): OpenAI model name
+        **params: Extra ChatOpenAI keyword arguments
+
+    Returns:
+        Runnable: Composed chain
+    """
+    frozen = tuple(tuple(message) for message in messages)
+
+    def build():
+        chain = get_chat_prompt(frozen) | get_model(model, **params)
+        if parser_factory is not None:
+            chain = chain | parser_factory()
+        return chain
+
+    return cached(("chain", name, frozen, model, _freeze(params)), build)
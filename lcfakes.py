@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import PrivateAttr
+
+SPORTS = [
+    "Football", "Cricket", "Basketball", "Tennis", "Hockey",
+    "Baseball", "Volleyball", "Rugby", "Badminton", "Athletics",
+]
+
+
+class FakeRateLimitError(Exception):
+    """Injected failure shaped like a provider 429 (status_code and Retry-After header)."""
+
+    def __init__(self, retry_after: float = 0.1):
+        super().__init__(f"Rate limit reached (injected). Please try again in {retry_after}s.")
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers={"retry-after": str(retry_after)})
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text.split()))
+
+
+class _FailureInjector:
+    def __init__(self, failure_rate: float, seed: int):
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def chance(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def maybe_fail(self) -> None:
+        if self.chance(self.failure_rate):
+            raise FakeRateLimitError()
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic local stand-in for ChatOpenAI.
+
+    The answer depends only on the prompt, so repeated runs produce identical
+    output. Timing follows a simple model: `latency` seconds until the first
+    token, then `tokens_per_second`; a `slow_rate` fraction of calls waits
+    `slow_latency` instead, to model a latency tail. A seeded `failure_rate`
+    fraction of calls raises FakeRateLimitError before any token is produced.
+    """
+
+    model_name: str = "fake-chat"
+    latency: float = 0.2
+    tokens_per_second: float = 100.0
+    failure_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_latency: float = 2.0
+    seed: int = 0
+
+    _failures: _FailureInjector = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._failures = _FailureInjector(self.failure_rate, self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "latency": self.latency,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable:
+        """Mimic native JSON-schema output: the answer is JSON, validated into schema (a pydantic model)."""
+        return self.bind(response_format="json_schema") | RunnableLambda(
+            lambda message: schema.model_validate_json(message.content)
+        )
+
+    def _answer(self, messages: List[BaseMessage], structured: bool = False) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        seed = _digest(prompt)
+        picks = [SPORTS[(seed >> (4 * i)) % len(SPORTS)] for i in range(3)]
+        if structured or "json" in prompt.lower():
+            return json.dumps({
+                "sports": [
+                    {"name": name, "popularity_rank": rank, "description": f"{name} is widely played and followed."}
+                    for rank, name in enumerate(picks, start=1)
+                ]
+            }, indent=2)
+        return " ".join(
+            f"{rank}. {name}: a popular sport with a large following and major national competitions."
+            for rank, name in enumerate(picks, start=1)
+        )
+
+    def _tokens(self, text: str) -> List[str]:
+        words = text.split(" ")
+        return [word if i == len(words) - 1 else word + " " for i, word in enumerate(words)]
+
+    def _message(self, messages: List[BaseMessage], text: str) -> AIMessage:
+        prompt_tokens = sum(_count_tokens(str(message.content)) for message in messages)
+        completion_tokens = _count_tokens(text)
+        return AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _first_token_delay(self) -> float:
+        return self.slow_latency if self._failures.chance(self.slow_rate) else self.latency
+
+    def _generation_time(self, text: str) -> float:
+        return self._first_token_delay() + _count_tokens(text) / self.tokens_per_second
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._failures.maybe_fail()
+        text = self._answer(messages, "response_format" in kwargs)
+        time.sleep(self._generation_time(text))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, text))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._failures.maybe_fail()
+        text = self._answer(messages, "response_format" in kwargs)
+        await asyncio.sleep(self._generation_time(text))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, text))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        self._failures.maybe_fail()
+        text = self._answer(messages, "response_format" in kwargs)
+        time.sleep(self._first_token_delay())
+        for token in self._tokens(text):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            time.sleep(1 / self.tokens_per_second)
+        final = self._message(messages, text)
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=final.usage_metadata))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self._failures.maybe_fail()
+        text = self._answer(messages, "response_format" in kwargs)
+        await asyncio.sleep(self._first_token_delay())
+        for token in self._tokens(text):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            await asyncio.sleep(1 / self.tokens_per_second)
+        final = self._message(messages, text)
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=final.usage_metadata))
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic local stand-in for OpenAIEmbeddings.
+
+    Each text maps to a fixed pseudo-random unit vector seeded by its hash;
+    every provider call sleeps `latency` seconds and may raise FakeRateLimitError.
+    """
+
+    def __init__(self, size: int = 1536, latency: float = 0.05, failure_rate: float = 0.0, seed: int = 0, model: str = "fake-embedding"):
+        """
+        Initialize the fake embeddings.
+
+        Args:
+            size (int): Vector length
+            latency (float): Seconds per provider call
+            failure_rate (float): Fraction of calls that raise FakeRateLimitError
+            seed (int): Seed of the failure injector
+            model (str): Reported model name (used for cache directories)
+        """
+        self.size = size
+        self.latency = latency
+        self.model = model
+        self._failures = _FailureInjector(failure_rate, seed)
+        self.calls = 0
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.random.default_rng(_digest(text)).standard_normal(self.size)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self._failures.maybe_fail()
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self._failures.maybe_fail()
+        await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
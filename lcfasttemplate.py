@@ -0,0 +1,168 @@
+from string import Formatter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import (
+    AIMessagePromptTemplate,
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    PromptTemplate,
+    SystemMessagePromptTemplate,
+)
+
+_MESSAGE_TYPES = {
+    SystemMessagePromptTemplate: SystemMessage,
+    HumanMessagePromptTemplate: HumanMessage,
+    AIMessagePromptTemplate: AIMessage,
+}
+
+
+class CompiledPromptTemplate:
+    """
+    An f-string prompt template parsed once into a list of segments.
+
+    PromptTemplate.format merges partial variables, validates the input and
+    runs the template string through a Formatter on every call. Here the
+    template is parsed at compile time, constant partial variables are folded
+    into the neighbouring literal text, and format() only fills the variable
+    slots of a prebuilt list and joins it.
+
+    Callable partial variables are still called on every format(), as in
+    PromptTemplate; constant ones are fixed and cannot be overridden at format
+    time. Fields with a format spec, a conversion or attribute/index access are
+    not compiled; such templates fall back to str.format.
+    """
+
+    def __init__(self, template: str, partial_variables: Optional[Mapping[str, Any]] = None):
+        """
+        Compile the template.
+
+        Args:
+            template (str): f-string style template, e.g. "Top sports in {country}?"
+            partial_variables (Optional[Mapping[str, Any]]): Values (or zero-argument
+                callables) bound at compile time
+        """
+        self.template = template
+        partials = dict(partial_variables or {})
+        self._dynamic_partials: Dict[str, Callable[[], Any]] = {
+            name: value for name, value in partials.items() if callable(value)
+        }
+        self._parts: List[str] = []
+        self._slots: Tuple[Tuple[int, str], ...] = ()
+        self._fallback = False
+
+        parts: List[str] = []
+        slots: List[Tuple[int, str]] = []
+        literal: List[str] = []
+        names: List[str] = []
+        for text, field, spec, conversion in Formatter().parse(template):
+            literal.append(text)
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier():
+                self._fallback = True
+            names.append(field)
+            if field in partials and field not in self._dynamic_partials:
+                literal.append(str(partials[field]))
+                continue
+            parts.append("".join(literal))
+            literal = []
+            slots.append((len(parts), field))
+            parts.append("")
+        parts.append("".join(literal))
+
+        self._parts = parts
+        self._slots = tuple(slots)
+        self._partials = partials
+        self.input_variables = sorted({name for name in names if name not in partials})
+
+    @classmethod
+    def from_prompt(cls, prompt: PromptTemplate) -> "CompiledPromptTemplate":
+        """
+        Compile an existing PromptTemplate, including its partial variables.
+
+        Args:
+            prompt (PromptTemplate): Template using the default f-string format
+
+        Returns:
+            CompiledPromptTemplate: Compiled equivalent of prompt
+        """
+        if prompt.template_format != "f-string":
+            raise ValueError(f"Only f-string templates can be compiled, got {prompt.template_format!r}")
+        return cls(prompt.template, prompt.partial_variables)
+
+    def format(self, **kwargs: Any) -> str:
+        """
+        Render the template.
+
+        Args:
+            **kwargs: Values of the input variables
+
+        Returns:
+            str: The same text PromptTemplate.format returns
+        """
+        for name, factory in self._dynamic_partials.items():
+            kwargs.setdefault(name, factory())
+        if self._fallback:
+            return self.template.format(**{**self._partials, **kwargs})
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            parts[index] = str(kwargs[name])
+        return "".join(parts)
+
+
+class CompiledChatPromptTemplate:
+    """
+    A ChatPromptTemplate whose message templates are compiled once.
+
+    format_messages() renders each message with CompiledPromptTemplate and
+    builds the message object directly. Templates containing anything other
+    than plain system/human/ai string messages (e.g. MessagesPlaceholder) are
+    delegated to the original ChatPromptTemplate unchanged.
+    """
+
+    def __init__(self, prompt: ChatPromptTemplate):
+        """
+        Compile the template.
+
+        Args:
+            prompt (ChatPromptTemplate): Template to compile
+        """
+        self.prompt = prompt
+        self.input_variables = list(prompt.input_variables)
+        self._messages: Optional[List[Tuple[type, CompiledPromptTemplate]]] = []
+        for message in prompt.messages:
+            message_type = _MESSAGE_TYPES.get(type(message))
+            inner = getattr(message, "prompt", None)
+            if message_type is None or not isinstance(inner, PromptTemplate) or inner.template_format != "f-string":
+                self._messages = None
+                break
+            partials = {**prompt.partial_variables, **inner.partial_variables}
+            self._messages.append((message_type, CompiledPromptTemplate(inner.template, partials)))
+
+    @classmethod
+    def from_messages(cls, messages: Sequence[Union[Tuple[str, str], Any]]) -> "CompiledChatPromptTemplate":
+        """
+        Build and compile a template from (role, template) messages.
+
+        Args:
+            messages (Sequence[Union[Tuple[str, str], Any]]): Same input as ChatPromptTemplate.from_messages
+
+        Returns:
+            CompiledChatPromptTemplate: Compiled template
+        """
+        return cls(ChatPromptTemplate.from_messages(list(messages)))
+
+    def format_messages(self, **kwargs: Any) -> List[BaseMessage]:
+        """
+        Render the messages.
+
+        Args:
+            **kwargs: Values of the input variables
+
+        Returns:
+            List[BaseMessage]: The same messages ChatPromptTemplate.format_messages returns
+        """
+        if self._messages is None:
+            return self.prompt.format_messages(**kwargs)
+        return [message_type(content=template.format(**kwargs)) for message_type, template in self._messages]
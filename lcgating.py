@@ -0,0 +1,419 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from lcfactory import cached
+from lcsingleflight import FLIGHTS, SingleFlight, request_key
+
+
+def normalize_input(value: Any) -> Any:
+    """Collapse whitespace of text input, so "India " and "India" are the same request."""
+    return " ".join(value.split()) if isinstance(value, str) else value
+
+
+def _executor() -> ThreadPoolExecutor:
+    return cached("gate_executor", lambda: ThreadPoolExecutor(max_workers=8, thread_name_prefix="lcgate"))
+
+
+class RequestGate:
+    """
+    Decides, for one input of one session, whether a rerun calls the model at all.
+
+    Streamlit reruns the whole script on every committed edit and every widget
+    click, so a plain `model.invoke(text)` fires for empty text boxes and for
+    unchanged input. The gate drops empty (or too short) input, answers
+    unchanged input with the previous result, and debounces: a change committed
+    within debounce_seconds of the previous one waits until the input has been
+    quiet for that long before anything is sent.
+
+    While waiting (for the debounce window or the call) tick() is called every
+    poll_seconds. Pass one that touches a Streamlit element (streamlit_tick):
+    Streamlit raises inside it once a newer edit asks for a rerun, so the
+    superseded request is cancelled if it is still queued and abandoned
+    otherwise, and this run stops instead of blocking on an answer nobody reads.
+    """
+
+    def __init__(self, debounce_seconds: float = 0.6, min_chars: int = 1, poll_seconds: float = 0.1):
+        """
+        Initialize the gate.
+
+        Args:
+            debounce_seconds (float): Quiet period required after a rapid change
+            min_chars (int): Shorter text input is dropped
+            poll_seconds (float): Interval between tick() calls while waiting
+        """
+        self.debounce_seconds = debounce_seconds
+        self.min_chars = min_chars
+        self.poll_seconds = poll_seconds
+        self.last_input: Any = None
+        self.last_result: Any = None
+        self._has_result = False
+        self._last_change = float("-inf")
+        self.calls = 0
+        self.dropped = 0
+        self.reused = 0
+        self.debounced = 0
+        self.superseded = 0
+
+    def _empty(self, value: Any) -> bool:
+        if value is None:
+            return True
+        return isinstance(value, str) and len(value) < max(1, self.min_chars)
+
+    def _wait(self, seconds: float, tick: Optional[Callable[[], Any]]) -> None:
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, self.poll_seconds))
+            if tick is not None:
+                tick()
+
+    def _admit(self, value: Any, tick: Optional[Callable[[], Any]]) -> str:
+        """Return "drop", "reuse" or "call", debouncing before a call."""
+        if self._empty(value):
+            self.dropped += 1
+            return "drop"
+        if self._has_result and value == self.last_input:
+            self.reused += 1
+            return "reuse"
+        now = time.monotonic()
+        rapid = now - self._last_change < self.debounce_seconds
+        self._last_change = now
+        if rapid:
+            try:
+                self._wait(self.debounce_seconds, tick)
+            except BaseException:
+                self.debounced += 1
+                raise
+        return "call"
+
+    def _remember(self, value: Any, result: Any) -> None:
+        self.last_input, self.last_result, self._has_result = value, result, True
+
+    def run(self, value: Any, fn: Callable[[Any], Any], tick: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Return fn(value), the previous result for unchanged input, or None for empty input.
+
+        fn runs on a shared worker thread, so it must not call Streamlit itself.
+
+        Args:
+            value (Any): Widget value; text is whitespace-normalized first
+            fn (Callable[[Any], Any]): Makes the request, e.g. lambda text: chain.invoke(...)
+            tick (Optional[Callable[[], Any]]): Called while waiting (see streamlit_tick)
+        """
+        value = normalize_input(value)
+        decision = self._admit(value, tick)
+        if decision == "drop":
+            return None
+        if decision == "reuse":
+            return self.last_result
+
+        self.calls += 1
+        future: Future = _executor().submit(fn, value)
+        try:
+            while not future.done():
+                wait([future], timeout=self.poll_seconds)
+                if tick is not None and not future.done():
+                    tick()
+        except BaseException:
+            # Interrupted by a newer input: drop the call if it has not started yet
+            future.cancel()
+            self.superseded += 1
+            raise
+        result = future.result()
+        self._remember(value, result)
+        return result
+
+    def stream(self, value: Any, fn: Callable[[Any], Iterable[Any]], tick: Optional[Callable[[], Any]] = None) -> Iterator[Any]:
+        """
+        Yield the chunks of fn(value), replay the previous chunks for unchanged input, or nothing for empty input.
+
+        Unlike run(), fn is consumed on the calling thread, so it may drive
+        Streamlit callbacks; closing the generator early closes fn's stream.
+        Only a stream read to its end is remembered for reuse.
+        """
+        value = normalize_input(value)
+        decision = self._admit(value, tick)
+        if decision == "drop":
+            return
+        if decision == "reuse":
+            yield from self.last_result
+            return
+
+        self.calls += 1
+        chunks: List[Any] = []
+        stream = iter(fn(value))
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            self.superseded += 1
+            raise
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        self._remember(value, chunks)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return how many reruns called the model and how many were spared.
+
+        Returns:
+            Dict[str, int]: calls, dropped, reused, debounced and superseded
+        """
+        return {
+            "calls": self.calls,
+            "dropped": self.dropped,
+            "reused": self.reused,
+            "debounced": self.debounced,
+            "superseded": self.superseded,
+        }
+
+    def summary(self) -> str:
+        """Return the stats as a one-line, human readable string."""
+        stats = self.stats()
+        spared = stats["dropped"] + stats["reused"] + stats["debounced"]
+        return (
+            f"{stats['calls']} model calls · {spared} reruns spared "
+            f"({stats['dropped']} empty, {stats['reused']} unchanged, {stats['debounced']} debounced) · "
+            f"{stats['superseded']} superseded"
+        )
+
+
+def session_gate(name: str, **settings: Any) -> RequestGate:
+    """
+    Return this Streamlit session's gate for one input, created on first use.
+
+    Args:
+        name (str): Input the gate guards, unique within the app
+        **settings: RequestGate arguments, used when the gate is created
+    """
+    import streamlit as st
+
+    key = f"request_gate:{name}"
+    if key not in st.session_state:
+        st.session_state[key] = RequestGate(**settings)
+    return st.session_state[key]
+
+
+def streamlit_tick(placeholder=None) -> Callable[[], None]:
+    """
+    Return a tick() for RequestGate that redraws an empty placeholder.
+
+    Any Streamlit element update is a point where Streamlit stops a run whose
+    input has been superseded, so an empty redraw is enough to notice newer input.
+    """
+    import streamlit as st
+
+    placeholder = placeholder if placeholder is not None else st.empty()
+    return placeholder.empty
+
+
+class Prefetcher:
+    """
+    Computes likely follow-up requests in the background before they are asked.
+
+    Results are kept in a bounded, expiring in-memory store keyed by
+    lcsingleflight.request_key, shared by every session of the process.
+    Prefetches run through a SingleFlight, so a user asking for a key that is
+    being prefetched joins that call instead of starting a second one (run()
+    does, and wait() lets a caller that streams the answer itself do the
+    same before falling back to its own call). Each
+    prefetch() names a group (e.g. a session's current country); a new
+    prefetch for the same group cancels the previous jobs still queued,
+    unless another group is waiting for them too.
+    """
+
+    def __init__(self, max_workers: int = 2, max_entries: int = 256, ttl_seconds: Optional[float] = 600,
+                 flights: Optional[SingleFlight] = None):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            max_workers (int): Prefetches running at once
+            max_entries (int): Least recently used results are evicted past this size
+            ttl_seconds (Optional[float]): Result lifetime, None keeps results until evicted
+            flights (Optional[SingleFlight]): Shared with the foreground path (default FLIGHTS)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.flights = flights or FLIGHTS
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lcprefetch")
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._queued: Dict[str, Future] = {}
+        self._groups: Dict[Hashable, List[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.cancelled = 0
+        self.joined = 0
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return False, None
+            stored_at, result = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._results[key]
+                return False, None
+            self._results.move_to_end(key)
+            return True, result
+
+    def put(self, name: str, input: Any, result: Any) -> None:
+        """Store a result computed in the foreground, so later requests reuse it."""
+        key = request_key(name, input)
+        with self._lock:
+            self._results[key] = (time.monotonic(), result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def get(self, name: str, input: Any) -> Optional[Any]:
+        """
+        Return the stored result of a request, or None if it was not prefetched (yet).
+
+        Args:
+            name (str): Request name, e.g. the chain's
+            input (Any): JSON-serializable request input
+        """
+        found, result = self._lookup(request_key(name, input))
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return result if found else None
+
+    def wait(self, name: str, input: Any, tick: Optional[Callable[[], Any]] = None,
+             poll_seconds: float = 0.1) -> Optional[Any]:
+        """
+        Return the stored result of a request, first waiting for its prefetch if one is running.
+
+        A prefetch of it that is still queued is cancelled instead, since the
+        caller is about to compute the answer itself, sooner than a worker would.
+
+        Args:
+            name (str): Request name, e.g. the chain's
+            input (Any): JSON-serializable request input
+            tick (Optional[Callable[[], Any]]): Called while waiting (see streamlit_tick)
+            poll_seconds (float): Interval between tick() calls
+
+        Returns:
+            Optional[Any]: The result, or None if it was neither stored nor running (or the prefetch failed)
+        """
+        key = request_key(name, input)
+        with self._lock:
+            future = self._queued.get(key)
+            if future is not None and future.cancel():
+                self._queued.pop(key, None)
+                self.cancelled += 1
+                future = None
+            elif future is not None:
+                self.joined += 1
+        if future is not None:
+            while not future.done():
+                wait([future], timeout=poll_seconds)
+                if tick is not None and not future.done():
+                    tick()
+        return self.get(name, input)
+
+    def run(self, name: str, input: Any, fn: Callable[[Any], Any]) -> Any:
+        """Return the stored result, join a prefetch in flight, or compute fn(input) now."""
+        found, result = self._lookup(request_key(name, input))
+        if found:
+            with self._lock:
+                self.hits += 1
+            return result
+        with self._lock:
+            self.misses += 1
+        result = self.flights.do(request_key(name, input), lambda: fn(input))
+        self.put(name, input, result)
+        return result
+
+    def _job(self, name: str, input: Any, fn: Callable[[Any], Any]) -> None:
+        key = request_key(name, input)
+        try:
+            if not self._lookup(key)[0]:
+                self.put(name, input, self.flights.do(key, lambda: fn(input)))
+                with self._lock:
+                    self.prefetched += 1
+        finally:
+            with self._lock:
+                self._queued.pop(key, None)
+
+    def prefetch(self, group: Hashable, name: str, inputs: Iterable[Any], fn: Callable[[Any], Any]) -> int:
+        """
+        Queue fn(input) for every input that is neither stored nor queued.
+
+        Args:
+            group (Hashable): Jobs still queued from this group's previous call, and wanted by no other group, are cancelled
+            name (str): Request name, e.g. the chain's
+            inputs (Iterable[Any]): JSON-serializable inputs, most likely first
+            fn (Callable[[Any], Any]): Computes one result, e.g. chain.invoke
+
+        Returns:
+            int: Number of jobs queued
+        """
+        queued = 0
+        with self._lock:
+            previous = self._groups.pop(group, [])
+            keys = []
+            for input in inputs:
+                key = request_key(name, input)
+                if key in self._results:
+                    continue
+                if key not in self._queued:
+                    self._queued[key] = self._executor.submit(self._job, name, input, fn)
+                    queued += 1
+                keys.append(key)
+            self._groups[group] = keys
+            # Jobs are shared by every group that asked for them, so only drop the ones nobody wants anymore
+            wanted = {key for keys in self._groups.values() for key in keys}
+            for key in previous:
+                future = self._queued.get(key)
+                if key not in wanted and future is not None and future.cancel():
+                    self._queued.pop(key, None)
+                    self.cancelled += 1
+        return queued
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the prefetch counters.
+
+        Returns:
+            Dict[str, int]: hits, misses, prefetched, cancelled, joined, queued and stored
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefetched": self.prefetched,
+                "cancelled": self.cancelled,
+                "joined": self.joined,
+                "queued": len(self._queued),
+                "stored": len(self._results),
+            }
+
+    def summary(self) -> str:
+        """Return the stats as a one-line, human readable string."""
+        stats = self.stats()
+        total = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / total if total else 0.0
+        return (
+            f"{stats['prefetched']} prefetched · {stats['hits']} instant answers ({hit_rate:.0%}), "
+            f"{stats['joined']} joined while running · "
+            f"{stats['queued']} queued · {stats['cancelled']} cancelled"
+        )
+
+
+def get_prefetcher(name: str = "default", **settings: Any) -> Prefetcher:
+    """Return the process-wide prefetcher of that name, created on first use."""
+    return cached(("prefetcher", name), lambda: Prefetcher(**settings))
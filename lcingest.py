@@ -0,0 +1,495 @@
+"""
+Ingest a directory of text documents for retrieval.
+
+Files are streamed from disk in blocks, split into token-aware overlapping
+chunks and embedded in bounded batches through lcembedding.EmbeddingPipeline,
+whose on-disk vector cache keeps every chunk vector. Chunk texts go to
+chunks.jsonl in the output directory and a manifest records the size,
+mtime and content hash of every ingested file, so a re-run skips unchanged
+files without reading them (or, when only the mtime changed, after hashing
+them). Files deleted since the last run are dropped from the manifest, and
+whenever a run replaced or dropped files, chunks.jsonl is compacted to the
+records of the current files. Only one file block, the token window and a couple of batches are in
+memory at a time, so RSS stays flat however large the corpus is.
+
+    python lcingest.py docs/ --output .lc_ingest
+    LC_FAKE_MODELS=1 python lcingest.py docs/ --output .lc_ingest --query "Which sports do Indians love?"
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from lcembedding import EmbeddingPipeline, content_hash
+from lcfactory import DEFAULT_MODEL
+from lctokens import get_encoding
+
+DEFAULT_OUTPUT_DIR = ".lc_ingest"
+DEFAULT_PATTERNS = ("*.txt", "*.md", "*.rst")
+BLOCK_CHARS = 1 << 20
+
+
+def iter_files(root: str, patterns: Sequence[str] = DEFAULT_PATTERNS) -> Iterator[str]:
+    """
+    Yield the files below root whose name matches one of patterns, in a stable order.
+
+    Args:
+        root (str): Directory to walk (or a single file)
+        patterns (Sequence[str]): fnmatch patterns of file names
+
+    Yields:
+        str: File paths
+    """
+    if os.path.isfile(root):
+        yield root
+        return
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(names):
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                yield os.path.join(directory, name)
+
+
+def read_blocks(path: str, block_chars: int = BLOCK_CHARS) -> Iterator[str]:
+    """
+    Yield a text file in blocks of about block_chars characters, split at whitespace.
+
+    A block never ends inside a word, so tokenizing blocks one by one gives
+    the same tokens as tokenizing the whole file.
+
+    Args:
+        path (str): UTF-8 text file; undecodable bytes are replaced
+        block_chars (int): Characters read per block
+
+    Yields:
+        str: Consecutive blocks
+    """
+    carry = ""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(block_chars)
+            if not block:
+                break
+            block = carry + block
+            cut = max(block.rfind(" "), block.rfind("\n"))
+            if cut <= 0:
+                carry = block
+                continue
+            carry = block[cut:]
+            yield block[:cut]
+    if carry:
+        yield carry
+
+
+def file_hash(path: str) -> str:
+    """Return the SHA-256 hex digest of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TokenChunker:
+    """
+    Splits streamed text into chunks of chunk_tokens tokens overlapping by overlap_tokens.
+
+    Works on a stream of blocks and only keeps the current token window, so
+    the size of the input does not matter. Chunk boundaries fall on token
+    boundaries of the model's tokenizer, so every chunk fits the embedding
+    model's limit exactly.
+    """
+
+    def __init__(self, chunk_tokens: int = 512, overlap_tokens: int = 64, model: str = DEFAULT_MODEL):
+        """
+        Initialize the chunker.
+
+        Args:
+            chunk_tokens (int): Tokens per chunk
+            overlap_tokens (int): Tokens repeated at the start of the next chunk
+            model (str): Model whose tokenizer is used
+        """
+        if not 0 <= overlap_tokens < chunk_tokens:
+            raise ValueError("overlap_tokens must be at least 0 and smaller than chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.model = model
+
+    def split(self, blocks: Iterable[str]) -> Iterator[str]:
+        """
+        Chunk a stream of text blocks.
+
+        Args:
+            blocks (Iterable[str]): Consecutive pieces of one document
+
+        Yields:
+            str: Chunk texts, in document order
+        """
+        encoding = get_encoding(self.model)
+        step = self.chunk_tokens - self.overlap_tokens
+        window: List[int] = []
+        emitted = False
+        for block in blocks:
+            window.extend(encoding.encode_ordinary(block))
+            start = 0
+            while len(window) - start >= self.chunk_tokens:
+                yield encoding.decode(window[start:start + self.chunk_tokens])
+                emitted = True
+                start += step
+            del window[:start]
+        # The tail is only worth a chunk if it adds tokens beyond the previous chunk's overlap
+        if window and (not emitted or len(window) > self.overlap_tokens):
+            text = encoding.decode(window)
+            if text.strip():
+                yield text
+
+
+@dataclass
+class IngestReport:
+    files_seen: int = 0
+    files_skipped: int = 0
+    files_ingested: int = 0
+    files_removed: int = 0
+    bytes_read: int = 0
+    chunks: int = 0
+    chunks_embedded: int = 0
+    chunks_cached: int = 0
+    seconds: float = 0.0
+    peak_rss_mib: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.files_ingested / self.seconds if self.seconds else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        """Return the report as a one-line, human readable string."""
+        megabytes = self.bytes_read / (1 << 20)
+        return (
+            f"{self.files_ingested} files ingested, {self.files_skipped} unchanged skipped, {self.files_removed} removed · "
+            f"{self.chunks} chunks ({self.chunks_embedded} embedded, {self.chunks_cached} cached) · "
+            f"{megabytes:.1f} MiB in {self.seconds:.1f}s · {self.docs_per_second:.1f} docs/s, "
+            f"{self.chunks_per_second:.1f} chunks/s, {megabytes / self.seconds if self.seconds else 0.0:.2f} MiB/s · "
+            f"peak RSS {self.peak_rss_mib:.0f} MiB"
+        )
+
+
+def _peak_rss_mib() -> float:
+    if resource is None:
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class Ingestor:
+    """
+    Streams files through TokenChunker into an EmbeddingPipeline.
+
+    A reader thread walks the files and chunks them while the calling thread
+    embeds the previous batch; at most `prefetch` batches wait between the
+    two, which bounds memory. Output directory layout:
+        manifest.json  path -> {"size", "mtime_ns", "sha256", "chunks"}
+        chunks.jsonl   {"id", "source", "sha256", "seq", "text"} per chunk
+
+    The vectors themselves live in the pipeline's vector cache, keyed by the
+    chunk id (the content hash of its text), so identical chunks are embedded
+    once across files and runs.
+
+    chunks.jsonl is only appended to while ingesting; records of older file
+    versions are skipped by iter_chunks() and dropped by compact().
+    """
+
+    def __init__(
+        self,
+        pipeline: EmbeddingPipeline,
+        output_dir: str = DEFAULT_OUTPUT_DIR,
+        chunker: Optional[TokenChunker] = None,
+        batch_chunks: Optional[int] = None,
+        prefetch: int = 2,
+    ):
+        """
+        Initialize the ingestor.
+
+        Args:
+            pipeline (EmbeddingPipeline): Embeds and caches chunk vectors
+            output_dir (str): Directory for the manifest and chunks.jsonl
+            chunker (Optional[TokenChunker]): Chunking settings, TokenChunker() by default
+            batch_chunks (Optional[int]): Chunks per embed call; defaults to enough
+                for every concurrent provider request of the pipeline
+            prefetch (int): Batches chunked ahead of embedding
+        """
+        self.pipeline = pipeline
+        self.output_dir = output_dir
+        self.chunker = chunker or TokenChunker()
+        self.batch_chunks = batch_chunks or pipeline.batch_size * max(1, pipeline.max_concurrency)
+        self.prefetch = prefetch
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest_path = os.path.join(output_dir, "manifest.json")
+        self.chunks_path = os.path.join(output_dir, "chunks.jsonl")
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        # Records in chunks.jsonl superseded during this process, i.e. worth compacting away
+        self.stale_chunks = 0
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def _save_manifest(self) -> None:
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self.manifest_path)
+
+    def _drop_partial_line(self) -> None:
+        # A run killed mid-write leaves a line without its newline; appending to it would corrupt the next record too
+        if not os.path.exists(self.chunks_path):
+            return
+        with open(self.chunks_path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            f.truncate(end)
+
+    def _prune_deleted(self) -> int:
+        deleted = [path for path in self.manifest if not os.path.exists(path)]
+        for path in deleted:
+            self.stale_chunks += self.manifest.pop(path)["chunks"]
+        return len(deleted)
+
+    def _changed(self, path: str) -> Optional[Tuple[int, int, str]]:
+        stat = os.stat(path)
+        entry = self.manifest.get(path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return None
+        digest = file_hash(path)
+        if entry and entry["sha256"] == digest:
+            # Touched but identical: remember the new mtime so the next run skips it without hashing
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return None
+        return stat.st_size, stat.st_mtime_ns, digest
+
+    def _produce(self, paths: Iterable[str], batches: "queue.Queue", report: IngestReport, stop: threading.Event) -> None:
+        batch: List[Dict[str, Any]] = []
+        try:
+            for path in paths:
+                if stop.is_set():
+                    return
+                report.files_seen += 1
+                changed = self._changed(path)
+                if changed is None:
+                    report.files_skipped += 1
+                    continue
+                size, mtime_ns, digest = changed
+                seq = 0
+                for seq, text in enumerate(self.chunker.split(read_blocks(path)), start=1):
+                    batch.append({"id": content_hash(text), "source": path, "sha256": digest, "seq": seq, "text": text})
+                    if len(batch) >= self.batch_chunks:
+                        batches.put((batch, None))
+                        batch = []
+                        if stop.is_set():
+                            return
+                # The file is recorded once its last chunk is queued; it is saved with the batch carrying it
+                batches.put((batch, (path, {"size": size, "mtime_ns": mtime_ns, "sha256": digest, "chunks": seq})))
+                batch = []
+                report.bytes_read += size
+            if batch:
+                batches.put((batch, None))
+        except BaseException as e:
+            batches.put((None, e))
+            return
+        batches.put((None, None))
+
+    def ingest(self, paths: Iterable[str], progress_every: float = 10.0, compact: bool = True) -> IngestReport:
+        """
+        Ingest files, skipping those whose content is unchanged since the last run.
+
+        Args:
+            paths (Iterable[str]): Files to ingest, e.g. iter_files(root)
+            progress_every (float): Seconds between progress lines on stderr, 0 disables them
+            compact (bool): Rewrite chunks.jsonl afterwards if files were replaced or removed
+
+        Returns:
+            IngestReport: Counters, throughput and peak memory
+        """
+        report = IngestReport()
+        report.files_removed = self._prune_deleted()
+        self._drop_partial_line()
+        batches: "queue.Queue" = queue.Queue(maxsize=max(1, self.prefetch))
+        stop = threading.Event()
+        reader = threading.Thread(target=self._produce, args=(paths, batches, report, stop), daemon=True)
+        start = last_progress = time.perf_counter()
+        embedded_before, cached_before = self.pipeline.embedded_texts, self.pipeline.cached_texts
+        reader.start()
+        try:
+            with open(self.chunks_path, "a", encoding="utf-8") as out:
+                while True:
+                    batch, done = batches.get()
+                    if batch is None:
+                        if done is not None:
+                            raise done
+                        break
+                    if batch:
+                        self.pipeline.embed_documents([record["text"] for record in batch])
+                        out.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+                        report.chunks += len(batch)
+                    if done is not None:
+                        out.flush()
+                        path, entry = done
+                        previous = self.manifest.get(path)
+                        if previous is not None:
+                            self.stale_chunks += previous["chunks"]
+                        self.manifest[path] = entry
+                        report.files_ingested += 1
+                    now = time.perf_counter()
+                    if progress_every and now - last_progress >= progress_every:
+                        last_progress = now
+                        self._save_manifest()
+                        report.seconds = now - start
+                        report.peak_rss_mib = _peak_rss_mib()
+                        print(report.summary(), file=sys.stderr)
+        finally:
+            stop.set()
+            # Unblock the reader if it is waiting for room in the queue
+            while reader.is_alive():
+                try:
+                    batches.get_nowait()
+                except queue.Empty:
+                    reader.join(0.05)
+            self._save_manifest()
+        if compact and self.stale_chunks:
+            self.compact()
+        report.seconds = time.perf_counter() - start
+        report.chunks_embedded = self.pipeline.embedded_texts - embedded_before
+        report.chunks_cached = self.pipeline.cached_texts - cached_before
+        report.peak_rss_mib = _peak_rss_mib()
+        return report
+
+    def iter_chunks(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the chunk records of the current version of every ingested file.
+
+        Records written for an older version of a file (before it changed) are
+        skipped, and so are repeats of a (source, seq) pair, which an
+        interrupted run or a file reverted to an earlier version leaves behind,
+        and lines that are not valid JSON, such as a record cut off by a killed run.
+        """
+        if not os.path.exists(self.chunks_path):
+            return
+        seen = set()
+        with open(self.chunks_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entry = self.manifest.get(record["source"])
+                if entry is None or entry["sha256"] != record["sha256"]:
+                    continue
+                key = (record["source"], record["seq"])
+                if key not in seen:
+                    seen.add(key)
+                    yield record
+
+    def compact(self) -> int:
+        """
+        Rewrite chunks.jsonl with only the records iter_chunks() yields.
+
+        Drops manifest entries of deleted files first. The new file is
+        written next to the old one and swapped in, so an interruption leaves
+        the old file intact.
+
+        Returns:
+            int: Records kept
+        """
+        self._prune_deleted()
+        self._save_manifest()
+        if not os.path.exists(self.chunks_path):
+            return 0
+        kept = 0
+        tmp = self.chunks_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            for record in self.iter_chunks():
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                kept += 1
+        os.replace(tmp, self.chunks_path)
+        self.stale_chunks = 0
+        return kept
+
+    def build_index(self):
+        """
+        Load every current chunk into a NumpyVectorIndex for searching.
+
+        The vectors come from the pipeline's cache, so nothing is embedded
+        again. Meant for corpora whose vectors fit in memory.
+
+        Returns:
+            NumpyVectorIndex: Index keyed by chunk id, with the chunk texts stored
+        """
+        from lcbatching import iter_chunks
+        from lcvectorindex import NumpyVectorIndex
+
+        index = NumpyVectorIndex(embedder=self.pipeline)
+        for batch in iter_chunks(self.iter_chunks(), self.batch_chunks):
+            texts = [record["text"] for record in batch]
+            index.add([record["id"] for record in batch], self.pipeline.embed_documents(texts), texts)
+        return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="directory (or file) to ingest")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="directory for the manifest and chunks.jsonl")
+    parser.add_argument("--patterns", nargs="*", default=list(DEFAULT_PATTERNS), help="file name patterns to ingest")
+    parser.add_argument("--chunk-tokens", type=int, default=512)
+    parser.add_argument("--overlap-tokens", type=int, default=64)
+    parser.add_argument("--batch-chunks", type=int, help="chunks per embedding round")
+    parser.add_argument("--concurrency", type=int, default=4, help="embedding requests in flight")
+    parser.add_argument("--progress-every", type=float, default=10.0, help="seconds between progress lines")
+    parser.add_argument("--no-compact", dest="compact", action="store_false",
+                        help="leave superseded records in chunks.jsonl (they are skipped when reading)")
+    parser.add_argument("--query", help="search the ingested chunks afterwards")
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    from lcfactory import get_embeddings
+
+    pipeline = EmbeddingPipeline(get_embeddings(), max_concurrency=args.concurrency)
+    ingestor = Ingestor(
+        pipeline,
+        args.output,
+        TokenChunker(args.chunk_tokens, args.overlap_tokens),
+        batch_chunks=args.batch_chunks,
+    )
+    report = ingestor.ingest(iter_files(args.root, args.patterns), progress_every=args.progress_every, compact=args.compact)
+    print(report.summary())
+    with open(os.path.join(args.output, "last_report.json"), "w", encoding="utf-8") as f:
+        json.dump({**asdict(report), "docs_per_second": report.docs_per_second, "chunks_per_second": report.chunks_per_second}, f, indent=2)
+
+    if args.query:
+        for text, score in ingestor.build_index().similarity_search(args.query, k=args.k):
+            print(f"{score:.3f}  {text[:200]!r}")
+
+
+if __name__ == "__main__":
+    main()
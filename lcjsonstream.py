@@ -0,0 +1,201 @@
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.utils.json import parse_partial_json
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _compile(schema: Dict[str, Any]) -> Callable[[Any, str], List[str]]:
+    expected = _TYPES.get(schema.get("type"))
+    required = tuple(schema.get("required", ()))
+    properties = {name: _compile(sub) for name, sub in schema.get("properties", {}).items()}
+    items = _compile(schema["items"]) if "items" in schema else None
+    enum = schema.get("enum")
+
+    def validate(value: Any, path: str) -> List[str]:
+        if expected is not None and (
+            not isinstance(value, expected) or (isinstance(value, bool) and expected in (int, (int, float)))
+        ):
+            return [f"{path or '$'}: expected {schema['type']}, got {type(value).__name__}"]
+        if enum is not None and value not in enum:
+            return [f"{path or '$'}: {value!r} is not one of {enum}"]
+        errors: List[str] = []
+        if isinstance(value, dict):
+            errors.extend(f"{path}.{name}: missing" for name in required if name not in value)
+            for name, check in properties.items():
+                if name in value:
+                    errors.extend(check(value[name], f"{path}.{name}"))
+        elif isinstance(value, list) and items is not None:
+            for i, item in enumerate(value):
+                errors.extend(items(item, f"{path}[{i}]"))
+        return errors
+
+    return validate
+
+
+@lru_cache(maxsize=64)
+def _compile_cached(schema_json: str) -> Callable[[Any, str], List[str]]:
+    return _compile(json.loads(schema_json))
+
+
+def compile_schema(schema: Dict[str, Any]) -> Callable[[Any], List[str]]:
+    """
+    Compile a JSON schema subset into a fast validator, cached per schema.
+
+    Supports type, properties, required, items and enum, which is what the
+    sports schemas use. The schema is walked once; validation then only runs
+    the prebuilt closures.
+
+    Args:
+        schema (Dict[str, Any]): JSON schema
+
+    Returns:
+        Callable[[Any], List[str]]: Returns the list of validation errors, empty if valid
+    """
+    check = _compile_cached(json.dumps(schema, sort_keys=True))
+    return lambda value: check(value, "")
+
+
+class JsonItemStream:
+    """
+    Extracts completed items of a top-level JSON array while the JSON streams in.
+
+    Feed raw text chunks from the model. A small scanner tracks string and
+    nesting state, so it knows the exact position where each array item's
+    closing brace arrives; only then is the text parsed (closing the open
+    brackets with parse_partial_json) and the new item validated and emitted.
+    Parsing therefore happens once per item, not once per token.
+
+    finish() parses whatever arrived, repairing truncated or unterminated JSON,
+    and keeps every item that still validates; invalid items go to rejected
+    instead of failing the whole response.
+    """
+
+    def __init__(self, key: str, schema: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the stream.
+
+        Args:
+            key (str): Name of the top-level array field, e.g. "sports"
+            schema (Optional[Dict[str, Any]]): Schema of the whole document; the
+                items schema of key is used to validate each item
+        """
+        self.key = key
+        item_schema = (schema or {}).get("properties", {}).get(key, {}).get("items")
+        self._validate = compile_schema(item_schema) if item_schema else (lambda item: [])
+        self.items: List[Any] = []
+        self.rejected: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self._chunks: List[str] = []
+        self._length = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._complete_end = 0
+        self._document_end: Optional[int] = None
+        self._seen = 0
+
+    @property
+    def text(self) -> str:
+        """All text received so far."""
+        return "".join(self._chunks)
+
+    def _scan(self, chunk: str, offset: int) -> bool:
+        closed_item = False
+        for i, char in enumerate(chunk):
+            if self._start is None:
+                if char != "{":
+                    continue
+                self._start = offset + i
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                # depth 2 is inside {"key": [ ... ]}, so this brace closed an array item
+                if char == "}" and self._depth == 2:
+                    self._complete_end = offset + i + 1
+                    closed_item = True
+                elif self._depth == 0 and self._document_end is None:
+                    self._document_end = offset + i + 1
+        return closed_item
+
+    def _parse(self, end: Optional[int] = None) -> Optional[Any]:
+        if self._start is None:
+            return None
+        try:
+            return parse_partial_json(self.text[self._start:end])
+        except Exception as e:
+            self.error = str(e)
+            return None
+
+    def _take(self, document: Any) -> List[Any]:
+        if not isinstance(document, dict) or not isinstance(document.get(self.key), list):
+            return []
+        candidates = document[self.key]
+        fresh: List[Any] = []
+        for index in range(self._seen, len(candidates)):
+            item = candidates[index]
+            errors = self._validate(item)
+            if errors:
+                self.rejected.append({"item": item, "errors": errors})
+            else:
+                fresh.append(item)
+        self._seen = len(candidates)
+        self.items.extend(fresh)
+        return fresh
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Add a text chunk.
+
+        Args:
+            chunk (str): Next piece of model output
+
+        Returns:
+            List[Any]: Items completed by this chunk that passed validation
+        """
+        if not chunk:
+            return []
+        offset = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        if not self._scan(chunk, offset):
+            return []
+        return self._take(self._parse(self._complete_end))
+
+    def finish(self) -> List[Any]:
+        """
+        Parse the full output, salvaging what is valid.
+
+        Returns:
+            List[Any]: Items not yet returned by feed() that passed validation
+        """
+        # Stop at the end of the top-level object so trailing prose or ``` fences are ignored
+        document = self._parse(self._document_end)
+        if document is None and self.error is None:
+            self.error = "No JSON object found in the response"
+        return self._take(document)
+
+    def result(self) -> Dict[str, List[Any]]:
+        """Return the validated items as a document shaped like the schema."""
+        return {self.key: list(self.items)}
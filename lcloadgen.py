@@ -0,0 +1,299 @@
+"""
+Load generator for lcserver.py.
+
+Virtual users send invoke, batch and stream requests over keep-alive
+connections for --duration seconds and report, per scenario, p50/p95/p99
+latency, time to the first streamed chunk, throughput and how many requests
+the server refused (429 per-client limit, 503 busy). Without --url a server
+with the local stub model (lcfakes) is started on a free port, so no API key
+or network is needed:
+
+    python lcloadgen.py --users 64 --duration 20 --output load.json
+    python lcloadgen.py --users 64 --clients 4 --per-client 2       # provoke 429s
+    python lcloadgen.py --url http://127.0.0.1:8000 --scenarios stream:sports_stream
+    python lcloadgen.py --output load-new.json --compare load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from lcbench import COUNTRIES, SPORTS, _ms, git_revision, percentile
+
+DEFAULT_SCENARIOS = [
+    "invoke:sports_str",
+    "invoke:sports_json",
+    "invoke:sports_structured",
+    "batch:sports",
+    "stream:sports_stream",
+]
+
+
+class HttpConnection:
+    """One keep-alive HTTP/1.1 connection, reopened when the server closes it."""
+
+    def __init__(self, host: str, port: int, client_id: str):
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def _send(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Dict[str, str]]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8")
+        self._writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nX-Client-Id: {self.client_id}\r\n\r\n".encode("latin-1") + body
+        )
+        await self._writer.drain()
+        head = (await self._reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        headers = {}
+        for line in head[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        return int(head[0].split(" ", 2)[1]), headers
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Optional[float], Optional[float]]:
+        """
+        Send a request and read the whole answer; an SSE answer is read to its end.
+
+        Returns:
+            Tuple[int, Optional[float], Optional[float]]: status, seconds to the first
+                streamed chunk, and the Retry-After seconds the server asked for
+        """
+        try:
+            status, headers = await self._send(path, payload)
+            first_chunk = None
+            if headers.get("content-type", "").startswith("text/event-stream"):
+                start = time.perf_counter()
+                while True:
+                    line = await self._reader.readline()
+                    if not line:
+                        break
+                    if line.startswith(b"event: chunk") and first_chunk is None:
+                        first_chunk = time.perf_counter() - start
+                    elif line.startswith(b"event: error"):
+                        status = 502
+            else:
+                await self._reader.readexactly(int(headers.get("content-length") or 0))
+            if headers.get("connection", "").lower() == "close":
+                await self.close()
+            try:
+                retry_after = float(headers["retry-after"])
+            except (KeyError, ValueError):
+                retry_after = None
+            return status, first_chunk, retry_after
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+def make_payload(action: str, chain: str, i: int, batch_size: int) -> Dict[str, Any]:
+    def one(n: int) -> Dict[str, str]:
+        item = {"country": COUNTRIES[n % len(COUNTRIES)]}
+        if chain == "sports_pipeline":
+            item["sport"] = SPORTS[n % len(SPORTS)]
+        return item
+
+    if action == "batch":
+        return {"inputs": [one(i + n) for n in range(batch_size)]}
+    return {"input": one(i)}
+
+
+async def run_load(host: str, port: int, scenarios: List[str], users: int, clients: int,
+                   duration: float, batch_size: int) -> List[Dict[str, Any]]:
+    """Run every virtual user until the deadline and summarize each scenario."""
+    stats = {
+        name: {"latencies": [], "first_chunk": [], "statuses": Counter()}
+        for name in scenarios
+    }
+    deadline = time.perf_counter() + duration
+
+    async def user(n: int) -> None:
+        connection = HttpConnection(host, port, f"loadgen-{n % clients}")
+        i = n
+        try:
+            while time.perf_counter() < deadline:
+                name = scenarios[i % len(scenarios)]
+                action, chain = name.split(":", 1)
+                start = time.perf_counter()
+                try:
+                    status, first_chunk, retry_after = await connection.post(
+                        f"/chains/{chain}/{action}", make_payload(action, chain, i, batch_size)
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    status, first_chunk, retry_after = 599, None, None
+                elapsed = time.perf_counter() - start
+                stats[name]["statuses"][status] += 1
+                if status == 200:
+                    stats[name]["latencies"].append(elapsed)
+                    if first_chunk is not None:
+                        stats[name]["first_chunk"].append(first_chunk)
+                elif status in (429, 503):
+                    # Back off like a well-behaved client: wait the Retry-After period, with
+                    # jitter so the refused users do not come back in lockstep
+                    await asyncio.sleep((retry_after if retry_after is not None else 0.05) * random.uniform(1.0, 1.2))
+                i += users
+        finally:
+            await connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(n) for n in range(users)))
+    elapsed = time.perf_counter() - start
+
+    results = []
+    for name, data in stats.items():
+        statuses = data["statuses"]
+        ok = statuses.get(200, 0)
+        results.append({
+            "scenario": name,
+            "requests": sum(statuses.values()),
+            "ok": ok,
+            "rejected_429": statuses.get(429, 0),
+            "rejected_503": statuses.get(503, 0),
+            "errors": sum(count for status, count in statuses.items() if status not in (200, 429, 503)),
+            "p50_ms": _ms(percentile(data["latencies"], 0.5)),
+            "p95_ms": _ms(percentile(data["latencies"], 0.95)),
+            "p99_ms": _ms(percentile(data["latencies"], 0.99)),
+            "first_chunk_p50_ms": _ms(percentile(data["first_chunk"], 0.5)),
+            "first_chunk_p95_ms": _ms(percentile(data["first_chunk"], 0.95)),
+            "throughput_rps": round(ok / elapsed, 3) if elapsed else None,
+        })
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub_server(args) -> Tuple[subprocess.Popen, int]:
+    """
+    Start lcserver.py with the fake model and wait until /health answers.
+
+    The stub is not rate limited (lcfactory never caps the fake models, whatever
+    LC_RATE_LIMIT_RPS says), so the run measures the server, not a client-side quota.
+    """
+    port = _free_port()
+    command = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "lcserver.py"),
+        "--fake", "--port", str(port),
+        "--fake-latency", str(args.latency), "--fake-tokens-per-second", str(args.tokens_per_second),
+        "--max-inflight", str(args.max_inflight), "--per-client", str(args.per_client),
+        "--per-client-queue", str(args.per_client_queue),
+    ]
+    if args.coalesce:
+        command.append("--coalesce")
+    # A placeholder key, so building the (never used) real clients does not fail
+    env = {**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-loadgen"}
+    server = subprocess.Popen(command, env=env)
+    for _ in range(200):
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5) as s:
+                s.sendall(b"GET /health HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n")
+                if s.recv(64).startswith(b"HTTP/1.1 200"):
+                    return server, port
+        except OSError:
+            pass
+        if server.poll() is not None:
+            raise RuntimeError(f"lcserver.py exited with code {server.returncode}")
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("lcserver.py did not start within 20 seconds")
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {row["scenario"]: row for row in json.load(f)["results"]}
+    print(f"\nChange vs {baseline_path} (negative latency / positive throughput is better)")
+    for row in results:
+        old = baseline.get(row["scenario"])
+        if old is None:
+            continue
+        deltas = []
+        for field in ("p50_ms", "p95_ms", "p99_ms", "first_chunk_p50_ms", "throughput_rps"):
+            if row.get(field) is not None and old.get(field):
+                deltas.append(f"{field} {100 * (row[field] - old[field]) / old[field]:+.1f}%")
+        print(f"  {row['scenario']:<28} " + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="running lcserver.py; default: start one with the stub model")
+    parser.add_argument("--scenarios", nargs="*", default=DEFAULT_SCENARIOS, help="action:chain pairs, run round-robin")
+    parser.add_argument("--users", type=int, default=32, help="concurrent virtual users")
+    parser.add_argument("--clients", type=int, help="distinct X-Client-Id values shared by the users (default: one each)")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--max-inflight", type=int, default=64, help="settings of the started server")
+    parser.add_argument("--per-client", type=int, default=4)
+    parser.add_argument("--per-client-queue", type=int, default=16)
+    parser.add_argument("--coalesce", action="store_true")
+    parser.add_argument("--output", default="load_results.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        server, port = start_stub_server(args)
+        host = "127.0.0.1"
+    try:
+        results = asyncio.run(run_load(
+            host, port, args.scenarios, args.users, args.clients or args.users, args.duration, args.batch_size
+        ))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    for row in results:
+        print(
+            f"{row['scenario']:<28} p50 {row['p50_ms']} ms  p95 {row['p95_ms']} ms  p99 {row['p99_ms']} ms  "
+            f"first chunk {row['first_chunk_p50_ms']} ms  {row['throughput_rps']} req/s  "
+            f"429 {row['rejected_429']}  503 {row['rejected_503']}  errors {row['errors']}"
+        )
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from lcfactory import DEFAULT_MODEL, cached
+from lctokens import TOKENS_PER_MESSAGE, count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_PATH = ".lc_chat_memory.sqlite"
+
+NO_SUMMARY = "(nothing yet)"
+
+_MESSAGE_CLASSES = {"human": HumanMessage, "ai": AIMessage}
+
+# (database, session) pairs with a background fold queued or running
+_folding: Set[Tuple[str, str]] = set()
+_folding_lock = threading.Lock()
+
+
+def _fold_executor() -> ThreadPoolExecutor:
+    return cached("memory_fold_executor", lambda: ThreadPoolExecutor(max_workers=4, thread_name_prefix="lcmemory"))
+
+
+@dataclass(frozen=True)
+class StoredMessage:
+    """One message of a session as kept on disk, with its token count computed once."""
+
+    seq: int
+    role: str
+    content: str
+    tokens: int
+
+    def to_message(self) -> BaseMessage:
+        return _MESSAGE_CLASSES[self.role](content=self.content)
+
+
+class ChatHistoryStore:
+    """
+    Per-session chat history in SQLite.
+
+    Each session keeps its running summary plus only the messages not yet
+    folded into it: fold() replaces the summary and deletes the messages it
+    now covers, so a session's footprint on disk stays bounded however long
+    the conversation runs. Token counts are stored with each message so
+    building a prompt never re-tokenizes the history.
+    """
+
+    def __init__(self, path: str = DEFAULT_MEMORY_PATH, model: str = DEFAULT_MODEL):
+        """
+        Initialize the store and create its tables if needed.
+
+        Args:
+            path (str): SQLite database file
+            model (str): Model whose tokenizer counts message tokens
+        """
+        self.path = path
+        self.model = model
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL DEFAULT '',"
+            " summary_tokens INTEGER NOT NULL DEFAULT 0,"
+            " folded INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " role TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " tokens INTEGER NOT NULL,"
+            " PRIMARY KEY (session, seq)) WITHOUT ROWID"
+        )
+
+    def append(self, session_id: str, messages: Sequence[Tuple[str, str]]) -> None:
+        """
+        Add messages at the end of a session.
+
+        Args:
+            session_id (str): Session identifier
+            messages (Sequence[Tuple[str, str]]): (role, content) pairs, role "human" or "ai"
+        """
+        rows = [(role, content, count_tokens(content, self.model)) for role, content in messages]
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO sessions (session, updated_at) VALUES (?, ?)"
+                    " ON CONFLICT (session) DO UPDATE SET updated_at = excluded.updated_at",
+                    (session_id, now),
+                )
+                (last,) = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq), (SELECT folded FROM sessions WHERE session = ?))"
+                    " FROM messages WHERE session = ?",
+                    (session_id, session_id),
+                ).fetchone()
+                self._conn.executemany(
+                    "INSERT INTO messages (session, seq, role, content, tokens) VALUES (?, ?, ?, ?, ?)",
+                    [(session_id, last + i + 1, role, content, tokens) for i, (role, content, tokens) in enumerate(rows)],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def load(self, session_id: str) -> Tuple[str, int, List[StoredMessage]]:
+        """
+        Return the summary of a session and the messages it does not cover yet.
+
+        Args:
+            session_id (str): Session identifier
+
+        Returns:
+            Tuple[str, int, List[StoredMessage]]: summary, its token count, and the messages, oldest first
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, summary_tokens FROM sessions WHERE session = ?", (session_id,)
+            ).fetchone()
+            messages = self._conn.execute(
+                "SELECT seq, role, content, tokens FROM messages WHERE session = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+        summary, summary_tokens = row if row is not None else ("", 0)
+        return summary, summary_tokens, [StoredMessage(*message) for message in messages]
+
+    def fold(self, session_id: str, summary: str, through_seq: int) -> None:
+        """
+        Replace the summary of a session and drop the messages it now covers.
+
+        Args:
+            session_id (str): Session identifier
+            summary (str): New running summary
+            through_seq (int): Last message sequence number included in the summary
+        """
+        tokens = count_tokens(summary, self.model)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE sessions SET summary = ?, summary_tokens = ?, folded = ?, updated_at = ? WHERE session = ?",
+                    (summary, tokens, through_seq, time.time(), session_id),
+                )
+                self._conn.execute("DELETE FROM messages WHERE session = ? AND seq <= ?", (session_id, through_seq))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self, session_id: str) -> None:
+        """Forget a session entirely."""
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session = ?", (session_id,))
+
+    def prune(self, max_age_seconds: float) -> int:
+        """
+        Delete sessions idle for longer than max_age_seconds.
+
+        Returns:
+            int: Number of sessions deleted
+        """
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            stale = [row[0] for row in self._conn.execute("SELECT session FROM sessions WHERE updated_at < ?", (cutoff,))]
+            for session_id in stale:
+                self._conn.execute("DELETE FROM messages WHERE session = ?", (session_id,))
+                self._conn.execute("DELETE FROM sessions WHERE session = ?", (session_id,))
+        return len(stale)
+
+    def stats(self, session_id: str) -> Dict[str, Any]:
+        """
+        Return the size of what a session keeps.
+
+        Returns:
+            Dict[str, Any]: folded (messages summarized so far), messages, history_tokens and summary_tokens
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT folded, summary_tokens FROM sessions WHERE session = ?", (session_id,)
+            ).fetchone()
+            count, tokens = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM messages WHERE session = ?", (session_id,)
+            ).fetchone()
+        folded, summary_tokens = row if row is not None else (0, 0)
+        return {"folded": folded, "messages": count, "history_tokens": tokens, "summary_tokens": summary_tokens}
+
+
+def get_history_store(path: str = DEFAULT_MEMORY_PATH, model: str = DEFAULT_MODEL) -> ChatHistoryStore:
+    """Return the shared store of a database file, opened once per process."""
+    return cached(("chat_history_store", path, model), lambda: ChatHistoryStore(path, model))
+
+
+class SummarizingMemory:
+    """
+    Bounded conversation memory of one session.
+
+    The last window_messages messages are kept verbatim; older ones are
+    rolled into a running summary by the summarizer chain once the verbatim
+    part outgrows the window or max_history_tokens. A fold then goes down to
+    low_water of both limits, so the summarizer runs once every few
+    exchanges instead of on every turn once the window is full. load() then caps summary + history + new input at max_prompt_tokens,
+    dropping the oldest verbatim messages first, so the prompt of every turn
+    has a fixed upper size instead of growing with the conversation.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        store: Optional[ChatHistoryStore] = None,
+        model: str = DEFAULT_MODEL,
+        window_messages: int = 8,
+        max_history_tokens: int = 1200,
+        max_summary_tokens: int = 300,
+        max_prompt_tokens: int = 2000,
+        summarizer: Optional[Runnable] = None,
+        low_water: float = 0.5,
+    ):
+        """
+        Initialize the memory.
+
+        Args:
+            session_id (str): Session identifier
+            store (Optional[ChatHistoryStore]): History store, the shared default one if omitted
+            model (str): Model used for token counting and, by default, for summarizing
+            window_messages (int): Recent messages kept verbatim
+            max_history_tokens (int): Verbatim history beyond this is folded into the summary
+            max_summary_tokens (int): The running summary is cut to this many tokens
+            max_prompt_tokens (int): Cap on summary + history + input tokens of one turn
+            summarizer (Optional[Runnable]): {"summary", "lines", "max_words"} -> str,
+                lcchains.memory_summary_chain(model) by default
+            low_water (float): A fold leaves at most this fraction of window_messages
+                and max_history_tokens verbatim
+        """
+        self.session_id = session_id
+        self.store = store or get_history_store(model=model)
+        self.model = model
+        self.window_messages = window_messages
+        self.max_history_tokens = max_history_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self.max_prompt_tokens = max_prompt_tokens
+        self._summarizer = summarizer
+        self.low_water = low_water
+        self.last_prompt_tokens = 0
+
+    @property
+    def summarizer(self) -> Runnable:
+        if self._summarizer is None:
+            from lcchains import memory_summary_chain
+
+            self._summarizer = memory_summary_chain(self.model)
+        return self._summarizer
+
+    def load(self, input_text: str = "") -> Dict[str, Any]:
+        """
+        Return the prompt variables for the next turn.
+
+        Args:
+            input_text (str): The new user message, counted against max_prompt_tokens
+
+        Returns:
+            Dict[str, Any]: "summary" (str) and "history" (list of messages), for CHAT_MESSAGES-style prompts
+        """
+        summary, summary_tokens, messages = self.store.load(self.session_id)
+        budget = self.max_prompt_tokens - summary_tokens - count_tokens(input_text, self.model) - TOKENS_PER_MESSAGE
+        kept: List[StoredMessage] = []
+        used = 0
+        for message in reversed(messages):
+            cost = message.tokens + TOKENS_PER_MESSAGE
+            if used + cost > budget:
+                break
+            kept.append(message)
+            used += cost
+        kept.reverse()
+        # Never start the verbatim history with an answer whose question was dropped
+        if kept and kept[0].role == "ai" and len(kept) < len(messages):
+            used -= kept.pop(0).tokens + TOKENS_PER_MESSAGE
+        self.last_prompt_tokens = self.max_prompt_tokens - budget + used
+        return {"summary": summary or NO_SUMMARY, "history": [message.to_message() for message in kept]}
+
+    def save(self, human: str, ai: str, background: bool = False) -> Optional[Future]:
+        """
+        Record one exchange, then fold the oldest messages into the summary if the window is full.
+
+        Args:
+            human (str): The user message
+            ai (str): The model's answer
+            background (bool): Fold on a worker thread instead of before returning
+
+        Returns:
+            Optional[Future]: The background fold, None if none was started
+        """
+        self.store.append(self.session_id, [("human", human), ("ai", ai)])
+        if background:
+            return self.compact_in_background()
+        self.compact()
+        return None
+
+    def compact_in_background(self) -> Optional[Future]:
+        """
+        Run compact() on a shared worker thread.
+
+        At most one fold per session is queued or running; a save arriving
+        meanwhile is picked up by the next one.
+
+        Returns:
+            Optional[Future]: Resolves to compact()'s result, None if a fold of the session is already pending
+        """
+        key = (self.store.path, self.session_id)
+        with _folding_lock:
+            if key in _folding:
+                return None
+            _folding.add(key)
+
+        def run() -> bool:
+            try:
+                return self.compact()
+            except Exception:
+                # The messages stay verbatim; the next save retries the fold
+                logger.exception(f"Folding the history of session {self.session_id} failed")
+                raise
+            finally:
+                with _folding_lock:
+                    _folding.discard(key)
+
+        return _fold_executor().submit(run)
+
+    def compact(self) -> bool:
+        """
+        Fold the oldest messages into the summary once the verbatim history outgrows its limits.
+
+        Returns:
+            bool: True if the summarizer was called
+        """
+        summary, _, messages = self.store.load(self.session_id)
+        tokens = sum(message.tokens for message in messages)
+        if len(messages) <= self.window_messages and tokens <= self.max_history_tokens:
+            return False
+        # Past the high-water mark: fold down to the low-water mark in one summarizer call
+        # Keep whole exchanges (an even count), at least the latest one
+        keep_messages = min(self.window_messages, max(2, int(self.window_messages * self.low_water) // 2 * 2))
+        keep_tokens = int(self.max_history_tokens * self.low_water)
+        cut = 0
+        while cut < len(messages) and (len(messages) - cut > keep_messages or tokens > keep_tokens):
+            tokens -= messages[cut].tokens
+            cut += 1
+        # Fold whole exchanges so the verbatim history starts with a question
+        while cut < len(messages) and messages[cut].role == "ai":
+            cut += 1
+        if cut == 0:
+            return False
+
+        folded = messages[:cut]
+        lines = "\n".join(f"{'User' if message.role == 'human' else 'Assistant'}: {message.content}" for message in folded)
+        new_summary = self.summarizer.invoke({
+            "summary": summary or NO_SUMMARY,
+            "lines": lines,
+            "max_words": max(20, self.max_summary_tokens * 3 // 4),
+        })
+        new_summary = truncate_to_tokens(str(getattr(new_summary, "content", new_summary)).strip(), self.max_summary_tokens, self.model)
+        self.store.fold(self.session_id, new_summary, folded[-1].seq)
+        return True
+
+    def clear(self) -> None:
+        """Forget the session."""
+        self.store.clear(self.session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the store's stats for the session plus the prompt tokens of the last load()."""
+        return {**self.store.stats(self.session_id), "last_prompt_tokens": self.last_prompt_tokens}
+
+
+class ConversationRunnable(Runnable):
+    """
+    Adds SummarizingMemory to a chat chain.
+
+    The session is taken from config["configurable"]["session_id"], as with
+    LangChain's RunnableWithMessageHistory. Before each call the chain input
+    is extended with the memory's "summary" and "history" variables; after
+    the call (or once a stream is fully consumed) the exchange is saved.
+    Folding it into the summary takes another model call, which by default
+    runs in the background, so the answer is not held back by it.
+    """
+
+    def __init__(
+        self,
+        chain: Runnable,
+        memory_factory: Callable[[str], SummarizingMemory] = SummarizingMemory,
+        input_key: str = "input",
+        background_fold: bool = True,
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            chain (Runnable): Chain whose prompt takes summary, history and input_key
+            memory_factory (Callable[[str], SummarizingMemory]): Builds the memory of a session id
+            input_key (str): Input field holding the user message
+            background_fold (bool): Fold the history on a worker thread after each call
+        """
+        self.chain = chain
+        self.memory_factory = memory_factory
+        self.input_key = input_key
+        self.background_fold = background_fold
+
+    def _memory(self, config: Optional[RunnableConfig]) -> SummarizingMemory:
+        session_id = ((config or {}).get("configurable") or {}).get("session_id")
+        if not session_id:
+            raise ValueError('ConversationRunnable needs config={"configurable": {"session_id": ...}}')
+        return self.memory_factory(session_id)
+
+    @staticmethod
+    def _text(output: Any) -> str:
+        return str(getattr(output, "content", output))
+
+    def invoke(self, input: Dict[str, Any], config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        memory = self._memory(config)
+        output = self.chain.invoke({**input, **memory.load(input[self.input_key])}, config, **kwargs)
+        memory.save(input[self.input_key], self._text(output), self.background_fold)
+        return output
+
+    async def ainvoke(self, input: Dict[str, Any], config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        memory = self._memory(config)
+        variables = await asyncio.to_thread(memory.load, input[self.input_key])
+        output = await self.chain.ainvoke({**input, **variables}, config, **kwargs)
+        await asyncio.to_thread(memory.save, input[self.input_key], self._text(output), self.background_fold)
+        return output
+
+    def stream(self, input: Dict[str, Any], config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        memory = self._memory(config)
+        parts: List[str] = []
+        for chunk in self.chain.stream({**input, **memory.load(input[self.input_key])}, config, **kwargs):
+            parts.append(self._text(chunk))
+            yield chunk
+        # Only reached when the stream was consumed to the end; an abandoned answer is not remembered
+        memory.save(input[self.input_key], "".join(parts), self.background_fold)
+
+    async def astream(self, input: Dict[str, Any], config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        memory = self._memory(config)
+        variables = await asyncio.to_thread(memory.load, input[self.input_key])
+        parts: List[str] = []
+        async for chunk in self.chain.astream({**input, **variables}, config, **kwargs):
+            parts.append(self._text(chunk))
+            yield chunk
+        await asyncio.to_thread(memory.save, input[self.input_key], "".join(parts), self.background_fold)
@@ -0,0 +1,429 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lcembedding import content_hash
+from lcvectorindex import _normalize, _save_array, _save_json
+
+MODES = ("int8", "binary")
+
+# Bytes of decoded codes per step of the first pass: small blocks stay in the CPU cache
+SCAN_BYTES = 2 * 2**20
+
+# Most bytes of first-pass scores held at once; larger query batches are split
+SCORE_BYTES = 64 * 2**20
+
+# Candidates rescored at full precision per result (k * oversample)
+DEFAULT_OVERSAMPLE = {"int8": 4, "binary": 16}
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def quantize_int8(vectors) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric int8 quantization with one scale per vector.
+
+    Args:
+        vectors: (n, dim) array-like
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n, dim) int8 codes and (n,) float32 scales,
+            with vectors ~= codes * scales[:, None]
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors) -> np.ndarray:
+    """
+    Keep only the sign of each dimension, packed 8 per byte.
+
+    Args:
+        vectors: (n, dim) array-like
+
+    Returns:
+        np.ndarray: (n, ceil(dim / 8)) uint8 codes
+    """
+    return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+
+def hamming(codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Hamming distances between packed binary codes and one packed query.
+
+    Args:
+        codes (np.ndarray): (n, bytes) uint8 codes
+        query (np.ndarray): (bytes,) uint8 code
+
+    Returns:
+        np.ndarray: (n,) int32 number of differing bits
+    """
+    diff = np.bitwise_xor(codes, query)
+    if hasattr(np, "bitwise_count"):
+        # NumPy 2 has a native popcount; 8-byte words need 8x fewer of them
+        if diff.shape[1] % 8 == 0:
+            diff = diff.view(np.uint64)
+        return np.bitwise_count(diff).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT[diff].sum(axis=1, dtype=np.int32)
+
+
+class QuantizedVectorIndex:
+    """
+    Cosine-similarity index over int8 or 1-bit codes instead of float32 rows.
+
+    int8 keeps one signed byte per dimension plus a float32 scale per row (about
+    4x smaller than float32, 30x smaller than a list of Python floats); binary
+    keeps only the sign of each dimension and ranks by Hamming distance (32x
+    smaller than float32). A search scans the codes block by block (SCAN_BYTES),
+    keeps the k * oversample best candidates and, when full-precision vectors are
+    kept (rescore=True), re-ranks just those candidates by exact cosine similarity.
+    The int8 scan decodes each block to float32, so it saves memory rather than
+    time; the binary scan is several times faster than exact float32 search.
+
+    save() writes the full vectors next to the codes and load() memory-maps them,
+    so only the codes stay in RAM and rescoring reads a few rows from disk. Adding
+    to a loaded index copies the full vectors back into memory. Otherwise the
+    interface is that of NumpyVectorIndex.
+    """
+
+    def __init__(self, dim: Optional[int] = None, mode: str = "int8", rescore: bool = True,
+                 capacity: int = 1024, embedder=None):
+        """
+        Initialize an empty index.
+
+        Args:
+            dim (Optional[int]): Vector length, inferred from the first add when None
+            mode (str): "int8" or "binary"
+            rescore (bool): Keep float32 vectors to rescore the first-pass candidates
+            capacity (int): Initial number of preallocated rows
+            embedder: Optional object with embed_documents/embed_query (e.g. an
+                EmbeddingPipeline), required by add_texts and similarity_search
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.dim = dim
+        self.mode = mode
+        self.rescore = rescore
+        self.embedder = embedder
+        self._capacity = capacity
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._full: Optional[np.ndarray] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._ids: List[Optional[str]] = []
+        self._texts: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        if dim:
+            self._reserve(capacity)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._rows
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the codes, scales and liveness mask (what a search scans)."""
+        arrays = (self._codes, self._scales, self._alive)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    @property
+    def full_nbytes(self) -> int:
+        """Bytes of the float32 vectors kept for rescoring (on disk after load(mmap=True))."""
+        return self._full.nbytes if self._full is not None else 0
+
+    def _reserve(self, rows: int) -> None:
+        if self._codes is not None and rows <= len(self._codes):
+            return
+        capacity = max(1, self._capacity if self._codes is None else len(self._codes))
+        while capacity < rows:
+            capacity *= 2
+        if self.mode == "int8":
+            codes = np.empty((capacity, self.dim), dtype=np.int8)
+        else:
+            codes = np.empty((capacity, (self.dim + 7) // 8), dtype=np.uint8)
+        scales = np.ones(capacity, dtype=np.float32) if self.mode == "int8" else None
+        full = np.empty((capacity, self.dim), dtype=np.float32) if self.rescore else None
+        alive = np.zeros(capacity, dtype=bool)
+        size = self._size
+        if size:
+            codes[:size] = self._codes[:size]
+            alive[:size] = self._alive[:size]
+            if scales is not None:
+                scales[:size] = self._scales[:size]
+            if full is not None:
+                full[:size] = self._full[:size]
+        self._codes, self._scales, self._full, self._alive = codes, scales, full, alive
+
+    def _store(self, rows, vectors: np.ndarray) -> None:
+        if self.mode == "int8":
+            self._codes[rows], self._scales[rows] = quantize_int8(vectors)
+        else:
+            self._codes[rows] = quantize_binary(vectors)
+        if self._full is not None:
+            self._full[rows] = vectors
+
+    def add(self, ids: Sequence[str], vectors, texts: Optional[Sequence[str]] = None) -> None:
+        """
+        Quantize and insert or replace vectors.
+
+        Args:
+            ids (Sequence[str]): Unique identifiers, existing ids are overwritten
+            vectors: (n, dim) array-like of embeddings
+            texts (Optional[Sequence[str]]): Source text stored alongside each vector
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors must be a 2-D array with one row per id")
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Vector length {vectors.shape[1]} does not match index dimension {self.dim}")
+
+        vectors = _normalize(vectors)
+        # Later duplicates of an id within one call win, as they would across calls
+        fresh = list({id: i for i, id in enumerate(ids) if id not in self._rows}.values())
+        self._reserve(self._size + len(fresh))
+
+        replaced = {self._rows[id]: i for i, id in enumerate(ids) if id in self._rows}
+        if replaced:
+            self._store(np.fromiter(replaced, dtype=np.int64), vectors[list(replaced.values())])
+            if texts is not None:
+                for row, i in replaced.items():
+                    self._texts[row] = texts[i]
+
+        start = self._size
+        end = start + len(fresh)
+        if fresh:
+            self._store(slice(start, end), vectors[fresh])
+        self._alive[start:end] = True
+        for offset, i in enumerate(fresh):
+            self._rows[ids[i]] = start + offset
+            self._ids.append(ids[i])
+            self._texts.append(texts[i] if texts is not None else None)
+        self._size = end
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        Remove vectors by id.
+
+        Args:
+            ids (Iterable[str]): Identifiers to delete, unknown ids are ignored
+
+        Returns:
+            int: Number of vectors removed
+        """
+        removed = 0
+        for id in ids:
+            row = self._rows.pop(id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._ids[row] = None
+                self._texts[row] = None
+                removed += 1
+        if self._size and self._size - len(self._rows) > self._size // 4:
+            self.compact()
+        return removed
+
+    def compact(self) -> None:
+        """Drop deleted rows so the codes are dense again."""
+        live = np.flatnonzero(self._alive[: self._size])
+        self._codes[: len(live)] = self._codes[live]
+        if self._scales is not None:
+            self._scales[: len(live)] = self._scales[live]
+        if self._full is not None:
+            self._full[: len(live)] = self._full[live]
+        self._alive[: len(live)] = True
+        self._alive[len(live):] = False
+        self._ids = [self._ids[row] for row in live]
+        self._texts = [self._texts[row] for row in live]
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._size = len(live)
+
+    def _first_pass(self, queries: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate scores of every row, keeping the best count rows per query."""
+        scores = np.empty((len(queries), self._size), dtype=np.float32)
+        if self.mode == "int8":
+            step = max(1, SCAN_BYTES // (4 * self.dim))
+            for start in range(0, self._size, step):
+                end = min(start + step, self._size)
+                # The float query against decoded int8 codes keeps the query's precision
+                block = self._codes[start:end].astype(np.float32)
+                scores[:, start:end] = (queries @ block.T) * self._scales[start:end]
+        else:
+            step = max(1, SCAN_BYTES // self._codes.shape[1])
+            bits = quantize_binary(queries)
+            for start in range(0, self._size, step):
+                end = min(start + step, self._size)
+                for i, query in enumerate(bits):
+                    scores[i, start:end] = hamming(self._codes[start:end], query)
+            # 1 - 2 * Hamming / dim estimates the cosine between sign vectors
+            scores *= -2 / self.dim
+            scores += 1
+        if len(self._rows) != self._size:
+            scores[:, ~self._alive[: self._size]] = -np.inf
+        if count < self._size:
+            rows = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        else:
+            rows = np.broadcast_to(np.arange(self._size), scores.shape)
+        return rows, np.take_along_axis(scores, rows, axis=1)
+
+    def _rescore(self, queries: np.ndarray, rows: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        exact = np.full(scores.shape, -np.inf, dtype=np.float32)
+        for i, (query, candidates) in enumerate(zip(queries, rows)):
+            # Ascending rows read a memory-mapped file front to back
+            order = np.argsort(candidates)
+            exact[i, order] = self._full[candidates[order]] @ query
+        exact[~np.isfinite(scores)] = -np.inf
+        return exact
+
+    def search(self, query, k: int = 4, oversample: Optional[int] = None,
+               rescore: Optional[bool] = None) -> List[Tuple[str, float]]:
+        """
+        Return the k most similar ids to a query vector.
+
+        Args:
+            query: (dim,) array-like query embedding
+            k (int): Number of results
+            oversample (Optional[int]): Candidates per result to rescore (DEFAULT_OVERSAMPLE)
+            rescore (Optional[bool]): Rescore at full precision (default: when vectors are kept)
+
+        Returns:
+            List[Tuple[str, float]]: (id, cosine similarity) pairs, best first
+        """
+        return self.search_batch(np.asarray(query, dtype=np.float32)[None, :], k, oversample, rescore)[0]
+
+    def search_batch(self, queries, k: int = 4, oversample: Optional[int] = None,
+                     rescore: Optional[bool] = None) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k search for several queries in one scan of the codes.
+
+        Without rescoring the scores are the quantized estimates of the cosine similarity.
+
+        Args:
+            queries: (m, dim) array-like of query embeddings
+            k (int): Number of results per query
+            oversample (Optional[int]): Candidates per result to rescore (DEFAULT_OVERSAMPLE)
+            rescore (Optional[bool]): Rescore at full precision (default: when vectors are kept)
+
+        Returns:
+            List[List[Tuple[str, float]]]: Results per query, best first
+        """
+        queries = _normalize(np.asarray(queries, dtype=np.float32))
+        if not self._rows:
+            return [[] for _ in range(len(queries))]
+        rescore = self._full is not None if rescore is None else rescore
+        if rescore and self._full is None:
+            raise ValueError("This index keeps no full-precision vectors (rescore=False)")
+        k = min(k, len(self._rows))
+        count = min(len(self._rows), k * (oversample or DEFAULT_OVERSAMPLE[self.mode])) if rescore else k
+        group = max(1, SCORE_BYTES // (4 * self._size))
+        passes = [self._first_pass(queries[i: i + group], count) for i in range(0, len(queries), group)]
+        rows = np.concatenate([rows for rows, _ in passes])
+        scores = np.concatenate([scores for _, scores in passes])
+        if rescore:
+            scores = self._rescore(queries, rows, scores)
+        order = np.argsort(-scores, axis=1)[:, :k]
+        rows = np.take_along_axis(rows, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        return [
+            [(self._ids[row], float(score)) for row, score in zip(row_ids, row_scores) if np.isfinite(score)]
+            for row_ids, row_scores in zip(rows, scores)
+        ]
+
+    def text(self, id: str) -> Optional[str]:
+        """Return the text stored with an id, if any."""
+        return self._texts[self._rows[id]]
+
+    def add_texts(self, texts: Sequence[str]) -> List[str]:
+        """
+        Embed texts with the index's embedder and add them, keyed by content hash.
+
+        Args:
+            texts (Sequence[str]): Texts to index
+
+        Returns:
+            List[str]: Ids of the added texts
+        """
+        ids = [content_hash(text) for text in texts]
+        self.add(ids, self.embedder.embed_documents(texts), texts)
+        return ids
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """
+        Embed a query with the index's embedder and return the k closest texts.
+
+        Returns:
+            List[Tuple[str, float]]: (text, cosine similarity) pairs, best first
+        """
+        return [(self.text(id), score) for id, score in self.search(self.embedder.embed_query(query), k)]
+
+    def save(self, directory: str) -> None:
+        """
+        Write the index to a directory (codes.bin, scales.f32, vectors.f32, ids.json, meta.json).
+
+        Deleted rows are compacted away first. All arrays are raw row-major
+        files; vectors.f32 is only written when full vectors are kept. Each
+        file is written under a temporary name and swapped in, so a loaded
+        index may be saved back to the directory it maps.
+
+        Args:
+            directory (str): Target directory, created if needed
+        """
+        os.makedirs(directory, exist_ok=True)
+        if len(self._rows) != self._size:
+            self.compact()
+        if self._size:
+            _save_array(os.path.join(directory, "codes.bin"), self._codes[: self._size])
+            if self._scales is not None:
+                _save_array(os.path.join(directory, "scales.f32"), self._scales[: self._size])
+            if self._full is not None:
+                _save_array(os.path.join(directory, "vectors.f32"), self._full[: self._size])
+        _save_json(os.path.join(directory, "ids.json"), {"ids": self._ids, "texts": self._texts})
+        _save_json(
+            os.path.join(directory, "meta.json"),
+            {"dim": self.dim, "size": self._size, "mode": self.mode, "rescore": self._full is not None},
+        )
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, embedder=None) -> "QuantizedVectorIndex":
+        """
+        Load an index written by save().
+
+        Args:
+            directory (str): Directory passed to save()
+            mmap (bool): Memory-map the full vectors (copy-on-write) instead of reading them
+            embedder: Optional embedder for add_texts/similarity_search
+
+        Returns:
+            QuantizedVectorIndex: The loaded index, codes in memory
+        """
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, "ids.json"), encoding="utf-8") as f:
+            stored = json.load(f)
+        index = cls(meta["dim"], meta["mode"], meta["rescore"], capacity=max(1, meta["size"]), embedder=embedder)
+        size, dim = meta["size"], meta["dim"]
+        if size:
+            index._codes = np.fromfile(os.path.join(directory, "codes.bin"), dtype=index._codes.dtype).reshape(size, -1)
+            if index.mode == "int8":
+                index._scales = np.fromfile(os.path.join(directory, "scales.f32"), dtype=np.float32)
+            if meta["rescore"]:
+                path = os.path.join(directory, "vectors.f32")
+                if mmap:
+                    index._full = np.memmap(path, dtype=np.float32, mode="c", shape=(size, dim))
+                else:
+                    index._full = np.fromfile(path, dtype=np.float32).reshape(size, dim)
+            index._alive = np.ones(size, dtype=bool)
+        index._size = size
+        index._ids = stored["ids"]
+        index._texts = stored["texts"]
+        index._rows = {id: row for row, id in enumerate(index._ids)}
+        return index
@@ -0,0 +1,465 @@
+import asyncio
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, TypeVar
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.rate_limiters import BaseRateLimiter
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from lcfactory import cached
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Optional hard cap per limiter (e.g. the tier's published limit); without it
+# limiters send as fast as callers ask and only slow down once a 429 comes back
+DEFAULT_REQUESTS_PER_SECOND = float(os.environ["LC_RATE_LIMIT_RPS"]) if os.getenv("LC_RATE_LIMIT_RPS") else None
+
+
+def status_code(error: Exception) -> Optional[int]:
+    """Return the HTTP status carried by a provider exception, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits, server errors, timeouts and dropped connections."""
+    status = status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in (
+        "APIConnectionError",
+        "APITimeoutError",
+        "RateLimitError",
+        "ResourceExhausted",
+        "ServiceUnavailable",
+    )
+
+
+def is_rate_limit(error: Exception) -> bool:
+    """True when the provider rejected the call for exceeding its quota."""
+    return status_code(error) == 429 or type(error).__name__ in ("RateLimitError", "ResourceExhausted")
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Return the wait the provider asked for, in seconds.
+
+    Reads the Retry-After header, or OpenAI's "Please try again in 1.2s"
+    wording when the header is missing.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    if value is None:
+        match = re.search(r"try again in ([\d.]+)(ms|s)", str(error))
+        if match is None:
+            return None
+        return float(match.group(1)) / (1000 if match.group(2) == "ms" else 1)
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class AdaptiveRateLimiter(BaseRateLimiter):
+    """
+    Token-bucket rate limiter that adapts its rate to the provider's quota.
+
+    Works from any number of threads and event loops at once: the bucket is
+    only touched under a short lock and waiting happens outside it. Waiters
+    re-check the bucket after each sleep, so a rate change applies to calls
+    already queued, not just to new ones.
+
+    Without max_requests_per_second nothing is paced until the provider
+    returns the first 429. From then on the rate follows additive-increase /
+    multiplicative-decrease: a 429 reported via on_rate_limited() halves the
+    rate actually sent (at most once per second, as a burst of calls is
+    rejected together) and pauses the bucket for the Retry-After period;
+    every success adds a small step, probing past the rate that last
+    failed, up to max_requests_per_second if one is set. Sustained load
+    therefore settles just under the real quota instead of bouncing off it.
+
+    It can be passed as rate_limiter= to any LangChain chat model, and is used
+    by RetryingRunnable / RetryingEmbeddings, which also report 429s to it.
+    """
+
+    def __init__(
+        self,
+        max_requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND,
+        min_requests_per_second: float = 0.1,
+        burst: Optional[float] = None,
+        increase: float = 0.02,
+        decrease: float = 0.5,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_requests_per_second (Optional[float]): Starting and highest rate; None for no cap
+            min_requests_per_second (float): Rate never drops below this
+            burst (Optional[float]): Bucket size; defaults to one second of traffic
+            increase (float): Rate added per second of successful traffic, as a fraction of
+                the maximum (without one, of the rate that last drew a 429)
+            decrease (float): Factor applied to the rate on every 429
+        """
+        self.max_rate = max_requests_per_second
+        self.min_rate = min_requests_per_second
+        self.rate = max_requests_per_second or math.inf
+        self._burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.throttled = 0
+        self.waited = 0.0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._ceiling = self.rate
+        # Requests sent in the current and the previous one-second window
+        self._window_start = self._updated
+        self._window_sent = 0
+        self._sent_rate = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def burst(self) -> float:
+        return self._burst or max(1.0, min(self.rate, self.max_rate or math.inf))
+
+    def _refill(self, now: float) -> None:
+        # No refill while paused for a Retry-After period
+        elapsed = now - max(self._updated, self._paused_until)
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _count_sent(self, now: float) -> None:
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self._sent_rate = self._window_sent / elapsed
+            self._window_start, self._window_sent = now, 0
+        self._window_sent += 1
+
+    def _try_take(self) -> float:
+        # Returns 0 when a slot was taken, otherwise how long until one may be free
+        with self._lock:
+            now = time.monotonic()
+            pause = self._paused_until - now
+            if pause > 0:
+                return pause
+            if math.isinf(self.rate):
+                self._count_sent(now)
+                return 0.0
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._count_sent(now)
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        """
+        Take one request slot.
+
+        Args:
+            blocking (bool): Wait for a slot instead of returning False
+
+        Returns:
+            bool: True once a slot was taken
+        """
+        while True:
+            wait = self._try_take()
+            if wait == 0:
+                return True
+            if not blocking:
+                return False
+            self.waited += wait
+            time.sleep(wait)
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        """Asyncio version of acquire(); waiting does not block the event loop."""
+        while True:
+            wait = self._try_take()
+            if wait == 0:
+                return True
+            if not blocking:
+                return False
+            self.waited += wait
+            await asyncio.sleep(wait)
+
+    def on_success(self) -> None:
+        """Raise the rate a step after a call went through."""
+        with self._lock:
+            if math.isinf(self.rate):
+                return
+            # Grows by about increase * ceiling per second of traffic, whatever the current rate;
+            # without a cap it keeps probing above the rate that last drew a 429
+            ceiling = self.max_rate or self._ceiling
+            self.rate = min(self.max_rate or math.inf, self.rate + self.increase * ceiling / max(self.rate, 1.0))
+
+    def on_rate_limited(self, wait: Optional[float] = None) -> None:
+        """
+        Slow down after a 429.
+
+        Args:
+            wait (Optional[float]): Retry-After seconds; no slot is handed out before then
+        """
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            # Calls sent in the same burst all come back 429; treat them as one congestion signal
+            if now - self._last_decrease >= 1.0:
+                # The rate actually sent, not the allowance, is what the provider refused
+                sent = max(self._sent_rate, float(self._window_sent), 1.0)
+                if math.isinf(self.rate):
+                    self._updated = now
+                self._ceiling = min(self.rate, sent)
+                self.rate = max(self.min_rate, self._ceiling * self.decrease)
+                self._tokens = min(self._tokens, self.burst)
+                self._last_decrease = now
+            if wait:
+                self._paused_until = max(self._paused_until, now + wait)
+                self._tokens = 0.0
+
+    def summary(self) -> str:
+        """Return the limiter state as a one-line, human readable string."""
+        rate = "unlimited" if math.isinf(self.rate) else f"{self.rate:.1f}"
+        cap = "no cap" if self.max_rate is None else f"{self.max_rate:.1f}"
+        return f"{rate}/{cap} req/s · {self.throttled} rate limited · {self.waited:.1f}s waited"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with jitter, honoring Retry-After when the provider sends it."""
+
+    max_retries: int = 6
+    base_delay: float = 0.5
+    max_delay: float = 60.0
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """
+        Return the wait before the next attempt.
+
+        Args:
+            attempt (int): Number of the failed attempt, starting at 0
+            error (Exception): The failure
+
+        Returns:
+            float: Seconds to wait
+        """
+        requested = retry_after(error)
+        if requested is not None:
+            # A little jitter so callers told the same Retry-After do not return in lockstep
+            return min(self.max_delay, requested) * random.uniform(1.0, 1.2)
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def _after_failure(error: Exception, attempt: int, policy: RetryPolicy, limiter: Optional[AdaptiveRateLimiter]) -> float:
+    if limiter is not None and is_rate_limit(error):
+        limiter.on_rate_limited(retry_after(error))
+    if attempt >= policy.max_retries or not is_retryable(error):
+        raise error
+    delay = policy.delay(attempt, error)
+    logger.warning(f"{type(error).__name__}: {error}; retry {attempt + 1}/{policy.max_retries} in {delay:.1f}s")
+    return delay
+
+
+def call_with_retry(
+    fn: Callable[..., T],
+    *args: Any,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    **kwargs: Any,
+) -> T:
+    """
+    Call fn, pacing it with limiter and retrying transient failures per policy.
+
+    Args:
+        fn (Callable[..., T]): Provider call
+        *args: Positional arguments of fn
+        policy (RetryPolicy): Backoff settings
+        limiter (Optional[AdaptiveRateLimiter]): Shared limiter of the provider
+        **kwargs: Keyword arguments of fn
+
+    Returns:
+        T: Result of fn
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            time.sleep(_after_failure(e, attempt, policy, limiter))
+            attempt += 1
+            continue
+        if limiter is not None:
+            limiter.on_success()
+        return result
+
+
+async def acall_with_retry(
+    fn: Callable[..., Awaitable[T]],
+    *args: Any,
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    **kwargs: Any,
+) -> T:
+    """Asyncio version of call_with_retry()."""
+    attempt = 0
+    while True:
+        if limiter is not None:
+            await limiter.aacquire()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            await asyncio.sleep(_after_failure(e, attempt, policy, limiter))
+            attempt += 1
+            continue
+        if limiter is not None:
+            limiter.on_success()
+        return result
+
+
+class RetryingRunnable(Runnable):
+    """
+    Wraps a chat model (or any runnable) with rate limiting and retries.
+
+    invoke/ainvoke (and therefore batch/abatch) wait for the limiter and
+    retry 429s, 5xx, timeouts and connection errors with backoff. stream/astream
+    retry only until the first chunk arrived, so no partial answer is repeated.
+    Attributes not defined here are read from the wrapped runnable.
+
+    Wrap clients created with their own retries turned off (max_retries=0),
+    otherwise SDK-internal retries bypass the limiter.
+    """
+
+    def __init__(self, bound: Runnable, limiter: Optional[AdaptiveRateLimiter] = None, policy: RetryPolicy = DEFAULT_RETRY_POLICY):
+        """
+        Initialize the wrapper.
+
+        Args:
+            bound (Runnable): Wrapped runnable
+            limiter (Optional[AdaptiveRateLimiter]): Shared limiter of the provider
+            policy (RetryPolicy): Backoff settings
+        """
+        self.bound = bound
+        self.limiter = limiter
+        self.policy = policy
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "bound":
+            raise AttributeError(name)
+        return getattr(self.bound, name)
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return call_with_retry(self.bound.invoke, input, config, policy=self.policy, limiter=self.limiter, **kwargs)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return await acall_with_retry(self.bound.ainvoke, input, config, policy=self.policy, limiter=self.limiter, **kwargs)
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire()
+            started = False
+            try:
+                for chunk in self.bound.stream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    raise
+                time.sleep(_after_failure(e, attempt, self.policy, self.limiter))
+                attempt += 1
+                continue
+            if self.limiter is not None:
+                self.limiter.on_success()
+            return
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                await self.limiter.aacquire()
+            started = False
+            try:
+                async for chunk in self.bound.astream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    raise
+                await asyncio.sleep(_after_failure(e, attempt, self.policy, self.limiter))
+                attempt += 1
+                continue
+            if self.limiter is not None:
+                self.limiter.on_success()
+            return
+
+
+class RetryingEmbeddings(Embeddings):
+    """Wraps an Embeddings model with rate limiting and retries, like RetryingRunnable."""
+
+    def __init__(self, embeddings: Embeddings, limiter: Optional[AdaptiveRateLimiter] = None, policy: RetryPolicy = DEFAULT_RETRY_POLICY):
+        """
+        Initialize the wrapper.
+
+        Args:
+            embeddings (Embeddings): Wrapped model, created with its own retries turned off
+            limiter (Optional[AdaptiveRateLimiter]): Shared limiter of the provider
+            policy (RetryPolicy): Backoff settings
+        """
+        self.embeddings = embeddings
+        self.limiter = limiter
+        self.policy = policy
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return call_with_retry(self.embeddings.embed_documents, texts, policy=self.policy, limiter=self.limiter)
+
+    def embed_query(self, text: str) -> List[float]:
+        return call_with_retry(self.embeddings.embed_query, text, policy=self.policy, limiter=self.limiter)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await acall_with_retry(self.embeddings.aembed_documents, texts, policy=self.policy, limiter=self.limiter)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await acall_with_retry(self.embeddings.aembed_query, text, policy=self.policy, limiter=self.limiter)
+
+
+def get_rate_limiter(name: str, max_requests_per_second: Optional[float] = DEFAULT_REQUESTS_PER_SECOND) -> AdaptiveRateLimiter:
+    """
+    Return the process-wide limiter of a provider/model.
+
+    All clients of the same name share one limiter, so the Streamlit sessions,
+    batch() calls and background jobs of a process draw from one budget.
+
+    Args:
+        name (str): Limiter name, e.g. "openai:gpt-4o-mini"
+        max_requests_per_second (Optional[float]): Highest rate, used when the limiter is
+            first created; defaults to LC_RATE_LIMIT_RPS, None leaves it uncapped
+
+    Returns:
+        AdaptiveRateLimiter: Shared limiter
+    """
+    return cached(("rate_limiter", name), lambda: AdaptiveRateLimiter(max_requests_per_second))
+
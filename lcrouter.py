@@ -0,0 +1,314 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from lcfactory import cached, get_gemini_model, get_model
+
+
+class BackendStats:
+    """Rolling latency and error-rate window of one backend."""
+
+    def __init__(self, window: int = 50):
+        self.latencies: deque = deque(maxlen=window)
+        self.outcomes: deque = deque(maxlen=window)
+        self.calls = 0
+        self.open_until = 0.0
+
+    def record(self, latency: Optional[float], ok: bool) -> None:
+        self.calls += 1
+        self.outcomes.append(ok)
+        if ok and latency is not None:
+            self.latencies.append(latency)
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ModelRouter(Runnable):
+    """
+    Chat model stand-in that routes each request to the fastest healthy backend.
+
+    Drop it in wherever a model goes: `prompt | router | parser`. Every
+    backend (any chat model runnable) keeps a rolling window of latencies and
+    outcomes. Requests go to the healthy backend with the lowest median
+    latency; backends without measurements yet are tried first. A backend
+    whose error rate exceeds max_error_rate is skipped for cooldown seconds
+    and only used as a last resort.
+
+    invoke/ainvoke hedge: when the chosen backend has not answered after its
+    own p95 latency, the same request is also sent to the next backend and the
+    first answer wins. A failed call fails over to the next backend. stream
+    fails over only if nothing was streamed yet and never hedges, so tokens
+    are not paid for twice.
+    """
+
+    def __init__(
+        self,
+        backends: Mapping[str, Runnable],
+        window: int = 50,
+        min_samples: int = 5,
+        hedge_percentile: float = 0.95,
+        min_hedge_delay: float = 0.05,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0,
+        hedge: bool = True,
+        max_workers: int = 16,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            backends (Mapping[str, Runnable]): Name -> chat model, in order of preference
+                while nothing is measured
+            window (int): Number of recent calls kept per backend
+            min_samples (int): Calls needed before error rate and p95 are trusted
+            hedge_percentile (float): Latency percentile after which a request is hedged
+            min_hedge_delay (float): Never hedge earlier than this many seconds
+            max_error_rate (float): Error rate above which a backend is taken out of rotation
+            cooldown (float): Seconds an unhealthy backend stays out of rotation
+            hedge (bool): Whether slow requests are hedged at all
+            max_workers (int): Threads used by invoke for primary and hedged calls
+        """
+        if not backends:
+            raise ValueError("ModelRouter needs at least one backend")
+        self.backends = dict(backends)
+        self.min_samples = min_samples
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.stats_by_backend = {name: BackendStats(window) for name in self.backends}
+        self.hedges = 0
+        self.failovers = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="router")
+
+    def _ranked(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            healthy, unhealthy = [], []
+            for order, (name, stats) in enumerate(self.stats_by_backend.items()):
+                p50 = stats.percentile(0.5)
+                key = (p50 if p50 is not None else 0.0, order)
+                (healthy if stats.open_until <= now else unhealthy).append((key, name))
+        return [name for _, name in sorted(healthy)] + [name for _, name in sorted(unhealthy)]
+
+    def _record(self, name: str, latency: Optional[float], ok: bool) -> None:
+        with self._lock:
+            stats = self.stats_by_backend[name]
+            stats.record(latency, ok)
+            if len(stats.outcomes) >= self.min_samples and stats.error_rate > self.max_error_rate:
+                stats.open_until = time.monotonic() + self.cooldown
+                # Start the next probation with a clean window
+                stats.outcomes.clear()
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        if not self.hedge:
+            return None
+        with self._lock:
+            stats = self.stats_by_backend[name]
+            if len(stats.latencies) < self.min_samples:
+                return None
+            return max(self.min_hedge_delay, stats.percentile(self.hedge_percentile))
+
+    def _call(self, name: str, input: Any, config: Optional[RunnableConfig], **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            result = self.backends[name].invoke(input, config, **kwargs)
+        except Exception:
+            self._record(name, None, False)
+            raise
+        self._record(name, time.perf_counter() - start, True)
+        return result
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        queue = self._ranked()
+        pending: Dict[Future, str] = {}
+        errors: List[Exception] = []
+        hedged = False
+
+        def launch() -> str:
+            name = queue.pop(0)
+            pending[self._executor.submit(self._call, name, input, config, **kwargs)] = name
+            return name
+
+        primary = launch()
+        while pending:
+            timeout = None
+            if not hedged and queue and len(pending) == 1:
+                timeout = self._hedge_delay(primary)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                with self._lock:
+                    self.hedges += 1
+                launch()
+                continue
+            for future in done:
+                pending.pop(future)
+                try:
+                    # The losing call of a hedge finishes in the background and still updates its stats
+                    return future.result()
+                except Exception as e:
+                    errors.append(e)
+            if not pending and queue:
+                with self._lock:
+                    self.failovers += 1
+                primary = launch()
+        raise errors[-1]
+
+    async def _acall(self, name: str, input: Any, config: Optional[RunnableConfig], **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await self.backends[name].ainvoke(input, config, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._record(name, None, False)
+            raise
+        self._record(name, time.perf_counter() - start, True)
+        return result
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        queue = self._ranked()
+        pending: Dict[asyncio.Task, str] = {}
+        errors: List[Exception] = []
+        hedged = False
+
+        def launch() -> str:
+            name = queue.pop(0)
+            pending[asyncio.ensure_future(self._acall(name, input, config, **kwargs))] = name
+            return name
+
+        primary = launch()
+        try:
+            while pending:
+                timeout = None
+                if not hedged and queue and len(pending) == 1:
+                    timeout = self._hedge_delay(primary)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    with self._lock:
+                        self.hedges += 1
+                    launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+                if not pending and queue:
+                    with self._lock:
+                        self.failovers += 1
+                    primary = launch()
+        finally:
+            # The slower call of a hedge is cancelled rather than left running
+            for task in pending:
+                task.cancel()
+        raise errors[-1]
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        errors: List[Exception] = []
+        for name in self._ranked():
+            start = time.perf_counter()
+            started = False
+            try:
+                for chunk in self.backends[name].stream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self._record(name, None, False)
+                if started:
+                    raise
+                errors.append(e)
+                with self._lock:
+                    self.failovers += 1
+                continue
+            self._record(name, time.perf_counter() - start, True)
+            return
+        raise errors[-1]
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        errors: List[Exception] = []
+        for name in self._ranked():
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in self.backends[name].astream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self._record(name, None, False)
+                if started:
+                    raise
+                errors.append(e)
+                with self._lock:
+                    self.failovers += 1
+                continue
+            self._record(name, time.perf_counter() - start, True)
+            return
+        raise errors[-1]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the routing state.
+
+        Returns:
+            Dict[str, Any]: Per-backend calls, p50/p95 latency, error rate and
+                health, plus the hedge and failover counts
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "backends": {
+                    name: {
+                        "calls": stats.calls,
+                        "p50": stats.percentile(0.5),
+                        "p95": stats.percentile(0.95),
+                        "error_rate": stats.error_rate,
+                        "healthy": stats.open_until <= now,
+                    }
+                    for name, stats in self.stats_by_backend.items()
+                },
+                "hedges": self.hedges,
+                "failovers": self.failovers,
+            }
+
+
+def get_router(openai_model: str = "gpt-4o-mini", gemini_model: str = "gemini-1.5-flash", **params: Any) -> ModelRouter:
+    """
+    Return the shared OpenAI/Gemini router.
+
+    With fake models enabled (lcfactory.use_fake_models or LC_FAKE_MODELS=1)
+    both backends are local fakes, so routing can be exercised offline.
+
+    Args:
+        openai_model (str): OpenAI model name
+        gemini_model (str): Gemini model name
+        **params: Extra ModelRouter keyword arguments
+
+    Returns:
+        ModelRouter: Router shared by all chains of the process
+    """
+    def build() -> ModelRouter:
+        # No retries inside a backend: a rate-limited provider should fail over at once
+        return ModelRouter({
+            "openai": get_model(openai_model, retries=0),
+            "gemini": get_gemini_model(gemini_model, retries=0),
+        }, **params)
+
+    return cached(("router", openai_model, gemini_model, tuple(sorted(params.items()))), build)
@@ -0,0 +1,434 @@
+"""
+Asyncio HTTP service exposing the Sports-Arena chains.
+
+Endpoints (JSON in, JSON out):
+
+    GET  /health                      status and requests in flight
+    GET  /metrics                     Prometheus-style counters (lctracing.METRICS)
+    GET  /chains                      chain names and the inputs they need
+    POST /chains/<name>/invoke        {"input": {"country": "India"}}        -> {"output": ...}
+    POST /chains/<name>/batch         {"inputs": [{"country": "India"}, ...]} -> {"outputs": [...]}
+    POST /chains/<name>/stream        {"input": {...}} -> text/event-stream of "chunk" events, then "end"
+
+Chains run with ainvoke/abatch/astream on the event loop, all sharing the
+client built once by lcfactory (and therefore its HTTP connection pool,
+rate limiter and retries). Each client (X-Client-Id header, else the peer
+address) may run --per-client requests at once with up to --per-client-queue
+more waiting; beyond that it gets 429 with Retry-After. Past --max-inflight
+requests overall, new ones wait up to --queue-timeout seconds and then get
+503. Streams are written with drain(), so a slow reader slows its own stream
+instead of buffering it in the server, and a disconnect cancels the upstream call.
+
+    python lcserver.py --port 8000
+    python lcserver.py --port 8000 --fake        # local stub model, no API key
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from lcratelimit import is_rate_limit, retry_after
+from lctracing import METRICS
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+    429: "Too Many Requests", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+    502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+def _chains() -> Dict[str, Tuple[Callable[[str], Any], Tuple[str, ...], str]]:
+    import lcchains
+
+    # name -> (builder taking the model name, required input fields, demo it serves)
+    return {
+        "sports": (lcchains.sports_chain, ("country",), "lcdemo9"),
+        "sports_str": (lcchains.sports_str_chain, ("country",), "lcdemo10"),
+        "sports_json": (lcchains.sports_json_chain, ("country",), "lcdemo11"),
+        "sports_structured": (lcchains.sports_structured_chain, ("country",), "lcdemo11"),
+        "sports_stream": (lcchains.sports_stream_chain, ("country",), "lcdemo12"),
+        "sports_pipeline": (lambda model: lcchains.sports_pipeline(model), ("country", "sport"), "lcdemo9 debug"),
+    }
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+    peer: str
+    keep_alive: bool = True
+    started: float = field(default_factory=time.perf_counter)
+
+    def json(self) -> Dict[str, Any]:
+        try:
+            body = json.loads(self.body or b"{}")
+        except ValueError as e:
+            raise HttpError(400, f"Invalid JSON body: {e}")
+        if not isinstance(body, dict):
+            raise HttpError(400, "The JSON body must be an object")
+        return body
+
+    @property
+    def client(self) -> str:
+        return self.headers.get("x-client-id") or self.peer
+
+
+def to_jsonable(value: Any) -> Any:
+    """Turn chain output (AIMessage, message chunk, pydantic object, str, dict) into JSON-ready data."""
+    if hasattr(value, "model_dump") and not hasattr(value, "content"):
+        return value.model_dump()
+    if hasattr(value, "content"):
+        return value.content
+    return value
+
+
+class ClientLimiter:
+    """
+    Per-client concurrency limit with a bounded waiting line.
+
+    Up to per_client requests of a client run at once; up to max_waiting more
+    wait for a slot. Any further request is refused at once with 429, so one
+    busy client cannot fill the server's queue.
+    """
+
+    def __init__(self, per_client: int = 4, max_waiting: int = 16):
+        self.per_client = per_client
+        self.max_waiting = max_waiting
+        self._slots: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.per_client))
+        self._pending: Counter = Counter()
+
+    @asynccontextmanager
+    async def slot(self, client: str) -> AsyncIterator[None]:
+        if self._pending[client] >= self.per_client + self.max_waiting:
+            raise HttpError(429, "Too many concurrent requests from this client", retry_after=1)
+        self._pending[client] += 1
+        try:
+            async with self._slots[client]:
+                yield
+        finally:
+            self._pending[client] -= 1
+            if not self._pending[client]:
+                del self._pending[client]
+                self._slots.pop(client, None)
+
+
+class ChainServer:
+    """HTTP/1.1 server (keep-alive, SSE) running the chains on one event loop."""
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        max_inflight: int = 64,
+        per_client: int = 4,
+        per_client_queue: int = 16,
+        queue_timeout: float = 5.0,
+        request_timeout: float = 120.0,
+        max_batch: int = 64,
+        batch_concurrency: int = 8,
+        coalesce: bool = False,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            model (str): OpenAI model name of every chain
+            max_inflight (int): Requests running at once across all clients
+            per_client (int): Requests running at once per client
+            per_client_queue (int): Requests of one client waiting for a slot before 429
+            queue_timeout (float): Seconds to wait for a global slot before 503
+            request_timeout (float): Seconds an invoke or batch may take before 504
+            max_batch (int): Most inputs per batch request
+            batch_concurrency (int): max_concurrency of abatch
+            coalesce (bool): Share identical in-flight requests (lcsingleflight)
+        """
+        self.model = model
+        self.max_inflight = max_inflight
+        self.queue_timeout = queue_timeout
+        self.request_timeout = request_timeout
+        self.max_batch = max_batch
+        self.batch_concurrency = batch_concurrency
+        self.coalesce = coalesce
+        self.clients = ClientLimiter(per_client, per_client_queue)
+        self.inflight = 0
+        self.connections = 0
+        self._global: Optional[asyncio.Semaphore] = None
+        self._specs = _chains()
+        self._chains: Dict[str, Any] = {}
+
+    def chain(self, name: str):
+        if name not in self._specs:
+            raise HttpError(404, f"Unknown chain {name!r}")
+        if name not in self._chains:
+            chain = self._specs[name][0](self.model)
+            if self.coalesce:
+                from lcsingleflight import coalesce
+
+                chain = coalesce(chain, name)
+            self._chains[name] = chain
+        return self._chains[name]
+
+    def _validate(self, name: str, value: Any) -> Dict[str, Any]:
+        required = self._specs[name][1]
+        if not isinstance(value, dict) or any(not isinstance(value.get(key), str) or not value[key].strip() for key in required):
+            raise HttpError(400, f"Chain {name!r} needs an input object with string fields {list(required)}")
+        return {key: value[key] for key in required}
+
+    @asynccontextmanager
+    async def _admit(self, request: Request) -> AsyncIterator[None]:
+        async with self.clients.slot(request.client):
+            try:
+                await asyncio.wait_for(self._global.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise HttpError(503, "Server busy, try again", retry_after=1)
+            self.inflight += 1
+            try:
+                yield
+            finally:
+                self.inflight -= 1
+                self._global.release()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        """Build every chain and start listening."""
+        self._global = asyncio.Semaphore(self.max_inflight)
+        for name in self._specs:
+            self.chain(name)
+        return await asyncio.start_server(self._connection, host, port, limit=MAX_HEADER_BYTES)
+
+    # HTTP plumbing
+
+    async def _read_request(self, reader: asyncio.StreamReader, peer: str) -> Optional[Request]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(431, "Request headers too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Without a usable length the body cannot be skipped, so the connection is closed
+            raise HttpError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return Request(method.upper(), target.split("?", 1)[0], headers, body, peer, keep_alive)
+
+    async def _respond(self, writer: asyncio.StreamWriter, request: Optional[Request], status: int, payload: Any,
+                       content_type: str = "application/json", headers: Optional[Dict[str, str]] = None) -> None:
+        body = payload if isinstance(payload, bytes) else (
+            payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload).encode("utf-8")
+        )
+        keep_alive = request is not None and request.keep_alive
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{key}: {value}" for key, value in (headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    def _count(self, request: Request, route: str, status: int) -> None:
+        METRICS.inc("lc_http_requests_total", help="HTTP requests by route and status", route=route, status=str(status))
+        METRICS.inc("lc_http_request_seconds_total", time.perf_counter() - request.started,
+                    help="Seconds spent answering HTTP requests", route=route)
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        peer = peer[0] if isinstance(peer, tuple) else str(peer)
+        self.connections += 1
+        try:
+            while True:
+                request = None
+                try:
+                    request = await self._read_request(reader, peer)
+                    if request is None:
+                        return
+                    keep_open = await self._route(request, writer)
+                except HttpError as e:
+                    extra = {"Retry-After": f"{e.retry_after:g}"} if e.retry_after else None
+                    await self._respond(writer, request, e.status, {"error": str(e)}, headers=extra)
+                    if request is not None:
+                        # Unknown paths share one label, so scanners cannot grow the metrics without bound
+                        self._count(request, request.path if e.status != 404 else "unmatched", e.status)
+                    keep_open = request is not None and request.keep_alive and e.status < 500
+                if not keep_open:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _route(self, request: Request, writer: asyncio.StreamWriter) -> bool:
+        parts = [part for part in request.path.split("/") if part]
+        if request.method == "GET" and parts == ["health"]:
+            await self._respond(writer, request, 200, {"status": "ok", "inflight": self.inflight, "connections": self.connections})
+            return request.keep_alive
+        if request.method == "GET" and parts == ["metrics"]:
+            gauges = (
+                f"# TYPE lc_http_inflight gauge\nlc_http_inflight {self.inflight}\n"
+                f"# TYPE lc_http_connections gauge\nlc_http_connections {self.connections}\n"
+            )
+            await self._respond(writer, request, 200, METRICS.render() + gauges, "text/plain; version=0.0.4")
+            return request.keep_alive
+        if request.method == "GET" and parts == ["chains"]:
+            listing = {name: {"inputs": list(required), "demo": demo} for name, (_, required, demo) in self._specs.items()}
+            await self._respond(writer, request, 200, listing)
+            return request.keep_alive
+        if len(parts) != 3 or parts[0] != "chains" or parts[2] not in ("invoke", "batch", "stream"):
+            raise HttpError(404, f"No route for {request.path}")
+        if request.method != "POST":
+            raise HttpError(405, "Use POST")
+
+        name, action = parts[1], parts[2]
+        chain = self.chain(name)
+        body = request.json()
+        route = f"/chains/{name}/{action}"
+        if action == "stream":
+            await self._stream(request, writer, chain, name, self._validate(name, body.get("input")), route)
+            return False
+
+        if action == "invoke":
+            payload = self._validate(name, body.get("input"))
+        else:
+            inputs = body.get("inputs")
+            if not isinstance(inputs, list) or not inputs or len(inputs) > self.max_batch:
+                raise HttpError(400, f"'inputs' must be a list of 1 to {self.max_batch} input objects")
+            payload = [self._validate(name, item) for item in inputs]
+        async with self._admit(request):
+            try:
+                if action == "invoke":
+                    output = to_jsonable(await asyncio.wait_for(chain.ainvoke(payload), self.request_timeout))
+                    result = {"output": output}
+                else:
+                    outputs = await asyncio.wait_for(
+                        chain.abatch(payload, {"max_concurrency": self.batch_concurrency}, return_exceptions=True),
+                        self.request_timeout,
+                    )
+                    result = {"outputs": [
+                        {"error": str(output)} if isinstance(output, Exception) else to_jsonable(output)
+                        for output in outputs
+                    ]}
+            except asyncio.TimeoutError:
+                raise HttpError(504, "The model did not answer in time")
+            except HttpError:
+                raise
+            except Exception as e:
+                raise self._upstream_error(e)
+        await self._respond(writer, request, 200, result)
+        self._count(request, route, 200)
+        return request.keep_alive
+
+    @staticmethod
+    def _upstream_error(error: Exception) -> HttpError:
+        if is_rate_limit(error):
+            return HttpError(503, "The model provider is rate limiting, try again", retry_after=retry_after(error) or 1)
+        return HttpError(502, f"{type(error).__name__}: {error}")
+
+    async def _stream(self, request: Request, writer: asyncio.StreamWriter, chain, name: str,
+                      payload: Dict[str, Any], route: str) -> None:
+        async with self._admit(request):
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            chunks = 0
+            stream = chain.astream(payload)
+            try:
+                async for chunk in stream:
+                    data = to_jsonable(chunk)
+                    if data in ("", None):
+                        continue
+                    writer.write(f"event: chunk\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                    # Waits while the client's socket buffer is full: backpressure instead of buffering here
+                    await writer.drain()
+                    chunks += 1
+                writer.write(f"event: end\ndata: {json.dumps({'chunks': chunks})}\n\n".encode("utf-8"))
+                status = 200
+            except (ConnectionError, asyncio.CancelledError):
+                # The client went away: closing the stream below cancels the upstream call
+                self._count(request, route, 499)
+                raise
+            except Exception as e:
+                error = self._upstream_error(e)
+                writer.write(f"event: error\ndata: {json.dumps({'status': error.status, 'error': str(error)})}\n\n".encode("utf-8"))
+                status = error.status
+            finally:
+                await stream.aclose()
+            await writer.drain()
+            self._count(request, route, status)
+
+
+async def serve(host: str, port: int, **settings: Any) -> None:
+    server = ChainServer(**settings)
+    listener = await server.start(host, port)
+    print(f"Serving {', '.join(server._specs)} on http://{host}:{port}", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--max-inflight", type=int, default=64)
+    parser.add_argument("--per-client", type=int, default=4)
+    parser.add_argument("--per-client-queue", type=int, default=16)
+    parser.add_argument("--queue-timeout", type=float, default=5.0)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--coalesce", action="store_true", help="share identical in-flight requests")
+    parser.add_argument("--fake", action="store_true", help="serve the local stub model (lcfakes) instead of OpenAI")
+    parser.add_argument("--fake-latency", type=float, default=0.2)
+    parser.add_argument("--fake-tokens-per-second", type=float, default=100.0)
+    args = parser.parse_args()
+
+    if args.fake:
+        from lcfactory import use_fake_models
+
+        use_fake_models(latency=args.fake_latency, tokens_per_second=args.fake_tokens_per_second)
+    try:
+        asyncio.run(serve(
+            args.host, args.port,
+            model=args.model,
+            max_inflight=args.max_inflight,
+            per_client=args.per_client,
+            per_client_queue=args.per_client_queue,
+            queue_timeout=args.queue_timeout,
+            request_timeout=args.request_timeout,
+            coalesce=args.coalesce,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
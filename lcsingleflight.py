@@ -0,0 +1,354 @@
+import asyncio
+import contextvars
+import json
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        # Set when the leader was interrupted by something that is not an error of the
+        # call itself (e.g. Streamlit stopping its script); followers then retry
+        self.abandoned = False
+
+
+class _StreamCall:
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.cancelled = False
+        self.changed = threading.Condition()
+
+
+class _AsyncStreamCall:
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Condition()
+
+
+class SingleFlight:
+    """
+    Deduplicates identical calls that are in flight at the same time.
+
+    The first caller for a key (the leader) runs the call; every caller
+    arriving with the same key before it finishes waits and receives the
+    leader's result or exception instead of calling upstream again. Nothing
+    is cached afterwards: a call for the key after completion runs again.
+
+    Streams are shared too: the upstream stream is drained by a background
+    pump, every subscriber replays the chunks received so far and then
+    follows live. When the last subscriber stops reading, the upstream
+    stream is closed.
+
+    Thread-based (do, stream) and asyncio (ado, astream) calls are
+    coalesced separately; asyncio calls are shared within one event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._streams: Dict[Hashable, _StreamCall] = {}
+        self._acalls: Dict[Hashable, asyncio.Task] = {}
+        self._astreams: Dict[Hashable, _AsyncStreamCall] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key (Hashable): Identity of the request
+            fn (Callable[[], Any]): The upstream call
+
+        Returns:
+            Any: Result of fn, shared by every concurrent caller
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.leaders += 1
+                else:
+                    self.shared += 1
+            if leader:
+                break
+            call.done.wait()
+            if call.abandoned:
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Asyncio version of do(); callers in the same event loop share one task.
+
+        Args:
+            key (Hashable): Identity of the request
+            fn (Callable[[], Awaitable[Any]]): Returns the upstream coroutine
+
+        Returns:
+            Any: Result of the shared call
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            task = self._acalls.get(loop_key)
+            if task is None:
+                task = self._acalls[loop_key] = loop.create_task(fn())
+                task.add_done_callback(lambda _: self._forget(self._acalls, loop_key, task))
+                self.leaders += 1
+            else:
+                self.shared += 1
+        # One caller being cancelled must not cancel the call the others wait for
+        return await asyncio.shield(task)
+
+    def _forget(self, table: Dict[Hashable, Any], key: Hashable, value: Any) -> None:
+        with self._lock:
+            if table.get(key) is value:
+                del table[key]
+
+    def stream(self, key: Hashable, fn: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """
+        Share one upstream stream among all concurrent callers with the same key.
+
+        Args:
+            key (Hashable): Identity of the request
+            fn (Callable[[], Iterable[Any]]): Starts the upstream stream
+
+        Returns:
+            Iterator[Any]: Every chunk of the shared stream, from the first one
+        """
+        with self._lock:
+            call = self._streams.get(key)
+            start = call is None
+            if start:
+                call = self._streams[key] = _StreamCall()
+                self.leaders += 1
+            else:
+                self.shared += 1
+            call.subscribers += 1
+        if start:
+            # Copy the context so callbacks and tracing of the leader follow the pump thread
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(self._pump, key, call, fn), daemon=True).start()
+        return self._subscribe(key, call)
+
+    def _pump(self, key: Hashable, call: _StreamCall, fn: Callable[[], Iterable[Any]]) -> None:
+        iterator = None
+        try:
+            iterator = iter(fn())
+            for chunk in iterator:
+                if call.cancelled:
+                    break
+                with call.changed:
+                    call.chunks.append(chunk)
+                    call.changed.notify_all()
+        except Exception as e:
+            call.error = e
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            self._forget(self._streams, key, call)
+            with call.changed:
+                call.done = True
+                call.changed.notify_all()
+
+    def _subscribe(self, key: Hashable, call: _StreamCall) -> Iterator[Any]:
+        index = 0
+        try:
+            while True:
+                with call.changed:
+                    while index >= len(call.chunks) and not call.done:
+                        call.changed.wait()
+                    pending = call.chunks[index:]
+                    finished = call.done
+                for chunk in pending:
+                    yield chunk
+                index += len(pending)
+                if finished and index >= len(call.chunks):
+                    if call.error is not None:
+                        raise call.error
+                    return
+        finally:
+            with self._lock:
+                call.subscribers -= 1
+                if call.subscribers == 0 and not call.done:
+                    # Nobody is reading any more: stop upstream and let the next caller start afresh
+                    call.cancelled = True
+                    if self._streams.get(key) is call:
+                        del self._streams[key]
+
+    async def astream(self, key: Hashable, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Asyncio version of stream(); subscribers in the same event loop share one stream.
+
+        Args:
+            key (Hashable): Identity of the request
+            fn (Callable[[], AsyncIterator[Any]]): Starts the upstream async stream
+
+        Yields:
+            Any: Every chunk of the shared stream, from the first one
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            call = self._astreams.get(loop_key)
+            if call is None:
+                call = self._astreams[loop_key] = _AsyncStreamCall()
+                call.task = loop.create_task(self._apump(loop_key, call, fn))
+                self.leaders += 1
+            else:
+                self.shared += 1
+            call.subscribers += 1
+
+        index = 0
+        try:
+            while True:
+                async with call.changed:
+                    while index >= len(call.chunks) and not call.done:
+                        await call.changed.wait()
+                    pending = call.chunks[index:]
+                    finished = call.done
+                for chunk in pending:
+                    yield chunk
+                index += len(pending)
+                if finished and index >= len(call.chunks):
+                    if call.error is not None:
+                        raise call.error
+                    return
+        finally:
+            with self._lock:
+                call.subscribers -= 1
+                last = call.subscribers == 0 and not call.done
+                if last and self._astreams.get(loop_key) is call:
+                    del self._astreams[loop_key]
+            if last:
+                call.task.cancel()
+
+    async def _apump(self, loop_key: Hashable, call: _AsyncStreamCall, fn: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            async for chunk in fn():
+                async with call.changed:
+                    call.chunks.append(chunk)
+                    call.changed.notify_all()
+        except Exception as e:
+            call.error = e
+        finally:
+            self._forget(self._astreams, loop_key, call)
+            # Not awaited under cancellation: set the flag, then wake the readers if we still can
+            call.done = True
+            try:
+                async with call.changed:
+                    call.changed.notify_all()
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return how many calls ran upstream and how many were served by another caller's call.
+
+        Returns:
+            Dict[str, int]: leaders, shared and in_flight
+        """
+        with self._lock:
+            in_flight = len(self._calls) + len(self._streams) + len(self._acalls) + len(self._astreams)
+        return {"leaders": self.leaders, "shared": self.shared, "in_flight": in_flight}
+
+    def summary(self) -> str:
+        """Return the stats as a one-line, human readable string."""
+        stats = self.stats()
+        total = stats["leaders"] + stats["shared"]
+        saved = stats["shared"] / total if total else 0.0
+        return f"{stats['leaders']} upstream calls · {stats['shared']} coalesced ({saved:.0%} saved)"
+
+
+# Shared by every Streamlit session of the process
+FLIGHTS = SingleFlight()
+
+
+def request_key(name: str, input: Any) -> str:
+    """Identity of a chain request: chain name plus its input, serialized canonically."""
+    return name + ":" + json.dumps(input, sort_keys=True, default=str)
+
+
+class CoalescedRunnable(Runnable):
+    """
+    Wraps a chain so identical concurrent requests share one upstream call.
+
+    invoke/ainvoke/stream/astream go through a SingleFlight group (FLIGHTS by
+    default) keyed by the chain name and input. Callbacks passed by a
+    caller whose request is served by another caller's call are not run,
+    since no work is done on its behalf.
+    """
+
+    def __init__(self, bound: Runnable, name: str, flights: Optional[SingleFlight] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            bound (Runnable): Wrapped chain
+            name (str): Chain name; part of the key, so different chains never share calls
+            flights (Optional[SingleFlight]): Group to use, FLIGHTS by default
+        """
+        self.bound = bound
+        self.name = name
+        self.flights = flights or FLIGHTS
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self.flights.do(request_key(self.name, input), lambda: self.bound.invoke(input, config, **kwargs))
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return await self.flights.ado(request_key(self.name, input), lambda: self.bound.ainvoke(input, config, **kwargs))
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        return self.flights.stream(request_key(self.name, input), lambda: self.bound.stream(input, config, **kwargs))
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        async for chunk in self.flights.astream(request_key(self.name, input), lambda: self.bound.astream(input, config, **kwargs)):
+            yield chunk
+
+
+def coalesce(chain: Runnable, name: str) -> CoalescedRunnable:
+    """
+    Return the process-wide coalescing wrapper of a named chain.
+
+    Args:
+        chain (Runnable): Chain to wrap
+        name (str): Chain name
+
+    Returns:
+        CoalescedRunnable: Wrapper sharing identical in-flight requests
+    """
+    from lcfactory import cached
+
+    return cached(("coalesced", name, id(chain)), lambda: CoalescedRunnable(chain, name))
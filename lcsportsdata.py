@@ -0,0 +1,175 @@
+import csv
+import difflib
+import json
+import os
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from lcfactory import cached
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sports_data.json")
+
+
+@dataclass(frozen=True)
+class CountrySports:
+    """Immutable sports facts for one country."""
+
+    name: str
+    sports: Tuple[str, ...]
+    national_sport: str
+    popular_leagues: Tuple[str, ...]
+    aliases: Tuple[str, ...] = ()
+    flag: str = ""
+
+
+def normalize(name: str) -> str:
+    """
+    Normalize a country name for lookups: trim, collapse whitespace and case-fold.
+
+    Args:
+        name (str): Raw user input
+
+    Returns:
+        str: Lookup key, so "india", " India " and "INDIA" all match
+    """
+    return " ".join(name.split()).casefold()
+
+
+class SportsDataStore:
+    """
+    Read-only, indexed collection of CountrySports records.
+
+    Exact lookups hit a dict keyed by the normalized name (and every alias), so
+    they are O(1). Prefix lookups bisect a sorted key list; fuzzy lookups use
+    difflib and are memoized, as they only run for unknown names.
+    """
+
+    def __init__(self, records: Iterable[CountrySports]):
+        index: Dict[str, CountrySports] = {}
+        for record in records:
+            for key in (record.name, *record.aliases):
+                index[normalize(key)] = record
+        self._index: Mapping[str, CountrySports] = MappingProxyType(index)
+        self._keys: Tuple[str, ...] = tuple(sorted(index))
+        self.names: Tuple[str, ...] = tuple(sorted({record.name for record in index.values()}))
+        self.suggest = lru_cache(maxsize=4096)(self._suggest)
+
+    @classmethod
+    def from_json(cls, path: str) -> "SportsDataStore":
+        """
+        Load records from a JSON list of objects with the CountrySports fields.
+
+        Args:
+            path (str): JSON file path
+        """
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+        return cls(
+            CountrySports(
+                name=row["name"],
+                sports=tuple(row["sports"]),
+                national_sport=row["national_sport"],
+                popular_leagues=tuple(row["popular_leagues"]),
+                aliases=tuple(row.get("aliases", ())),
+                flag=row.get("flag", ""),
+            )
+            for row in rows
+        )
+
+    @classmethod
+    def from_csv(cls, path: str) -> "SportsDataStore":
+        """
+        Load records from a CSV file.
+
+        Columns: name, sports, national_sport, popular_leagues and optionally
+        aliases and flag. List columns are separated by "|".
+
+        Args:
+            path (str): CSV file path
+        """
+        def split(value: Optional[str]) -> Tuple[str, ...]:
+            return tuple(part.strip() for part in (value or "").split("|") if part.strip())
+
+        with open(path, encoding="utf-8", newline="") as f:
+            return cls(
+                CountrySports(
+                    name=row["name"].strip(),
+                    sports=split(row["sports"]),
+                    national_sport=row["national_sport"].strip(),
+                    popular_leagues=split(row["popular_leagues"]),
+                    aliases=split(row.get("aliases")),
+                    flag=(row.get("flag") or "").strip(),
+                )
+                for row in csv.DictReader(f)
+            )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize(name) in self._index
+
+    def get(self, name: str) -> Optional[CountrySports]:
+        """Return the record for a name or alias, ignoring case and extra spaces."""
+        return self._index.get(normalize(name))
+
+    def prefix(self, text: str, limit: int = 10) -> List[CountrySports]:
+        """
+        Return records whose name or alias starts with text.
+
+        Args:
+            text (str): Typed prefix
+            limit (int): Maximum number of matches
+        """
+        key = normalize(text)
+        matches: List[CountrySports] = []
+        position = bisect_left(self._keys, key)
+        while position < len(self._keys) and self._keys[position].startswith(key) and len(matches) < limit:
+            record = self._index[self._keys[position]]
+            if record not in matches:
+                matches.append(record)
+            position += 1
+        return matches
+
+    def fuzzy(self, text: str, limit: int = 3, cutoff: float = 0.75) -> List[CountrySports]:
+        """
+        Return records whose name or alias is close to text (typos, missing letters).
+
+        Args:
+            text (str): Misspelled name
+            limit (int): Maximum number of matches
+            cutoff (float): Minimum difflib similarity ratio
+        """
+        matches: List[CountrySports] = []
+        for key in difflib.get_close_matches(normalize(text), self._keys, n=limit * 2, cutoff=cutoff):
+            record = self._index[key]
+            if record not in matches:
+                matches.append(record)
+        return matches[:limit]
+
+    def _suggest(self, text: str) -> Tuple[str, ...]:
+        candidates = self.prefix(text, limit=3) if normalize(text) else []
+        for record in self.fuzzy(text):
+            if record not in candidates:
+                candidates.append(record)
+        return tuple(record.name for record in candidates[:3])
+
+
+def load_store(path: str = DEFAULT_DATA_PATH) -> SportsDataStore:
+    """
+    Return the shared store for a data file, loading it once per process.
+
+    Files ending in .csv are read with from_csv, anything else as JSON.
+
+    Args:
+        path (str): Data file path
+    """
+    def build() -> SportsDataStore:
+        if path.lower().endswith(".csv"):
+            return SportsDataStore.from_csv(path)
+        return SportsDataStore.from_json(path)
+
+    return cached(("sports_store", os.path.abspath(path)), build)
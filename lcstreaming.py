@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class StreamRenderer:
+    """
+    Renders a token stream into a Streamlit placeholder at a bounded refresh rate.
+
+    Chunks are buffered in a list and the placeholder is only redrawn when
+    min_interval seconds have passed or min_chars new characters arrived, so a
+    long answer costs a few dozen redraws instead of one per token.
+
+    The stream is closed as soon as rendering stops, whether it finished, was
+    cancelled, or Streamlit interrupted the script because the user changed the
+    input (Streamlit raises inside the next placeholder update), which aborts
+    the underlying HTTP request instead of letting it run to completion.
+    """
+
+    def __init__(self, placeholder, min_interval: float = 0.05, min_chars: int = 200, cursor: str = "▌"):
+        """
+        Initialize the renderer.
+
+        Args:
+            placeholder: Streamlit element with a markdown() method, e.g. st.empty()
+            min_interval (float): Minimum seconds between redraws
+            min_chars (int): Redraw early once this many new characters are buffered
+            cursor (str): Appended while streaming to show the answer is still growing
+        """
+        self.placeholder = placeholder
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self.cursor = cursor
+        self._cancel = threading.Event()
+        self.text = ""
+        self.chunks = 0
+        self.redraws = 0
+        self.cancelled = False
+        self.time_to_first_token: Optional[float] = None
+        self.total_time: Optional[float] = None
+
+    def cancel(self) -> None:
+        """Stop rendering at the next chunk; safe to call from another thread."""
+        self._cancel.set()
+
+    def _flush(self, pending: List[str], final: bool = False) -> None:
+        if pending:
+            self.text += "".join(pending)
+            pending.clear()
+        self.placeholder.markdown(self.text if final else self.text + self.cursor)
+        self.redraws += 1
+
+    def render(self, stream: Iterable[Any], should_cancel: Optional[Callable[[], bool]] = None) -> str:
+        """
+        Consume a stream of message chunks or strings and render it.
+
+        Args:
+            stream (Iterable[Any]): chain.stream(...) output; chunks with a
+                .content attribute (AIMessageChunk) or plain strings
+            should_cancel (Optional[Callable[[], bool]]): Polled after every chunk;
+                returning True stops the stream
+
+        Returns:
+            str: The text rendered so far
+        """
+        start = time.perf_counter()
+        last_flush = start
+        pending: List[str] = []
+        pending_chars = 0
+        try:
+            for chunk in stream:
+                piece = getattr(chunk, "content", chunk)
+                if not piece or not isinstance(piece, str):
+                    continue
+                now = time.perf_counter()
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = now - start
+                self.chunks += 1
+                pending.append(piece)
+                pending_chars += len(piece)
+
+                if self._cancel.is_set() or (should_cancel is not None and should_cancel()):
+                    self.cancelled = True
+                    break
+                if now - last_flush >= self.min_interval or pending_chars >= self.min_chars:
+                    self._flush(pending)
+                    last_flush = now
+                    pending_chars = 0
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            self.total_time = time.perf_counter() - start
+        self._flush(pending, final=True)
+        return self.text
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Streamed chunks (about one token each) per second after the first token."""
+        if self.time_to_first_token is None or self.total_time is None:
+            return None
+        generation_time = self.total_time - self.time_to_first_token
+        return (self.chunks - 1) / generation_time if generation_time > 0 else None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return timing figures of the last render.
+
+        Returns:
+            Dict[str, Any]: time_to_first_token, total_time, chunks, tokens_per_second,
+                redraws and cancelled
+        """
+        return {
+            "time_to_first_token": self.time_to_first_token,
+            "total_time": self.total_time,
+            "chunks": self.chunks,
+            "tokens_per_second": self.tokens_per_second,
+            "redraws": self.redraws,
+            "cancelled": self.cancelled,
+        }
+
+    def summary(self) -> str:
+        """Return the timing figures as a one-line, human readable string."""
+        if self.time_to_first_token is None:
+            return "No tokens received"
+        rate = self.tokens_per_second
+        return (
+            f"First token {self.time_to_first_token:.2f}s · total {self.total_time:.2f}s · "
+            f"{self.chunks} tokens" + (f" · {rate:.0f} tokens/s" if rate else "") +
+            f" · {self.redraws} redraws" + (" · cancelled" if self.cancelled else "")
+        )
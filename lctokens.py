@@ -0,0 +1,257 @@
+import logging
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableLambda
+
+from lcfactory import DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead of the chat format (role and separators), as documented by OpenAI
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+TRUNCATION_MARKER = " …"
+
+
+class ApproximateEncoding:
+    """
+    Stand-in for a tiktoken encoding when the real one cannot be loaded.
+
+    Splits text into pieces of up to four characters, each with the whitespace
+    before it, which lands close to BPE counts for English prose. The "tokens"
+    are the pieces themselves, so decode() restores the text exactly; counts
+    are estimates and must not be used to bill or to fill a context window to
+    the last token.
+    """
+
+    name = "approximate"
+    _PIECE = re.compile(r"\s*\S{1,4}|\s+")
+
+    def encode(self, text: str, **kwargs: Any) -> List[str]:
+        return self._PIECE.findall(text)
+
+    def encode_ordinary(self, text: str) -> List[str]:
+        return self._PIECE.findall(text)
+
+    def decode(self, tokens: Sequence[str]) -> str:
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=16)
+def get_encoding(model: str = DEFAULT_MODEL) -> "tiktoken.Encoding":
+    """
+    Return the tiktoken encoding of a model, loaded once per process.
+
+    tiktoken downloads its BPE files on first use; without tiktoken or network
+    access (offline benchmarks, CI) an ApproximateEncoding is returned instead.
+    """
+    try:
+        # Imported here: tiktoken (and its BPE files) is only needed once something is counted
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding for {model} unavailable ({e!r}); token counts are estimated")
+        return ApproximateEncoding()
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """
+    Count the tokens of a text.
+
+    Args:
+        text (str): Text to count
+        model (str): Model whose tokenizer is used
+
+    Returns:
+        int: Number of tokens
+    """
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: Sequence[BaseMessage], model: str = DEFAULT_MODEL) -> int:
+    """
+    Count the prompt tokens of a list of chat messages.
+
+    Args:
+        messages (Sequence[BaseMessage]): Messages sent to the model
+        model (str): Model whose tokenizer is used
+
+    Returns:
+        int: Prompt tokens including the per-message overhead
+    """
+    return TOKENS_PER_REPLY + sum(
+        TOKENS_PER_MESSAGE + count_tokens(str(message.content), model) for message in messages
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = DEFAULT_MODEL) -> str:
+    """
+    Cut a text down to at most max_tokens tokens.
+
+    Args:
+        text (str): Text to shorten
+        max_tokens (int): Token budget
+        model (str): Model whose tokenizer is used
+
+    Returns:
+        str: The text unchanged if it fits, otherwise its first tokens followed by " …"
+    """
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]).rstrip() + TRUNCATION_MARKER
+
+
+def token_budget(max_tokens: int, model: str = DEFAULT_MODEL, name: str = "token_budget"):
+    """
+    Return a runnable that truncates string output to max_tokens tokens.
+
+    Appended to an intermediate stage (`prompt | model | StrOutputParser() |
+    token_budget(400)`) it caps how much of that stage's output is passed into
+    the next prompt.
+
+    Args:
+        max_tokens (int): Token budget
+        model (str): Model whose tokenizer is used
+        name (str): Run name shown in traces
+
+    Returns:
+        Runnable: str -> str
+    """
+    return RunnableLambda(lambda text: truncate_to_tokens(text, max_tokens, model)).with_config(run_name=name)
+
+
+class TokenUsageTracker(BaseCallbackHandler):
+    """
+    Callback handler that accounts prompt and completion tokens per pipeline stage.
+
+    Pass it in config={"callbacks": [tracker]}. Every chat model call is
+    attributed to the nearest enclosing chain whose run name is in stages
+    (calls outside any stage go under "other"). Token counts come from the
+    provider's usage metadata when present and from tiktoken otherwise, so
+    streamed responses are counted too. The same tracker can be reused across
+    invocations to accumulate totals.
+    """
+
+    def __init__(self, stages: Sequence[str] = (), model: str = DEFAULT_MODEL):
+        """
+        Initialize the tracker.
+
+        Args:
+            stages (Sequence[str]): Run names of the stages to account separately
+            model (str): Model whose tokenizer is used when no usage metadata is returned
+        """
+        self.stages = set(stages)
+        self.model = model
+        self.usage: Dict[str, Dict[str, float]] = {}
+        self._stage_of: Dict[UUID, str] = {}
+        self._calls: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, parent_run_id: Optional[UUID]) -> str:
+        return self._stage_of.get(parent_run_id, "other")
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        with self._lock:
+            if name in self.stages:
+                self._stage_of[run_id] = name
+            elif parent_run_id in self._stage_of:
+                self._stage_of[run_id] = self._stage_of[parent_run_id]
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._stage_of.pop(run_id, None)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self.on_chain_end(None, run_id=run_id)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[BaseMessage]], *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        prompt_tokens = sum(count_message_tokens(batch, self.model) for batch in messages)
+        with self._lock:
+            self._calls[run_id] = {
+                "stage": self._stage(parent_run_id),
+                "prompt_tokens": prompt_tokens,
+                "start": time.perf_counter(),
+            }
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        prompt_tokens = call["prompt_tokens"]
+        completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt_tokens = usage.get("input_tokens", prompt_tokens)
+                    completion_tokens += usage.get("output_tokens", 0)
+                else:
+                    completion_tokens += count_tokens(generation.text, self.model)
+        with self._lock:
+            stage = self.usage.setdefault(
+                call["stage"], {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0}
+            )
+            stage["calls"] += 1
+            stage["prompt_tokens"] += prompt_tokens
+            stage["completion_tokens"] += completion_tokens
+            stage["seconds"] += time.perf_counter() - call["start"]
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._calls.pop(run_id, None)
+
+    def totals(self) -> Dict[str, float]:
+        """
+        Return the usage summed over all stages.
+
+        Returns:
+            Dict[str, float]: calls, prompt_tokens, completion_tokens, total_tokens and seconds
+        """
+        with self._lock:
+            stages = list(self.usage.values())
+        totals = {
+            key: sum(stage[key] for stage in stages)
+            for key in ("calls", "prompt_tokens", "completion_tokens", "seconds")
+        }
+        totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"]
+        return totals
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Return one row per stage, suitable for st.table."""
+        with self._lock:
+            usage = dict(self.usage)
+        return [
+            {
+                "stage": name,
+                "calls": stage["calls"],
+                "prompt tokens": stage["prompt_tokens"],
+                "completion tokens": stage["completion_tokens"],
+                "model time (s)": round(stage["seconds"], 3),
+            }
+            for name, stage in usage.items()
+        ]
+
+    def summary(self) -> str:
+        """Return the totals as a one-line, human readable string."""
+        totals = self.totals()
+        return (
+            f"{totals['calls']} calls · {totals['prompt_tokens']} prompt + "
+            f"{totals['completion_tokens']} completion = {totals['total_tokens']} tokens"
+        )
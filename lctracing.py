@@ -0,0 +1,388 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+# While a Tracer is set here (see trace()), LangChain attaches it to every run
+# automatically; when unset, nothing is attached and nothing is recorded.
+_active_tracer: ContextVar[Optional["Tracer"]] = ContextVar("lc_active_tracer", default=None)
+register_configure_hook(_active_tracer, inheritable=True)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Process-wide Prometheus-style counters, keyed by metric name and labels."""
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, help: str = "", **labels: str) -> None:
+        """
+        Add value to a counter.
+
+        Args:
+            name (str): Metric name, e.g. "lc_step_calls_total"
+            value (float): Amount to add
+            help (str): Description shown in the exposition output
+            **labels: Label values
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def get(self, name: str, **labels: str) -> float:
+        """Return the current value of a counter, 0 if never incremented."""
+        return self._values.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def render(self) -> str:
+        """Return every counter in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._values.items())
+        lines: List[str] = []
+        current = None
+        for (name, labels), value in items:
+            if name != current:
+                current = name
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+            rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+            lines.append(f"{name}{{{rendered}}} {value:g}" if rendered else f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+METRICS = MetricsRegistry()
+
+
+def payload_size(value: Any, depth: int = 0) -> int:
+    """
+    Approximate size of a step's input or output in characters.
+
+    Strings, message contents, prompt values and the values of dicts/lists
+    are measured; anything else counts as the length of its repr.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    content = getattr(value, "content", None)
+    if isinstance(content, str):
+        return len(content)
+    if depth >= 3:
+        return 0
+    if isinstance(value, dict):
+        return sum(payload_size(item, depth + 1) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item, depth + 1) for item in value)
+    to_messages = getattr(value, "to_messages", None)
+    if to_messages is not None:
+        return payload_size(to_messages(), depth + 1)
+    return len(repr(value))
+
+
+@dataclass
+class Span:
+    """One runnable step: a chain, prompt, model or parser invocation."""
+
+    run_id: UUID
+    parent_id: Optional[UUID]
+    name: str
+    kind: str
+    start: float
+    thread: int
+    input_size: int = 0
+    end: Optional[float] = None
+    queue: float = 0.0
+    output_size: int = 0
+    first_token: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    error: Optional[str] = None
+    children: List[UUID] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Tracer(BaseCallbackHandler):
+    """
+    Callback handler recording a span for every runnable step.
+
+    Each span has its wall time, queue time (the gap between the parent
+    starting, or the previous sibling finishing, and the step itself
+    starting, i.e. time spent waiting for a worker thread or the rate limiter),
+    input and output payload sizes, time to first token and token counts
+    for model calls. Finished spans also update the process-wide METRICS.
+
+    Export with save_chrome_trace() (open in chrome://tracing or Perfetto) or
+    save_folded() (flamegraph.pl / speedscope). Attach it with
+    config={"callbacks": [tracer]}, or run code inside `with trace():` to have
+    LangChain attach it to every run.
+    """
+
+    # Called directly in the thread of the step, also from async code
+    run_inline = True
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: Dict[UUID, Span] = {}
+        self.marks: Dict[str, float] = {}
+        self._last_child_end: Dict[Optional[UUID], float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> None:
+        """Record a named instant (e.g. "first_chunk") once, as seconds since the tracer was created."""
+        self.marks.setdefault(name, time.perf_counter() - self.origin)
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, kind: str, inputs: Any) -> None:
+        now = time.perf_counter()
+        size = payload_size(inputs)
+        with self._lock:
+            parent = self.spans.get(parent_run_id) if parent_run_id is not None else None
+            ready = max(self._last_child_end.get(parent_run_id, 0.0), parent.start if parent else now)
+            span = Span(run_id, parent_run_id, name, kind, now, threading.get_ident(), size, queue=max(0.0, now - ready))
+            self.spans[run_id] = span
+            if parent is not None:
+                parent.children.append(run_id)
+
+    def _end(self, run_id: UUID, outputs: Any = None, error: Optional[BaseException] = None) -> Optional[Span]:
+        now = time.perf_counter()
+        size = payload_size(outputs) if error is None else 0
+        with self._lock:
+            span = self.spans.get(run_id)
+            if span is None:
+                return None
+            span.end = now
+            span.output_size = size
+            span.error = None if error is None else f"{type(error).__name__}: {error}"
+            self._last_child_end[span.parent_id] = now
+        labels = {"step": span.name, "kind": span.kind}
+        METRICS.inc("lc_step_calls_total", help="Runnable steps finished", **labels)
+        METRICS.inc("lc_step_seconds_total", span.duration, help="Wall time spent in runnable steps", **labels)
+        METRICS.inc("lc_step_queue_seconds_total", span.queue, help="Time steps waited before starting", **labels)
+        METRICS.inc("lc_step_input_chars_total", span.input_size, help="Input payload size", **labels)
+        METRICS.inc("lc_step_output_chars_total", span.output_size, help="Output payload size", **labels)
+        if error is not None:
+            METRICS.inc("lc_step_errors_total", help="Runnable steps that raised", **labels)
+        return span
+
+    @staticmethod
+    def _name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any], default: str) -> str:
+        name = kwargs.get("name")
+        if name:
+            return name
+        serialized = serialized or {}
+        return serialized.get("name") or (serialized.get("id") or [default])[-1]
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "chain"), "chain", inputs)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, outputs)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=error)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "chat_model"), "llm", messages)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "llm"), "llm", prompts)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self.spans.get(run_id)
+        if span is not None and span.first_token is None:
+            span.first_token = time.perf_counter() - span.start
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        texts: List[str] = []
+        prompt_tokens = completion_tokens = None
+        for generations in response.generations:
+            for generation in generations:
+                texts.append(generation.text)
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt_tokens = (prompt_tokens or 0) + usage.get("input_tokens", 0)
+                    completion_tokens = (completion_tokens or 0) + usage.get("output_tokens", 0)
+        span = self._end(run_id, texts)
+        if span is None:
+            return
+        span.prompt_tokens, span.completion_tokens = prompt_tokens, completion_tokens
+        for kind, count in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+            if count:
+                METRICS.inc("lc_tokens_total", count, help="Tokens reported by the provider", step=span.name, type=kind)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=error)
+
+    def on_retriever_start(self, serialized: Dict[str, Any], query: str, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "retriever"), "retriever", query)
+
+    def on_retriever_end(self, documents: Sequence[Any], *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, [getattr(document, "page_content", document) for document in documents])
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=error)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any) -> None:
+        self._start(run_id, parent_run_id, self._name(serialized, kwargs, "tool"), "tool", input_str)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, output)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, error=error)
+
+    def finished(self) -> List[Span]:
+        """Return the finished spans in start order."""
+        with self._lock:
+            spans = [span for span in self.spans.values() if span.end is not None]
+        return sorted(spans, key=lambda span: span.start)
+
+    def rows(self, names: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Return one row per finished span, suitable for st.table.
+
+        Args:
+            names (Optional[Sequence[str]]): Only include spans with these names
+
+        Returns:
+            List[Dict[str, Any]]: Start offset, wall/queue time, sizes and tokens per step
+        """
+        return [
+            {
+                "step": span.name,
+                "kind": span.kind,
+                "start (s)": round(span.start - self.origin, 3),
+                "wall (s)": round(span.duration, 3),
+                "queue (s)": round(span.queue, 3),
+                "first token (s)": None if span.first_token is None else round(span.first_token, 3),
+                "in chars": span.input_size,
+                "out chars": span.output_size,
+                "tokens": None if span.prompt_tokens is None else f"{span.prompt_tokens}+{span.completion_tokens}",
+                "error": span.error,
+            }
+            for span in self.finished()
+            if names is None or span.name in names
+        ]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Return the spans in the Chrome trace event format.
+
+        Returns:
+            Dict[str, Any]: {"traceEvents": [...]} with one complete ("X") event per span
+                and one instant ("i") event per mark
+        """
+        threads: Dict[int, int] = {}
+        events = []
+        for span in self.finished():
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            events.append({
+                "name": span.name,
+                "cat": span.kind,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": 1,
+                "tid": tid,
+                "args": {
+                    "queue_ms": round(span.queue * 1000, 3),
+                    "input_chars": span.input_size,
+                    "output_chars": span.output_size,
+                    "first_token_ms": None if span.first_token is None else round(span.first_token * 1000, 3),
+                    "prompt_tokens": span.prompt_tokens,
+                    "completion_tokens": span.completion_tokens,
+                    "error": span.error,
+                },
+            })
+        for name, offset in self.marks.items():
+            events.append({"name": name, "ph": "i", "s": "g", "ts": round(offset * 1e6, 1), "pid": 1, "tid": 1})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str) -> None:
+        """Write chrome_trace() as JSON to path."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def folded(self) -> str:
+        """
+        Return the spans as folded stacks ("root;child;leaf <self time in us>").
+
+        Self time is a span's wall time minus that of its children; children
+        that ran in parallel can exceed the parent, in which case it is 0.
+        """
+        with self._lock:
+            spans = dict(self.spans)
+        lines = []
+        for span in self.finished():
+            child_time = sum(spans[child].duration for child in span.children if child in spans)
+            self_us = int(max(0.0, span.duration - child_time) * 1e6)
+            if self_us <= 0:
+                continue
+            stack = [span.name]
+            parent = spans.get(span.parent_id)
+            while parent is not None:
+                stack.append(parent.name)
+                parent = spans.get(parent.parent_id)
+            lines.append(f"{';'.join(reversed(stack))} {self_us}")
+        return "\n".join(lines) + "\n"
+
+    def save_folded(self, path: str) -> None:
+        """Write folded() to path."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+
+@contextmanager
+def trace(chrome_trace_path: Optional[str] = None, folded_path: Optional[str] = None) -> Iterator[Tracer]:
+    """
+    Trace every LangChain run started inside the block.
+
+    Args:
+        chrome_trace_path (Optional[str]): Write a Chrome trace here when the block exits
+        folded_path (Optional[str]): Write folded stacks here when the block exits
+
+    Yields:
+        Tracer: The tracer collecting the spans
+    """
+    tracer = Tracer()
+    token = _active_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _active_tracer.reset(token)
+        if chrome_trace_path:
+            tracer.save_chrome_trace(chrome_trace_path)
+        if folded_path:
+            tracer.save_folded(folded_path)
+
+
+def tracing_requested(config: Optional[Dict[str, Any]]) -> bool:
+    """
+    True when callbacks would observe a run with this config.
+
+    Custom runnables use it to skip callback bookkeeping entirely when nobody
+    is listening, keeping the untraced path free of overhead.
+    """
+    return _active_tracer.get() is not None or bool((config or {}).get("callbacks"))
@@ -0,0 +1,285 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lcembedding import content_hash
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _replace_file(path: str, write) -> None:
+    # Written next to the target and swapped in, so a memory map of the old file
+    # (as held by a loaded index saved back to its own directory) keeps its data
+    tmp = path + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _save_array(path: str, array: np.ndarray) -> None:
+    _replace_file(path, np.ascontiguousarray(array).tofile)
+
+
+def _save_json(path: str, data) -> None:
+    def write(tmp: str) -> None:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    _replace_file(path, write)
+
+
+class NumpyVectorIndex:
+    """
+    In-process cosine-similarity index over a contiguous float32 matrix.
+
+    Rows are L2-normalized on insert, so a search is one matrix-vector product
+    followed by np.argpartition for the top k. Deletes mark rows dead and are
+    reclaimed by compact(); capacity grows by doubling, so adds are amortized O(1).
+    """
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024, embedder=None):
+        """
+        Initialize an empty index.
+
+        Args:
+            dim (Optional[int]): Vector length, inferred from the first add when None
+            capacity (int): Initial number of preallocated rows
+            embedder: Optional object with embed_documents/embed_query (e.g. an
+                EmbeddingPipeline), required by add_texts and similarity_search
+        """
+        self.dim = dim
+        self.embedder = embedder
+        self._capacity = capacity
+        self._matrix = np.empty((capacity, dim), dtype=np.float32) if dim else None
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._size = 0
+        self._ids: List[Optional[str]] = []
+        self._texts: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._rows
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the vector matrix and liveness mask."""
+        matrix_bytes = self._matrix.nbytes if self._matrix is not None else 0
+        return matrix_bytes + self._alive.nbytes
+
+    def _reserve(self, rows: int) -> None:
+        if self._matrix is None:
+            self._matrix = np.empty((max(self._capacity, rows), self.dim), dtype=np.float32)
+            self._alive = np.zeros(len(self._matrix), dtype=bool)
+        if rows <= len(self._matrix):
+            return
+        capacity = max(1, len(self._matrix))
+        while capacity < rows:
+            capacity *= 2
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        matrix[: self._size] = self._matrix[: self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self._size] = self._alive[: self._size]
+        self._matrix, self._alive = matrix, alive
+
+    def add(self, ids: Sequence[str], vectors, texts: Optional[Sequence[str]] = None) -> None:
+        """
+        Insert or replace vectors.
+
+        Args:
+            ids (Sequence[str]): Unique identifiers, existing ids are overwritten
+            vectors: (n, dim) array-like of embeddings
+            texts (Optional[Sequence[str]]): Source text stored alongside each vector
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors must be a 2-D array with one row per id")
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Vector length {vectors.shape[1]} does not match index dimension {self.dim}")
+
+        vectors = _normalize(vectors)
+        # Later duplicates of an id within one call win, as they would across calls
+        fresh = list({id: i for i, id in enumerate(ids) if id not in self._rows}.values())
+        self._reserve(self._size + len(fresh))
+
+        for i, id in enumerate(ids):
+            row = self._rows.get(id)
+            if row is not None:
+                self._matrix[row] = vectors[i]
+                if texts is not None:
+                    self._texts[row] = texts[i]
+
+        start = self._size
+        end = start + len(fresh)
+        self._matrix[start:end] = vectors[fresh]
+        self._alive[start:end] = True
+        for offset, i in enumerate(fresh):
+            self._rows[ids[i]] = start + offset
+            self._ids.append(ids[i])
+            self._texts.append(texts[i] if texts is not None else None)
+        self._size = end
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        Remove vectors by id.
+
+        Args:
+            ids (Iterable[str]): Identifiers to delete, unknown ids are ignored
+
+        Returns:
+            int: Number of vectors removed
+        """
+        removed = 0
+        for id in ids:
+            row = self._rows.pop(id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._ids[row] = None
+                self._texts[row] = None
+                removed += 1
+        if self._size and self._size - len(self._rows) > self._size // 4:
+            self.compact()
+        return removed
+
+    def compact(self) -> None:
+        """Drop deleted rows so the matrix is dense again."""
+        live = np.flatnonzero(self._alive[: self._size])
+        self._matrix[: len(live)] = self._matrix[live]
+        self._alive[: len(live)] = True
+        self._alive[len(live):] = False
+        self._ids = [self._ids[row] for row in live]
+        self._texts = [self._texts[row] for row in live]
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._size = len(live)
+
+    def search(self, query, k: int = 4) -> List[Tuple[str, float]]:
+        """
+        Return the k most similar ids to a query vector.
+
+        Args:
+            query: (dim,) array-like query embedding
+            k (int): Number of results
+
+        Returns:
+            List[Tuple[str, float]]: (id, cosine similarity) pairs, best first
+        """
+        return self.search_batch(np.asarray(query, dtype=np.float32)[None, :], k)[0]
+
+    def search_batch(self, queries, k: int = 4) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k search for several queries with a single matrix product.
+
+        Args:
+            queries: (m, dim) array-like of query embeddings
+            k (int): Number of results per query
+
+        Returns:
+            List[List[Tuple[str, float]]]: Results per query, best first
+        """
+        queries = _normalize(np.asarray(queries, dtype=np.float32))
+        if not self._rows:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self._matrix[: self._size].T
+        if len(self._rows) != self._size:
+            scores[:, ~self._alive[: self._size]] = -np.inf
+        k = min(k, len(self._rows))
+        if k < self._size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(self._size), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        return [
+            [(self._ids[row], float(score)) for row, score in zip(rows, row_scores) if np.isfinite(score)]
+            for rows, row_scores in zip(top, top_scores)
+        ]
+
+    def text(self, id: str) -> Optional[str]:
+        """Return the text stored with an id, if any."""
+        return self._texts[self._rows[id]]
+
+    def add_texts(self, texts: Sequence[str]) -> List[str]:
+        """
+        Embed texts with the index's embedder and add them, keyed by content hash.
+
+        Args:
+            texts (Sequence[str]): Texts to index
+
+        Returns:
+            List[str]: Ids of the added texts
+        """
+        ids = [content_hash(text) for text in texts]
+        self.add(ids, self.embedder.embed_documents(texts), texts)
+        return ids
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Tuple[str, float]]:
+        """
+        Embed a query with the index's embedder and return the k closest texts.
+
+        Returns:
+            List[Tuple[str, float]]: (text, cosine similarity) pairs, best first
+        """
+        return [(self.text(id), score) for id, score in self.search(self.embedder.embed_query(query), k)]
+
+    def save(self, directory: str) -> None:
+        """
+        Write the index to a directory (vectors.f32, ids.json, meta.json).
+
+        Deleted rows are compacted away first. vectors.f32 is a raw row-major
+        float32 matrix, so load() can memory-map it instead of reading it.
+        Each file is written under a temporary name and swapped in, so a
+        loaded index may be saved back to the directory it maps.
+
+        Args:
+            directory (str): Target directory, created if needed
+        """
+        os.makedirs(directory, exist_ok=True)
+        if len(self._rows) != self._size:
+            self.compact()
+        if self._size:
+            _save_array(os.path.join(directory, "vectors.f32"), self._matrix[: self._size])
+        _save_json(os.path.join(directory, "ids.json"), {"ids": self._ids, "texts": self._texts})
+        _save_json(os.path.join(directory, "meta.json"), {"dim": self.dim, "size": self._size})
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, embedder=None) -> "NumpyVectorIndex":
+        """
+        Load an index written by save().
+
+        Args:
+            directory (str): Directory passed to save()
+            mmap (bool): Memory-map the vectors (copy-on-write) instead of reading them
+            embedder: Optional embedder for add_texts/similarity_search
+
+        Returns:
+            NumpyVectorIndex: The loaded index
+        """
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, "ids.json"), encoding="utf-8") as f:
+            stored = json.load(f)
+        index = cls(meta["dim"], capacity=max(1, meta["size"]), embedder=embedder)
+        if meta["size"]:
+            path = os.path.join(directory, "vectors.f32")
+            shape = (meta["size"], meta["dim"])
+            if mmap:
+                index._matrix = np.memmap(path, dtype=np.float32, mode="c", shape=shape)
+            else:
+                index._matrix = np.fromfile(path, dtype=np.float32).reshape(shape)
+            index._alive = np.ones(meta["size"], dtype=bool)
+        index._size = meta["size"]
+        index._ids = stored["ids"]
+        index._texts = stored["texts"]
+        index._rows = {id: row for row, id in enumerate(index._ids)}
+        return index
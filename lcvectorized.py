@@ -0,0 +1,184 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional, Sequence, Union
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from lcbatching import iter_chunks
+
+# Inputs handed to the vectorized function per call: large enough that the
+# per-call overhead vanishes, small enough to keep temporaries in memory
+DEFAULT_VECTOR_CHUNK_SIZE = 65536
+
+
+def _to_list(values: Any) -> List[Any]:
+    # ndarray.tolist() converts to Python scalars in C, far faster than list(array)
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+class VectorizedLambda(Runnable):
+    """
+    RunnableLambda whose function maps a whole batch at once.
+
+    RunnableLambda(lambda x: x + 1).batch(inputs) calls the lambda once per
+    input, each with its own config, callback run and thread-pool task.
+    VectorizedLambda(lambda xs: xs + 1, as_array=True).batch(inputs) calls it
+    once per chunk of chunk_size inputs, as a NumPy array (as_array=True) or a
+    list, with one callback run per chunk. The function must return one output
+    per input, in order.
+
+    It composes with `|` like any runnable; RunnableSequence.batch hands each
+    step the whole list, so per-item steps around it keep their usual batch
+    path. Consecutive VectorizedLambdas are fused into one, so no list is
+    built between them, and batch_array() keeps the data in NumPy end to end.
+    invoke() runs the function on a batch of one. Per-input configs passed to
+    batch() collapse to the first one.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Any],
+        as_array: bool = False,
+        chunk_size: int = DEFAULT_VECTOR_CHUNK_SIZE,
+        name: Optional[str] = None,
+    ):
+        """
+        Initialize the runnable.
+
+        Args:
+            func (Callable[[Any], Any]): Maps a list (or array) of inputs to as many outputs
+            as_array (bool): Pass each chunk as np.asarray(chunk) instead of a list
+            chunk_size (int): Most inputs per call of func
+            name (Optional[str]): Run name shown in callbacks and traces
+        """
+        self.func = func
+        self.as_array = as_array
+        self.chunk_size = chunk_size
+        func_name = getattr(func, "__name__", "<lambda>")
+        self.name = name or (func_name if func_name != "<lambda>" else "VectorizedLambda")
+
+    def __or__(self, other: Any) -> Runnable:
+        if isinstance(other, VectorizedLambda) and other.as_array == self.as_array:
+            first, second = self.func, other.func
+            return VectorizedLambda(
+                lambda batch: second(first(batch)),
+                as_array=self.as_array,
+                chunk_size=min(self.chunk_size, other.chunk_size),
+                name=f"{self.name}|{other.name}",
+            )
+        return super().__or__(other)
+
+    def _apply(self, chunk: Union[Sequence[Any], Any]) -> Any:
+        if self.as_array:
+            import numpy as np
+
+            chunk = np.asarray(chunk)
+        outputs = self.func(chunk)
+        if len(outputs) != len(chunk):
+            raise ValueError(f"{self.name} returned {len(outputs)} outputs for {len(chunk)} inputs")
+        return outputs
+
+    def _apply_list(self, chunk: List[Any]) -> List[Any]:
+        return _to_list(self._apply(chunk))
+
+    def _apply_each(self, chunk: List[Any]) -> List[Any]:
+        # Isolates the inputs that fail, at per-item cost, once a whole chunk failed
+        results = []
+        for item in chunk:
+            try:
+                results.append(self._apply_list([item])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _run_chunk(self, chunk: List[Any], config: Optional[RunnableConfig], return_exceptions: bool) -> List[Any]:
+        try:
+            return self._call_with_config(self._apply_list, chunk, config)
+        except Exception:
+            if not return_exceptions:
+                raise
+            return self._apply_each(chunk)
+
+    @staticmethod
+    def _chunk_configs(config: Optional[RunnableConfig]) -> Iterator[Optional[RunnableConfig]]:
+        # A caller-chosen run_id names the first chunk's run; later chunks get fresh ids
+        yield config
+        rest = {key: value for key, value in config.items() if key != "run_id"} if config else config
+        while True:
+            yield rest
+
+    @staticmethod
+    def _first_config(config: Optional[Union[RunnableConfig, List[RunnableConfig]]]) -> Optional[RunnableConfig]:
+        if isinstance(config, list):
+            return config[0] if config else None
+        return config
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self._call_with_config(lambda item: self._apply_list([item])[0], input, config)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        # Pure CPU work: answering inline is cheaper than hopping to a worker thread
+        return self.invoke(input, config)
+
+    def batch_iter(self, inputs: Iterable[Any], config: Optional[RunnableConfig] = None, *,
+                   return_exceptions: bool = False) -> Iterator[Any]:
+        """Lazily yield outputs in input order, one chunk of inputs in memory at a time."""
+        configs = self._chunk_configs(self._first_config(config))
+        for chunk in iter_chunks(inputs, self.chunk_size):
+            yield from self._run_chunk(chunk, next(configs), return_exceptions)
+
+    def batch(self, inputs: List[Any], config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None, *,
+              return_exceptions: bool = False, **kwargs: Any) -> List[Any]:
+        config = self._first_config(config)
+        if len(inputs) <= self.chunk_size:
+            return self._run_chunk(_to_list(inputs), config, return_exceptions) if len(inputs) else []
+        return list(self.batch_iter(inputs, config, return_exceptions=return_exceptions))
+
+    async def abatch_iter(self, inputs: Iterable[Any], config: Optional[RunnableConfig] = None, *,
+                          return_exceptions: bool = False) -> AsyncIterator[Any]:
+        """Async batch_iter, yielding control to the event loop between chunks."""
+        configs = self._chunk_configs(self._first_config(config))
+        for chunk in iter_chunks(inputs, self.chunk_size):
+            for output in self._run_chunk(chunk, next(configs), return_exceptions):
+                yield output
+            await asyncio.sleep(0)
+
+    async def abatch(self, inputs: List[Any], config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None, *,
+                     return_exceptions: bool = False, **kwargs: Any) -> List[Any]:
+        return [output async for output in self.abatch_iter(inputs, self._first_config(config), return_exceptions=return_exceptions)]
+
+    def batch_array(self, inputs: Any) -> Any:
+        """
+        Map a NumPy array chunk by chunk without converting to or from Python objects.
+
+        Skips callbacks; meant for numeric pipelines where even one list of
+        results would dominate the run time.
+
+        Args:
+            inputs: (n, ...) array-like
+
+        Returns:
+            np.ndarray: The concatenated outputs
+        """
+        import numpy as np
+
+        inputs = np.asarray(inputs)
+        if len(inputs) <= self.chunk_size:
+            return np.asarray(self._apply(inputs))
+        return np.concatenate([
+            np.asarray(self._apply(inputs[start: start + self.chunk_size]))
+            for start in range(0, len(inputs), self.chunk_size)
+        ])
+
+
+def vectorized(func: Optional[Callable[[Any], Any]] = None, *, as_array: bool = False,
+               chunk_size: int = DEFAULT_VECTOR_CHUNK_SIZE) -> Any:
+    """
+    Wrap a batch function as a VectorizedLambda; usable bare or with arguments.
+
+        @vectorized(as_array=True)
+        def add_one(xs):
+            return xs + 1
+    """
+    if func is None:
+        return lambda f: VectorizedLambda(f, as_array=as_array, chunk_size=chunk_size)
+    return VectorizedLambda(func, as_array=as_array, chunk_size=chunk_size)
@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import warnings
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+
+import lccache
+from lccache import SQLiteResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(lccache.time, "time", clock)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs):
+    return SQLiteResponseCache(str(tmp_path / "cache.sqlite"), **kwargs)
+
+
+def test_hit_returns_stored_generations(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    assert cache.lookup("prompt", "llm") is None
+    cache.update("prompt", "llm", [ChatGeneration(message=AIMessage("hi"))])
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        hit = cache.lookup("prompt", "llm")
+
+    assert not [w for w in caught if "allowed_objects" in str(w.message)]
+    assert hit[0].message.content == "hi"
+    assert cache.lookup("prompt", "other llm") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_lookup_does_not_warn_outside_pytest(tmp_path):
+    # pytest re-enables DeprecationWarning subclasses per test, so check the module's filter in a fresh interpreter
+    script = (
+        "import lccache\n"
+        "from langchain_core.outputs import Generation\n"
+        f"cache = lccache.SQLiteResponseCache({str(tmp_path / 'cache.sqlite')!r})\n"
+        "cache.update('prompt', 'llm', [Generation(text='a')])\n"
+        "assert cache.lookup('prompt', 'llm')[0].text == 'a'\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Warning" not in result.stderr
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.update("prompt", "llm", [Generation(text="a")])
+    clock.now += 59
+    assert cache.lookup("prompt", "llm")[0].text == "a"
+    clock.now += 2
+    assert cache.lookup("prompt", "llm") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.update("a", "llm", [Generation(text="a")])
+    clock.now += 1
+    cache.update("b", "llm", [Generation(text="b")])
+    clock.now += 1
+    cache.lookup("a", "llm")
+    clock.now += 1
+    cache.update("c", "llm", [Generation(text="c")])
+
+    assert cache.lookup("b", "llm") is None
+    assert cache.lookup("a", "llm")[0].text == "a"
+    assert cache.lookup("c", "llm")[0].text == "c"
+
+
+def test_clear_drops_entries_and_counters(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.update("prompt", "llm", [Generation(text="a")])
+    cache.lookup("prompt", "llm")
+    cache.clear()
+
+    assert cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
+    assert cache.lookup("prompt", "llm") is None
@@ -0,0 +1,16 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from lcembedding import VectorCache
+
+
+def test_add_stores_repeated_keys_once(tmp_path):
+    cache = VectorCache(str(tmp_path))
+    cache.add(["a", "a", "b"], [[1.0, 1.0], [1.0, 1.0], [2.0, 2.0]])
+    cache.add(["c", "b"], [[3.0, 3.0], [2.0, 2.0]])
+    assert len(cache) == 3
+    assert cache.get(["a", "b", "c"]).tolist() == [[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]]
+    reopened = VectorCache(str(tmp_path))
+    assert reopened.get(["c", "a"]).tolist() == [[3.0, 3.0], [1.0, 1.0]]
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+
+import pytest
+
+import lcfactory
+from lcfactory import cached, clear_cache
+
+MESSAGES = (("system", "You are a sports expert."), ("user", "Name the national sport of {country}."))
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def test_cached_builds_once():
+    calls = []
+    assert cached("key", lambda: calls.append(1) or "value") == "value"
+    assert cached("key", lambda: calls.append(1) or "other") == "value"
+    assert calls == [1]
+
+
+def test_builder_may_call_cached():
+    assert cached("outer", lambda: cached("inner", lambda: 1) + 1) == 2
+    assert cached("inner", lambda: 0) == 1
+
+
+def test_slow_build_does_not_block_other_keys():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    worker = threading.Thread(target=cached, args=("slow", slow))
+    worker.start()
+    try:
+        assert started.wait(5)
+        start = time.perf_counter()
+        assert cached("fast", lambda: "fast") == "fast"
+        assert time.perf_counter() - start < 1
+    finally:
+        release.set()
+        worker.join(5)
+    assert cached("slow", lambda: "again") == "slow"
+
+
+def test_concurrent_callers_share_one_build():
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cached("shared", build))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 1
+
+
+def test_get_chain_builds_through_cached(monkeypatch):
+    pytest.importorskip("langchain_core")
+    pytest.importorskip("numpy")
+    pytest.importorskip("dotenv")
+    from langchain_core.output_parsers import StrOutputParser
+
+    monkeypatch.setattr(lcfactory, "_fake_settings", None)
+    lcfactory.use_fake_models(latency=0.0, tokens_per_second=10000.0)
+    result = []
+    # A deadlock inside cached() would hang the build; the thread makes it a failure
+    worker = threading.Thread(
+        target=lambda: result.append(lcfactory.get_chain("test_sports_str", MESSAGES, StrOutputParser))
+    )
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive(), "get_chain deadlocked in cached()"
+    chain = result[0]
+    assert lcfactory.get_chain("test_sports_str", MESSAGES, StrOutputParser) is chain
+    assert isinstance(chain.invoke({"country": "India"}), str)
+
+
+def test_fake_embeddings_do_not_share_the_real_cache(monkeypatch, tmp_path):
+    pytest.importorskip("langchain_core")
+    pytest.importorskip("numpy")
+    pytest.importorskip("dotenv")
+    from lcembedding import EmbeddingPipeline
+
+    monkeypatch.setattr(lcfactory, "_fake_settings", None)
+    lcfactory.use_fake_models(latency=0.0)
+    fake = EmbeddingPipeline(lcfactory.get_embeddings(), cache_dir=str(tmp_path))
+    assert fake.embeddings.model != lcfactory.DEFAULT_EMBEDDING_MODEL
+    assert os.path.basename(fake.cache.directory) != lcfactory.DEFAULT_EMBEDDING_MODEL
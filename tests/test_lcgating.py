@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from lcgating import Prefetcher
+
+
+def test_wait_joins_a_running_prefetch():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def answer(input):
+        calls.append(input)
+        started.set()
+        assert release.wait(5)
+        return f"answer for {input['sport']}"
+
+    prefetcher = Prefetcher(max_workers=1)
+    request = {"country": "India", "sport": "Cricket"}
+    assert prefetcher.prefetch("session", "pipeline", [request], answer) == 1
+    assert started.wait(5)
+    threading.Timer(0.1, release.set).start()
+    assert prefetcher.wait("pipeline", request) == "answer for Cricket"
+    assert calls == [request]
+    assert prefetcher.stats()["joined"] == 1
+
+
+def test_wait_cancels_a_queued_prefetch():
+    started, release = threading.Event(), threading.Event()
+
+    def answer(input):
+        started.set()
+        assert release.wait(5)
+        return input["sport"]
+
+    prefetcher = Prefetcher(max_workers=1)
+    first, second = {"sport": "Cricket"}, {"sport": "Hockey"}
+    prefetcher.prefetch("session", "pipeline", [first, second], answer)
+    assert started.wait(5)
+    try:
+        # The caller computes the queued request itself rather than waiting for the worker
+        assert prefetcher.wait("pipeline", second) is None
+        assert prefetcher.stats()["cancelled"] == 1
+    finally:
+        release.set()
+    assert prefetcher.wait("pipeline", first) == "Cricket"
+
+
+def test_new_prefetch_keeps_jobs_another_group_still_wants():
+    started, release = threading.Event(), threading.Event()
+
+    def answer(input):
+        started.set()
+        assert release.wait(5)
+        return input["sport"]
+
+    prefetcher = Prefetcher(max_workers=1)
+    busy, shared, other = {"sport": "Cricket"}, {"sport": "Hockey"}, {"sport": "Tennis"}
+    prefetcher.prefetch("worker", "pipeline", [busy], answer)
+    assert started.wait(5)
+    try:
+        assert prefetcher.prefetch("session A", "pipeline", [shared], answer) == 1
+        # Already queued for session A, so session B shares that job instead of queueing its own
+        assert prefetcher.prefetch("session B", "pipeline", [shared], answer) == 0
+        prefetcher.prefetch("session A", "pipeline", [other], answer)
+        assert prefetcher.stats()["cancelled"] == 0
+        prefetcher.prefetch("session B", "pipeline", [], answer)
+        prefetcher.prefetch("session A", "pipeline", [], answer)
+        assert prefetcher.stats()["cancelled"] == 2
+    finally:
+        release.set()
@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from lcembedding import EmbeddingPipeline
+from lcfakes import FakeEmbeddings
+from lcingest import Ingestor, TokenChunker
+
+WORDS = "cricket football hockey kabaddi tennis badminton chess wrestling ".split()
+
+
+def write(path, words):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(" ".join(WORDS[i % len(WORDS)] for i in range(words)))
+
+
+def lines(ingestor):
+    with open(ingestor.chunks_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    pipeline = EmbeddingPipeline(FakeEmbeddings(size=8, latency=0.0), cache_dir=str(tmp_path / "cache"))
+    return lambda: Ingestor(pipeline, str(tmp_path / "out"), TokenChunker(16, 4), batch_chunks=4)
+
+
+def test_changed_and_deleted_files_are_compacted_away(tmp_path, ingestor):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write(docs / "a.txt", 100)
+    write(docs / "b.txt", 60)
+    paths = lambda: sorted(str(path) for path in docs.iterdir())
+
+    first = ingestor()
+    report = first.ingest(paths(), progress_every=0)
+    assert report.files_ingested == 2
+    current = lines(first)
+    assert list(first.iter_chunks()) == current
+
+    write(docs / "a.txt", 120)
+    os.remove(docs / "b.txt")
+    second = ingestor()
+    report = second.ingest(paths(), progress_every=0)
+    assert (report.files_ingested, report.files_removed) == (1, 1)
+    assert set(second.manifest) == {str(docs / "a.txt")}
+    records = lines(second)
+    # Only the new version of a.txt is left, each (source, seq) once
+    assert [record["seq"] for record in records] == list(range(1, second.manifest[str(docs / "a.txt")]["chunks"] + 1))
+    assert {record["source"] for record in records} == {str(docs / "a.txt")}
+
+
+def test_iter_chunks_skips_repeated_records(tmp_path, ingestor):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write(docs / "a.txt", 80)
+    first = ingestor()
+    first.ingest([str(docs / "a.txt")], progress_every=0)
+    records = lines(first)
+    # As left behind by a run interrupted before its manifest was saved
+    with open(first.chunks_path, "a", encoding="utf-8") as f:
+        f.writelines(json.dumps(record) + "\n" for record in records)
+    assert list(first.iter_chunks()) == records
+    assert first.compact() == len(records)
+    assert lines(first) == records
+
+
+def test_record_cut_off_by_a_killed_run_is_ignored(tmp_path, ingestor):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write(docs / "a.txt", 80)
+    first = ingestor()
+    first.ingest([str(docs / "a.txt")], progress_every=0)
+    records = lines(first)
+    with open(first.chunks_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(records[0])[:20])
+    assert list(first.iter_chunks()) == records
+
+    write(docs / "b.txt", 40)
+    second = ingestor()
+    second.ingest([str(docs / "a.txt"), str(docs / "b.txt")], progress_every=0, compact=False)
+    # The partial line was cut off before appending, so every line decodes again
+    assert lines(second)[:len(records)] == records
+    assert {record["source"] for record in second.iter_chunks()} == {str(docs / "a.txt"), str(docs / "b.txt")}
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.runnables import RunnableLambda
+
+import lcmemory
+from lcmemory import ChatHistoryStore, ConversationRunnable, SummarizingMemory
+
+
+class Summarizer:
+    def __init__(self, release=None):
+        self.calls = 0
+        self.release = release
+
+    def __call__(self, variables):
+        if self.release is not None:
+            assert self.release.wait(5)
+        self.calls += 1
+        return f"summary {self.calls}"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ChatHistoryStore(str(tmp_path / "memory.sqlite"))
+
+
+def test_fold_goes_down_to_the_low_water_mark(store):
+    summarizer = Summarizer()
+    memory = SummarizingMemory("s", store, window_messages=8, summarizer=RunnableLambda(summarizer))
+    for turn in range(12):
+        memory.save(f"question {turn}", f"answer {turn}")
+    # Folds after exchanges 5, 8 and 11 instead of after every exchange from the 5th on
+    assert summarizer.calls == 3
+    stats = store.stats("s")
+    assert stats["messages"] == 6
+    assert stats["folded"] == 18
+    assert memory.load()["summary"] == "summary 3"
+
+
+def test_stream_returns_before_the_fold(store):
+    release = threading.Event()
+    summarizer = Summarizer(release)
+    chat = ConversationRunnable(
+        RunnableLambda(lambda variables: f"answer to {variables['input']}"),
+        lambda session_id: SummarizingMemory(session_id, store, window_messages=2, summarizer=RunnableLambda(summarizer)),
+    )
+    config = {"configurable": {"session_id": "s"}}
+    chat.invoke({"input": "first"}, config)
+    # The window is full now: the fold blocks on the summarizer, the answer does not
+    assert "".join(chat.stream({"input": "second"}, config)) == "answer to second"
+    assert summarizer.calls == 0
+    release.set()
+    deadline = time.monotonic() + 5
+    while (store.path, "s") in lcmemory._folding and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert summarizer.calls == 1
+    assert store.stats("s")["messages"] == 2
@@ -0,0 +1,55 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from lcquantized import MODES, QuantizedVectorIndex, hamming, quantize_binary
+
+
+def clustered(count=400, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    return (centers[rng.integers(clusters, size=count)] + 0.3 * rng.standard_normal((count, dim))).astype(np.float32)
+
+
+def make_index(mode, vectors):
+    index = QuantizedVectorIndex(vectors.shape[1], mode)
+    index.add([str(i) for i in range(len(vectors))], vectors)
+    return index
+
+
+def test_hamming_counts_differing_bits():
+    codes = quantize_binary(np.array([[1, -1, 1, -1] * 4, [1, 1, 1, 1] * 4], dtype=np.float32))
+    assert hamming(codes, codes[0]).tolist() == [0, 8]
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_rescored_search_finds_the_vector_itself(mode):
+    vectors = clustered()
+    index = make_index(mode, vectors)
+    for row in (0, 17, 399):
+        best, score = index.search(vectors[row], 1)[0]
+        assert best == str(row)
+        assert score == pytest.approx(1.0, abs=1e-4)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_add_skips_known_and_repeated_ids(mode):
+    vectors = clustered(count=4)
+    index = make_index(mode, vectors)
+    index.add(["0", "x", "x"], vectors[:3])
+    assert len(index) == 5
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_loaded_index_saved_to_its_own_directory(tmp_path, mode):
+    vectors = clustered()
+    make_index(mode, vectors).save(str(tmp_path))
+    loaded = QuantizedVectorIndex.load(str(tmp_path), mmap=True)
+    loaded.save(str(tmp_path))
+    assert loaded.search(vectors[5], 1)[0][0] == "5"
+    for mmap in (True, False):
+        reloaded = QuantizedVectorIndex.load(str(tmp_path), mmap=mmap)
+        assert len(reloaded) == len(vectors)
+        best, score = reloaded.search(vectors[5], 1)[0]
+        assert best == "5" and score == pytest.approx(1.0, abs=1e-4)
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from lcratelimit import AdaptiveRateLimiter
+
+
+def test_uncapped_limiter_does_not_pace():
+    limiter = AdaptiveRateLimiter(None)
+    start = time.perf_counter()
+    for _ in range(1000):
+        assert limiter.acquire(blocking=False)
+    assert time.perf_counter() - start < 0.5
+    assert limiter.waited == 0
+
+
+def test_rate_limit_halves_the_rate_sent_then_probes_above_it():
+    limiter = AdaptiveRateLimiter(None)
+    for _ in range(40):
+        limiter.acquire()
+    limiter.on_rate_limited()
+    assert limiter.rate == pytest.approx(20.0)
+    for _ in range(2000):
+        limiter.on_success()
+    # Additive increase is not clamped to the rate that drew the 429
+    assert limiter.rate > 40.0
+
+
+def test_cap_bounds_the_rate():
+    limiter = AdaptiveRateLimiter(5.0)
+    assert limiter.burst == 5.0
+    for _ in range(5):
+        assert limiter.acquire(blocking=False)
+    assert not limiter.acquire(blocking=False)
+    for _ in range(1000):
+        limiter.on_success()
+    assert limiter.rate == 5.0
+
+
+def test_retry_after_pauses_the_bucket():
+    limiter = AdaptiveRateLimiter(None)
+    for _ in range(20):
+        limiter.acquire()
+    limiter.on_rate_limited(wait=0.2)
+    assert not limiter.acquire(blocking=False)
+    start = time.perf_counter()
+    assert limiter.acquire()
+    assert 0.15 <= time.perf_counter() - start < 1.0
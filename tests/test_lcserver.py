@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+pytest.importorskip("dotenv")
+
+import lcfactory
+import lcserver
+
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    monkeypatch.setattr(lcfactory, "_fake_settings", None)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    lcfactory.use_fake_models(latency=0.0, tokens_per_second=10000.0)
+    yield
+    lcfactory.clear_cache()
+
+
+async def exchange(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(raw)
+        await writer.drain()
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        length = next(int(line.split(":", 1)[1]) for line in head if line.lower().startswith("content-length:"))
+        return int(head[0].split(" ", 2)[1]), json.loads(await reader.readexactly(length))
+    finally:
+        writer.close()
+
+
+def post(path, body, length=None):
+    return (
+        f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body) if length is None else length}\r\n\r\n"
+    ).encode("latin-1") + body
+
+
+@pytest.mark.parametrize("raw", [
+    post("/chains/sports_str/invoke", b"{}", length="abc"),
+    post("/chains/sports_str/invoke", b"{}", length="-5"),
+    post("/chains/sports_str/invoke", b"[12]"),
+    post("/chains/sports_str/batch", b'"India"'),
+    post("/chains/sports_str/stream", b"null"),
+    post("/chains/sports_str/invoke", b'{"input": ["India"]}'),
+])
+def test_malformed_requests_get_400(fake_models, raw):
+    async def run():
+        server = lcserver.ChainServer()
+        listener = await server.start("127.0.0.1", 0)
+        try:
+            return await exchange(listener.sockets[0].getsockname()[1], raw)
+        finally:
+            listener.close()
+
+    status, body = asyncio.run(run())
+    assert status == 400
+    assert "error" in body
+
+
+def test_invoke_answers(fake_models):
+    async def run():
+        server = lcserver.ChainServer()
+        listener = await server.start("127.0.0.1", 0)
+        try:
+            return await exchange(
+                listener.sockets[0].getsockname()[1],
+                post("/chains/sports_str/invoke", b'{"input": {"country": "India"}}'),
+            )
+        finally:
+            listener.close()
+
+    status, body = asyncio.run(run())
+    assert status == 200
+    assert isinstance(body["output"], str)
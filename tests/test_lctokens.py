@@ -0,0 +1,29 @@
+import sys
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+import lctokens
+from lctokens import ApproximateEncoding
+
+TEXT = "Cricket is the national passion of India,\n  followed by football and kabaddi."
+
+
+def test_approximate_encoding_round_trips():
+    encoding = ApproximateEncoding()
+    tokens = encoding.encode(TEXT)
+    assert encoding.decode(tokens) == TEXT
+    assert encoding.encode_ordinary(TEXT) == tokens
+    # Close to what a BPE tokenizer gives for English prose (about 17 here)
+    assert 12 <= len(tokens) <= 25
+
+
+def test_get_encoding_falls_back_without_tiktoken(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    lctokens.get_encoding.cache_clear()
+    try:
+        assert isinstance(lctokens.get_encoding("gpt-4o-mini"), ApproximateEncoding)
+        assert lctokens.truncate_to_tokens(TEXT, 3, "gpt-4o-mini") == "Cricket is …"
+    finally:
+        lctokens.get_encoding.cache_clear()
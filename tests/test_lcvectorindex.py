@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from lcvectorindex import NumpyVectorIndex
+
+
+def make_index(count=50, dim=8):
+    vectors = np.random.default_rng(0).standard_normal((count, dim)).astype(np.float32)
+    index = NumpyVectorIndex(dim)
+    index.add([str(i) for i in range(count)], vectors)
+    return index, vectors
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(tmp_path, mmap):
+    index, vectors = make_index()
+    index.save(str(tmp_path))
+    loaded = NumpyVectorIndex.load(str(tmp_path), mmap=mmap)
+    assert len(loaded) == len(index)
+    assert loaded.search(vectors[3], 1)[0][0] == "3"
+
+
+def test_loaded_index_saved_to_its_own_directory(tmp_path):
+    index, vectors = make_index()
+    index.save(str(tmp_path))
+    loaded = NumpyVectorIndex.load(str(tmp_path), mmap=True)
+    loaded.save(str(tmp_path))
+    # The memory map of the old file must still read the vectors while saving
+    assert loaded.search(vectors[7], 1)[0] == ("7", pytest.approx(1.0, abs=1e-5))
+    reloaded = NumpyVectorIndex.load(str(tmp_path), mmap=True)
+    assert float(np.abs(np.asarray(reloaded._matrix)).sum()) > 0
+    best, score = reloaded.search(vectors[7], 1)[0]
+    assert best == "7" and score == pytest.approx(1.0, abs=1e-5)
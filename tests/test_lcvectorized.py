@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from lcvectorized import VectorizedLambda
+
+
+@pytest.mark.parametrize("chunk_size", [4, 1000])
+def test_batch_accepts_an_ndarray(chunk_size):
+    add_one = VectorizedLambda(lambda xs: xs + 1, as_array=True, chunk_size=chunk_size)
+    inputs = np.arange(10)
+    assert add_one.batch(inputs) == list(range(1, 11))
+    assert asyncio.run(add_one.abatch(inputs)) == list(range(1, 11))
+
+
+def test_empty_batch():
+    add_one = VectorizedLambda(lambda xs: xs + 1, as_array=True)
+    assert add_one.batch(np.arange(0)) == []
+    assert add_one.batch([]) == []
+    assert asyncio.run(add_one.abatch(np.arange(0))) == []
+
+
+def test_return_exceptions_isolates_failing_inputs():
+    def invert(xs):
+        if 0 in xs:
+            raise ZeroDivisionError("zero in batch")
+        return [1 / x for x in xs]
+
+    results = VectorizedLambda(invert).batch([1, 0, 2], return_exceptions=True)
+    assert results[0] == 1.0 and results[2] == 0.5
+    assert isinstance(results[1], ZeroDivisionError)